@@ -0,0 +1,55 @@
+// Долгоживущий процесс компилятора PascalABC.NET.
+//
+// Загружает сборку компилятора один раз и вызывает ее точку входа
+// для каждого задания, поэтому запуск Mono, загрузка сборок и JIT
+// оплачиваются только при старте процесса.
+//
+// Протокол (stdin/stdout):
+//   запрос - строка с путем к .pas файлу
+//   ответ  - строка с длиной вывода компилятора в байтах,
+//            затем сам вывод в UTF-8
+using System;
+using System.IO;
+using System.Reflection;
+using System.Text;
+
+public static class CompilerHost
+{
+    public static int Main(string[] args)
+    {
+        var entry = Assembly.LoadFrom(args[0]).EntryPoint;
+        var stdin = new StreamReader(Console.OpenStandardInput(), new UTF8Encoding(false));
+        var stdout = Console.OpenStandardOutput();
+        var consoleOut = Console.Out;
+        var consoleError = Console.Error;
+        string path;
+        while ((path = stdin.ReadLine()) != null)
+        {
+            var buffer = new StringWriter();
+            Console.SetOut(buffer);
+            Console.SetError(buffer);
+            try
+            {
+                var parameters = entry.GetParameters().Length == 0
+                    ? null
+                    : new object[] { new string[] { path } };
+                entry.Invoke(null, parameters);
+            }
+            catch (TargetInvocationException ex)
+            {
+                buffer.WriteLine(ex.InnerException.Message);
+            }
+            finally
+            {
+                Console.SetOut(consoleOut);
+                Console.SetError(consoleError);
+            }
+            var payload = Encoding.UTF8.GetBytes(buffer.ToString());
+            var header = Encoding.ASCII.GetBytes(payload.Length + "\n");
+            stdout.Write(header, 0, header.Length);
+            stdout.Write(payload, 0, payload.Length);
+            stdout.Flush();
+        }
+        return 0;
+    }
+}
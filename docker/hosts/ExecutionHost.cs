@@ -0,0 +1,306 @@
+// Процесс-хост программы на время одного тестирования.
+//
+// Mono запускается один раз на все тесты программы. Каждый тест
+// выполняется в отдельном AppDomain: сборка программы загружается
+// в него заново, поэтому статические переменные и состояние Console
+// не переходят между тестами, а после теста домен выгружается.
+// Программа выполняется в отдельном потоке. Хост прерывает ее
+// (выгружает домен) сразу при переполнении вывода и при превышении
+// процессорного времени. Время выполнения ограничивает сервис:
+// зависший хост уничтожается. Если домен не выгружается, хост
+// отправляет ответ и завершается, сервис запускает новый.
+//
+// Аргументы: путь к .exe программы, максимальный размер вывода в байтах
+// Протокол (stdin/stdout):
+//   запрос - строка "<длина ввода в байтах> <процессорное время, с>"
+//            (0 - без ограничения), затем сам ввод в UTF-8
+//   ответ  - три сообщения "длина в байтах\nданные":
+//            "<код возврата> <процессорное время, с> <статус>",
+//            вывод программы, вывод ошибок.
+//            Статус: 0 - завершена, 1 - переполнение вывода,
+//            2 - превышено процессорное время
+using System;
+using System.Diagnostics;
+using System.Globalization;
+using System.IO;
+using System.Reflection;
+using System.Text;
+using System.Threading;
+
+// Состояние запуска в домене хоста, домен программы
+// сообщает через него о переполнении вывода
+public class RunState : MarshalByRefObject
+{
+    private volatile bool overflow;
+    public string Output = "";
+    public string Error = "";
+
+    public bool Overflow
+    {
+        get { return overflow; }
+    }
+
+    public void SetOverflow(string output, string error)
+    {
+        Output = output;
+        Error = error;
+        overflow = true;
+    }
+
+    public override object InitializeLifetimeService()
+    {
+        return null;
+    }
+}
+
+public class LimitedWriter : StringWriter
+{
+    private readonly int limit;
+    private readonly Action onOverflow;
+    public bool Overflow;
+
+    public LimitedWriter(int limit, Action onOverflow)
+    {
+        this.limit = limit;
+        this.onOverflow = onOverflow;
+    }
+
+    private void SetOverflow()
+    {
+        if (!Overflow)
+        {
+            Overflow = true;
+            onOverflow();
+        }
+    }
+
+    public override void Write(char value)
+    {
+        if (GetStringBuilder().Length >= limit)
+        {
+            SetOverflow();
+            return;
+        }
+        base.Write(value);
+    }
+
+    public override void Write(char[] buffer, int index, int count)
+    {
+        var room = limit - GetStringBuilder().Length;
+        if (count > room)
+        {
+            base.Write(buffer, index, Math.Max(room, 0));
+            SetOverflow();
+            return;
+        }
+        base.Write(buffer, index, count);
+    }
+
+    public override void Write(string value)
+    {
+        if (value != null)
+        {
+            Write(value.ToCharArray(), 0, value.Length);
+        }
+    }
+}
+
+public class Runner : MarshalByRefObject
+{
+    public int Run(
+        string path,
+        string input,
+        int limit,
+        RunState state,
+        out string output,
+        out string error)
+    {
+        LimitedWriter stdout = null;
+        LimitedWriter stderr = null;
+        Action stop = () =>
+        {
+            state.SetOverflow(stdout.ToString(), stderr.ToString());
+            // Поток программы ждет выгрузки домена
+            Thread.Sleep(Timeout.Infinite);
+        };
+        stdout = new LimitedWriter(limit, stop);
+        stderr = new LimitedWriter(limit, stop);
+        Console.SetIn(new StringReader(input));
+        Console.SetOut(stdout);
+        Console.SetError(stderr);
+        var code = 0;
+        try
+        {
+            var entry = Assembly.LoadFrom(path).EntryPoint;
+            var parameters = entry.GetParameters().Length == 0
+                ? null
+                : new object[] { new string[0] };
+            var result = entry.Invoke(null, parameters);
+            code = result is int ? (int)result : Environment.ExitCode;
+        }
+        catch (TargetInvocationException ex)
+        {
+            stderr.Write("Unhandled Exception:\n" + ex.InnerException + "\n");
+            code = 1;
+        }
+        Console.Out.Flush();
+        output = stdout.ToString();
+        error = stderr.ToString();
+        return code;
+    }
+}
+
+public static class ExecutionHost
+{
+    private static string ReadLine(Stream stream)
+    {
+        var line = new StringBuilder();
+        int value;
+        while ((value = stream.ReadByte()) != '\n')
+        {
+            if (value < 0)
+            {
+                return null;
+            }
+            line.Append((char)value);
+        }
+        return line.ToString();
+    }
+
+    private static byte[] ReadExactly(Stream stream, int size)
+    {
+        var data = new byte[size];
+        var offset = 0;
+        while (offset < size)
+        {
+            var count = stream.Read(data, offset, size - offset);
+            if (count == 0)
+            {
+                throw new EndOfStreamException();
+            }
+            offset += count;
+        }
+        return data;
+    }
+
+    private static void WriteMessage(Stream stream, string value)
+    {
+        var payload = new UTF8Encoding(false).GetBytes(value);
+        var header = Encoding.ASCII.GetBytes(payload.Length + "\n");
+        stream.Write(header, 0, header.Length);
+        stream.Write(payload, 0, payload.Length);
+    }
+
+    private const int Completed = 0;
+    private const int OutputOverflow = 1;
+    private const int CpuLimit = 2;
+    private const int PollInterval = 10;
+    private const int UnloadTimeout = 1000;
+
+    public static int Main(string[] args)
+    {
+        var path = Path.GetFullPath(args[0]);
+        var limit = int.Parse(args[1]);
+        var stdin = Console.OpenStandardInput();
+        var stdout = Console.OpenStandardOutput();
+        var process = Process.GetCurrentProcess();
+        string header;
+        while ((header = ReadLine(stdin)) != null)
+        {
+            var fields = header.Split(' ');
+            var input = new UTF8Encoding(false).GetString(
+                ReadExactly(stdin, int.Parse(fields[0])));
+            var cpuLimit = TimeSpan.FromSeconds(double.Parse(
+                fields[1], CultureInfo.InvariantCulture));
+            var started = process.TotalProcessorTime;
+            var domain = AppDomain.CreateDomain("run");
+            var state = new RunState();
+            var output = "";
+            var error = "";
+            var code = 0;
+            var worker = new Thread(() =>
+            {
+                try
+                {
+                    var runner = (Runner)domain.CreateInstanceAndUnwrap(
+                        typeof(Runner).Assembly.FullName,
+                        typeof(Runner).FullName);
+                    code = runner.Run(
+                        path, input, limit, state, out output, out error);
+                }
+                catch (ThreadAbortException)
+                {
+                    // Домен выгружен хостом
+                }
+                catch (AppDomainUnloadedException)
+                {
+                }
+                catch (Exception ex)
+                {
+                    error = "Unhandled Exception:\n" + ex + "\n";
+                    code = 1;
+                }
+            });
+            worker.Start();
+            var status = Completed;
+            var cpuTime = TimeSpan.Zero;
+            while (true)
+            {
+                var finished = worker.Join(PollInterval);
+                process.Refresh();
+                cpuTime = process.TotalProcessorTime - started;
+                if (state.Overflow)
+                {
+                    status = OutputOverflow;
+                    break;
+                }
+                if (finished)
+                {
+                    break;
+                }
+                if (cpuLimit > TimeSpan.Zero && cpuTime >= cpuLimit)
+                {
+                    status = CpuLimit;
+                    break;
+                }
+            }
+            var restart = false;
+            try
+            {
+                AppDomain.Unload(domain);
+            }
+            catch (CannotUnloadAppDomainException)
+            {
+                restart = true;
+            }
+            if (!worker.Join(UnloadTimeout))
+            {
+                restart = true;
+            }
+            if (status == OutputOverflow)
+            {
+                output = state.Output;
+                error = state.Error;
+            }
+            else if (status == CpuLimit)
+            {
+                output = "";
+                error = "";
+            }
+            WriteMessage(stdout, string.Format(
+                CultureInfo.InvariantCulture,
+                "{0} {1} {2}",
+                code,
+                cpuTime.TotalSeconds,
+                status));
+            WriteMessage(stdout, output ?? "");
+            WriteMessage(stdout, error ?? "");
+            stdout.Flush();
+            if (restart)
+            {
+                return 1;
+            }
+        }
+        return 0;
+    }
+}
@@ -0,0 +1,405 @@
+""" ASGI-приложение для запуска в цикле событий:
+
+        gunicorn -k uvicorn.workers.UvicornWorker app.asgi:app
+
+    API то же, что у app.main (те же маршруты и схемы).
+    /debug/, /testing/, /testing/stream/ и /batch/testing/ выполняются
+    через AsyncPascalService: пока программы работают, поток воркера
+    свободен, и один воркер держит сотни запросов """
+
+import os
+import re
+import json
+import time
+import mimetypes
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union
+)
+from marshmallow import Schema, ValidationError
+from werkzeug.exceptions import (
+    BadRequest,
+    InternalServerError,
+    ServiceUnavailable,
+    TooManyRequests
+)
+from werkzeug.security import safe_join
+from app.entities import TestsData
+from app.schema import (
+    DebugSchema,
+    TestSchema,
+    TestsSchema,
+    BatchTestsSchema,
+    SuiteSchema,
+    JobSchema,
+    JobSubmitSchema,
+    BadRequestSchema,
+    ServiceExceptionSchema,
+)
+from app.service.aio import AsyncPascalService, to_thread
+from app.service.main import PascalService
+from app.service.exceptions import ServiceException, AdmissionException
+from app.service.admission import admission
+from app.service.cache import compile_cache, result_cache
+from app.service.suites import suite_registry
+from app.service.hosts import compiler_pool, checker_pool
+from app.service.aot import start_toolchain_precompilation
+from app.service.workspace import workspace
+from app.service.toolchains import toolchain
+from app.jobs.main import job_queue, JobQueueFull
+from app import config, messages, metrics
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(APP_DIR, 'templates')
+STATIC_DIR = os.path.join(APP_DIR, 'static')
+
+
+class StreamBody:
+
+    """ Тело ответа, отправляемое частями по мере готовности.
+        on_close вызывается после отправки тела или обрыва
+        соединения, как Response.call_on_close во Flask """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        on_close: Callable[[], None]
+    ):
+        self.chunks = chunks
+        self.on_close = on_close
+
+    async def close(self):
+        try:
+            await self.chunks.aclose()
+        finally:
+            self.on_close()
+
+
+Headers = List[Tuple[bytes, bytes]]
+Response = Tuple[int, Union[bytes, StreamBody], Headers]
+
+JSON_HEADERS = [(b'content-type', b'application/json')]
+
+
+def json_response(
+    status: int,
+    data: dict,
+    headers: Optional[Headers] = None
+) -> Response:
+    body = json.dumps(data, ensure_ascii=False).encode()
+    return status, body, JSON_HEADERS + (headers or [])
+
+
+def load_body(schema: Schema, body: bytes) -> Any:
+    try:
+        request_data = json.loads(body or b'null')
+    except ValueError:
+        raise ValidationError('Invalid JSON')
+    return schema.load(request_data)
+
+
+async def run_service(
+    schema: Schema,
+    handler: Callable[..., Awaitable],
+    body: bytes
+) -> Response:
+
+    """ Валидирует запрос, ждет места в admission
+        и выполняет его через AsyncPascalService """
+
+    try:
+        data = load_body(schema, body)
+        slot = await admission.acquire_async()
+        try:
+            data = await handler(data)
+        finally:
+            admission.release(slot)
+    except ValidationError as ex:
+        return json_response(400, BadRequestSchema().dump(BadRequest(ex)))
+    except AdmissionException as ex:
+        return json_response(
+            429,
+            ServiceExceptionSchema().dump(TooManyRequests(ex)),
+            [(b'retry-after', str(ex.retry_after).encode())]
+        )
+    except ServiceException as ex:
+        return json_response(
+            500, ServiceExceptionSchema().dump(InternalServerError(ex))
+        )
+    return json_response(200, schema.dump(data))
+
+
+def ndjson(data: dict) -> bytes:
+    return (json.dumps(data, ensure_ascii=False) + '\n').encode()
+
+
+async def index(body: bytes) -> Response:
+    with open(os.path.join(TEMPLATES_DIR, 'index.html'), 'rb') as file:
+        page = file.read()
+    return 200, page, [(b'content-type', b'text/html; charset=utf-8')]
+
+
+async def static(body: bytes, filename: str) -> Response:
+    path = safe_join(STATIC_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        return not_found()
+    with open(path, 'rb') as file:
+        content = file.read()
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    return 200, content, [(b'content-type', content_type.encode())]
+
+
+async def debug(body: bytes) -> Response:
+    return await run_service(DebugSchema(), AsyncPascalService.debug, body)
+
+
+async def testing(body: bytes) -> Response:
+    return await run_service(
+        TestsSchema(), AsyncPascalService.testing, body
+    )
+
+
+async def testing_stream_events(data: TestsData) -> AsyncIterator[bytes]:
+
+    """ Результаты тестирования в формате NDJSON,
+        как app.main.testing_stream_events """
+
+    test_schema = TestSchema()
+    events = AsyncPascalService.testing_events(data)
+    try:
+        async for event, index in events:
+            if event == 'compile':
+                yield ndjson({'type': 'compile', 'error': data.error})
+            else:
+                yield ndjson({
+                    'type': 'test',
+                    'index': index,
+                    **test_schema.dump(data.tests[index])
+                })
+    except ServiceException as ex:
+        yield ndjson({
+            'type': 'error',
+            'error': ex.message,
+            'details': ex.details
+        })
+    else:
+        summary = TestsSchema(only=('num', 'num_ok', 'ok')).dump(data)
+        yield ndjson({'type': 'summary', **summary})
+    finally:
+        await events.aclose()
+
+
+async def testing_stream(body: bytes) -> Response:
+    try:
+        data = load_body(TestsSchema(), body)
+        slot = await admission.acquire_async()
+    except ValidationError as ex:
+        return json_response(400, BadRequestSchema().dump(BadRequest(ex)))
+    except AdmissionException as ex:
+        return json_response(
+            429,
+            ServiceExceptionSchema().dump(TooManyRequests(ex)),
+            [(b'retry-after', str(ex.retry_after).encode())]
+        )
+    return 200, StreamBody(
+        testing_stream_events(data),
+        on_close=lambda: admission.release(slot)
+    ), [(b'content-type', b'application/x-ndjson')]
+
+
+async def batch_testing(body: bytes) -> Response:
+    return await run_service(
+        BatchTestsSchema(), AsyncPascalService.batch_testing, body
+    )
+
+
+async def register_suite(body: bytes) -> Response:
+    schema = SuiteSchema()
+    try:
+        data = load_body(schema, body)
+        data = await to_thread(PascalService.register_suite, data)
+    except ValidationError as ex:
+        return json_response(400, BadRequestSchema().dump(BadRequest(ex)))
+    except ServiceException as ex:
+        return json_response(
+            500, ServiceExceptionSchema().dump(InternalServerError(ex))
+        )
+    return json_response(201, schema.dump(data))
+
+
+async def get_suite(body: bytes, suite_id: str) -> Response:
+    suite = await to_thread(suite_registry.get, suite_id)
+    if suite is None:
+        return json_response(404, {'error': messages.MSG_18, 'details': None})
+    return json_response(200, {'id': suite_id, 'num': len(suite.values)})
+
+
+async def submit_job(body: bytes) -> Response:
+    try:
+        data = load_body(JobSubmitSchema(), body)
+        job = await to_thread(job_queue.submit, data['type'], data['data'])
+    except ValidationError as ex:
+        return json_response(400, BadRequestSchema().dump(BadRequest(ex)))
+    except JobQueueFull:
+        return json_response(503, ServiceExceptionSchema().dump(
+            ServiceUnavailable(ServiceException(messages.MSG_10))
+        ))
+    return json_response(202, JobSchema().dump(job))
+
+
+async def get_job(body: bytes, job_id: str) -> Response:
+    job = await to_thread(job_queue.get, job_id)
+    if job is None:
+        return json_response(404, {'error': messages.MSG_11, 'details': None})
+    return json_response(200, JobSchema().dump(job))
+
+
+async def stats(body: bytes) -> Response:
+    return json_response(200, {
+        'compile_cache': compile_cache.stats(),
+        'result_cache': result_cache.stats(),
+        'jobs': job_queue.stats(),
+        'workspace': await to_thread(workspace.usage),
+        'admission': admission.stats(),
+        'suites': suite_registry.stats(),
+    })
+
+
+async def metrics_view(body: bytes) -> Response:
+    return 200, await to_thread(metrics.generate), [
+        (b'content-type', metrics.CONTENT_TYPE.encode())
+    ]
+
+
+# Маршруты app.main: метод, шаблон пути, обработчик.
+# Именованные группы шаблона передаются в обработчик
+routes = [
+    ('GET', r'/', index),
+    ('GET', r'/static/(?P<filename>.+)', static),
+    ('POST', r'/debug/', debug),
+    ('POST', r'/testing/', testing),
+    ('POST', r'/testing/stream/', testing_stream),
+    ('POST', r'/batch/testing/', batch_testing),
+    ('POST', r'/suites/', register_suite),
+    ('GET', r'/suites/(?P<suite_id>[^/]+)/', get_suite),
+    ('POST', r'/jobs/', submit_job),
+    ('GET', r'/jobs/(?P<job_id>[^/]+)/', get_job),
+    ('GET', r'/stats/', stats),
+    ('GET', r'/metrics', metrics_view),
+]
+compiled_routes = [
+    (method, re.compile(pattern), handler)
+    for method, pattern, handler in routes
+]
+
+
+def not_found() -> Response:
+    return json_response(404, {'error': 'Not found', 'details': None})
+
+
+def match_route(
+    method: str,
+    path: str
+) -> Tuple[Optional[Callable[..., Awaitable]], Dict[str, str], bool]:
+
+    """ Обработчик запроса, параметры пути и признак
+        того, что путь есть у другого метода (405) """
+
+    path_exists = False
+    for route_method, pattern, handler in compiled_routes:
+        match = pattern.fullmatch(path)
+        if match is None:
+            continue
+        if route_method == method:
+            return handler, match.groupdict(), True
+        path_exists = True
+    return None, {}, path_exists
+
+
+def startup():
+    workspace.start_sweeper(config.WORKSPACE_SWEEP_INTERVAL)
+    if toolchain.hosts_enabled:
+        compiler_pool.start()
+    if config.CHECKER_POOL_ENABLED:
+        checker_pool.start()
+    if toolchain.aot_enabled:
+        start_toolchain_precompilation()
+
+
+async def read_body(receive) -> bytes:
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            startup()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def send_response(send, status: int, body, headers: Headers):
+    if not isinstance(body, StreamBody):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        await send({'type': 'http.response.body', 'body': body})
+        return
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        async for chunk in body.chunks:
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': True
+            })
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        await body.close()
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    handler, params, path_exists = match_route(
+        scope['method'], scope['path']
+    )
+    started = time.monotonic()
+    metrics.IN_FLIGHT.labels(source='request').inc()
+    try:
+        body = await read_body(receive)
+        if handler is not None:
+            status, body, headers = await handler(body, **params)
+        elif path_exists:
+            status, body, headers = json_response(
+                405, {'error': 'Method not allowed', 'details': None}
+            )
+        else:
+            status, body, headers = not_found()
+        await send_response(send, status, body, headers)
+    finally:
+        metrics.IN_FLIGHT.labels(source='request').dec()
+        metrics.REQUEST_TIME.labels(
+            endpoint=handler.__name__ if handler else 'unknown'
+        ).observe(time.monotonic() - started)
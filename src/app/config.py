@@ -7,3 +7,154 @@ DEBUG = env.get('DEBUG', 'false') == 'true'
 TIMEOUT = 5  # seconds
 SANDBOX_USER_UID = int(env.get('SANDBOX_USER_UID', os.getuid()))
 SANDBOX_DIR = env.get('SANDBOX_DIR', gettempdir())
+# Данные сервиса (эталонные ответы наборов тестов, задания) - вне
+# SANDBOX_DIR, в каталогах 0700: запускаемые программы не должны их читать
+DATA_DIR = env.get(
+    'DATA_DIR', os.path.join(os.path.expanduser('~'), '.sandbox-pascal')
+)
+PASCAL_COMPILER_PATH = env.get(
+    'PASCAL_COMPILER_PATH', '/usr/bin/pascal/pabcnetcclear.exe'
+)
+
+# Ограничения ресурсов компиляции (COMPILE_*) и запуска программы
+# (EXECUTE_*): процессорное время (RLIMIT_CPU) и время выполнения
+# в секундах, адресное пространство (RLIMIT_AS) в байтах, 0 - без ограничения
+COMPILE_CPU_LIMIT = float(env.get('COMPILE_CPU_LIMIT', 0))
+COMPILE_WALL_LIMIT = float(env.get('COMPILE_WALL_LIMIT', TIMEOUT))
+COMPILE_MEMORY_LIMIT = int(env.get('COMPILE_MEMORY_LIMIT', 0))
+EXECUTE_CPU_LIMIT = float(env.get('EXECUTE_CPU_LIMIT', TIMEOUT))
+# Время выполнения по умолчанию на секунду больше процессорного:
+# программу, занимающую процессор, снимает RLIMIT_CPU, и результат
+# не зависит от того, какое ограничение сработает первым
+EXECUTE_WALL_LIMIT = float(env.get(
+    'EXECUTE_WALL_LIMIT',
+    EXECUTE_CPU_LIMIT + 1 if EXECUTE_CPU_LIMIT else TIMEOUT
+))
+EXECUTE_MEMORY_LIMIT = int(env.get('EXECUTE_MEMORY_LIMIT', 0))
+# Максимальные ограничения, которые можно задать в запросе
+LIMITS_MAX_CPU_TIME = float(env.get('LIMITS_MAX_CPU_TIME', 30))
+LIMITS_MAX_WALL_TIME = float(env.get('LIMITS_MAX_WALL_TIME', 60))
+LIMITS_MAX_MEMORY = int(env.get('LIMITS_MAX_MEMORY', 4 * 1024 ** 3))
+
+# Вывод программы: при превышении OUTPUT_LIMIT байт программа
+# уничтожается, в результате остаются первые OUTPUT_HEAD_SIZE
+# и последние OUTPUT_TAIL_SIZE байт вывода
+OUTPUT_LIMIT = int(env.get('OUTPUT_LIMIT', 16 * 1024 * 1024))
+OUTPUT_HEAD_SIZE = int(env.get('OUTPUT_HEAD_SIZE', 64 * 1024))
+OUTPUT_TAIL_SIZE = int(env.get('OUTPUT_TAIL_SIZE', 0))
+
+# Компилятор и среда выполнения: mono | fake
+TOOLCHAIN = env.get('TOOLCHAIN', 'mono')
+# Параметры fake: задержки в секундах, размер вывода в байтах,
+# вероятности ошибок компиляции, выполнения и превышения времени
+FAKE_COMPILE_LATENCY = float(env.get('FAKE_COMPILE_LATENCY', 0.05))
+FAKE_EXECUTE_LATENCY = float(env.get('FAKE_EXECUTE_LATENCY', 0.01))
+FAKE_OUTPUT_SIZE = int(env.get('FAKE_OUTPUT_SIZE', 0))
+FAKE_COMPILE_ERROR_RATE = float(env.get('FAKE_COMPILE_ERROR_RATE', 0))
+FAKE_RUNTIME_ERROR_RATE = float(env.get('FAKE_RUNTIME_ERROR_RATE', 0))
+FAKE_TIMEOUT_RATE = float(env.get('FAKE_TIMEOUT_RATE', 0))
+
+# Кэш скомпилированных программ
+COMPILE_CACHE_ENABLED = env.get('COMPILE_CACHE_ENABLED', 'false') == 'true'
+COMPILE_CACHE_DIR = env.get(
+    'COMPILE_CACHE_DIR', os.path.join(SANDBOX_DIR, 'cache')
+)
+COMPILE_CACHE_MAX_BYTES = int(
+    env.get('COMPILE_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+)
+COMPILE_CACHE_MAX_ENTRIES = int(env.get('COMPILE_CACHE_MAX_ENTRIES', 1000))
+
+# Пул прогретых процессов компилятора
+COMPILER_HOST_ENABLED = env.get('COMPILER_HOST_ENABLED', 'false') == 'true'
+COMPILER_HOST_PATH = env.get(
+    'COMPILER_HOST_PATH', '/usr/bin/pascal/CompilerHost.exe'
+)
+COMPILER_HOST_POOL_SIZE = int(env.get('COMPILER_HOST_POOL_SIZE', 2))
+COMPILER_HOST_MAX_JOBS = int(env.get('COMPILER_HOST_MAX_JOBS', 500))
+
+# Процесс-хост программы: тесты одной программы выполняются в одном
+# процессе Mono (каждый - в отдельном AppDomain), хост запускается
+# сразу после компиляции и уничтожается после тестирования.
+# Используется при последовательном запуске не менее
+# EXECUTION_HOST_MIN_TESTS тестов
+EXECUTION_HOST_ENABLED = env.get('EXECUTION_HOST_ENABLED', 'false') == 'true'
+EXECUTION_HOST_PATH = env.get(
+    'EXECUTION_HOST_PATH', '/usr/bin/pascal/ExecutionHost.exe'
+)
+EXECUTION_HOST_MIN_TESTS = int(env.get('EXECUTION_HOST_MIN_TESTS', 2))
+
+# Параллельный запуск тестов
+TESTING_WORKERS = int(env.get('TESTING_WORKERS', 1))
+TESTING_MAX_WORKERS_PER_REQUEST = int(
+    env.get('TESTING_MAX_WORKERS_PER_REQUEST', TESTING_WORKERS)
+)
+
+# AOT-компиляция сборок Mono
+AOT_ENABLED = env.get('AOT_ENABLED', 'false') == 'true'
+AOT_TOOLCHAIN_DIR = env.get('AOT_TOOLCHAIN_DIR', '/usr/bin/pascal')
+AOT_OPTIONS = env.get('AOT_OPTIONS', '')
+AOT_MIN_TESTS = int(env.get('AOT_MIN_TESTS', 5))
+
+# Потоковое сравнение вывода с ответом теста (checker lines, tokens, float)
+STREAM_CHECK_ENABLED = env.get('STREAM_CHECK_ENABLED', 'false') == 'true'
+
+# Кэш скомпилированных функций checker
+CHECKER_CACHE_SIZE = int(env.get('CHECKER_CACHE_SIZE', 256))
+
+# Пул процессов функций checker: функции выполняются в отдельных процессах
+# Python с ограничением времени вызова (секунды) и памяти (RLIMIT_AS, байт),
+# процесс перезапускается после CHECKER_POOL_MAX_CALLS вызовов
+CHECKER_POOL_ENABLED = env.get('CHECKER_POOL_ENABLED', 'false') == 'true'
+CHECKER_POOL_SIZE = int(env.get('CHECKER_POOL_SIZE', 2))
+CHECKER_POOL_MAX_CALLS = int(env.get('CHECKER_POOL_MAX_CALLS', 1000))
+CHECKER_TIMEOUT = float(env.get('CHECKER_TIMEOUT', 5))
+CHECKER_MEMORY_LIMIT = int(
+    env.get('CHECKER_MEMORY_LIMIT', 256 * 1024 * 1024)
+)
+
+# Асинхронные задания /jobs/
+JOBS_WORKERS = int(env.get('JOBS_WORKERS', 2))
+JOBS_QUEUE_SIZE = int(env.get('JOBS_QUEUE_SIZE', 100))
+JOBS_RESULT_TTL = int(env.get('JOBS_RESULT_TTL', 3600))  # seconds
+JOBS_STORE = env.get('JOBS_STORE', 'memory')  # memory | sqlite
+JOBS_SQLITE_PATH = env.get(
+    'JOBS_SQLITE_PATH', os.path.join(DATA_DIR, 'jobs.sqlite3')
+)
+
+# Пакетное тестирование /batch/testing/
+BATCH_WORKERS = int(env.get('BATCH_WORKERS', 2))
+
+# Кэш результатов запуска программ
+RESULT_CACHE_ENABLED = env.get('RESULT_CACHE_ENABLED', 'false') == 'true'
+RESULT_CACHE_MAX_BYTES = int(
+    env.get('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+)
+
+# Реестр наборов тестов /suites/: каталог наборов (общий для воркеров)
+# и размер LRU-кэша прочитанных наборов в памяти воркера в байтах
+SUITES_DIR = env.get('SUITES_DIR', os.path.join(DATA_DIR, 'suites'))
+SUITES_CACHE_MAX_BYTES = int(
+    env.get('SUITES_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+)
+
+# Рабочие каталоги заданий
+WORKSPACE_DIR = env.get('WORKSPACE_DIR', SANDBOX_DIR)
+WORKSPACE_MAX_BYTES = int(env.get('WORKSPACE_MAX_BYTES', 512 * 1024 * 1024))
+WORKSPACE_MAX_INODES = int(env.get('WORKSPACE_MAX_INODES', 10000))
+WORKSPACE_STALE_AFTER = int(env.get('WORKSPACE_STALE_AFTER', 600))  # seconds
+WORKSPACE_SWEEP_INTERVAL = int(env.get('WORKSPACE_SWEEP_INTERVAL', 60))
+
+# Управление нагрузкой /debug/ и /testing/: количество одновременно
+# выполняемых запросов (0 - без ограничения), размер очереди ожидания,
+# время ожидания и Retry-After ответа 429 в секундах
+ADMISSION_LIMIT = int(env.get('ADMISSION_LIMIT', 0))
+ADMISSION_QUEUE_SIZE = int(env.get('ADMISSION_QUEUE_SIZE', 50))
+ADMISSION_MAX_WAIT = float(env.get('ADMISSION_MAX_WAIT', 10))
+ADMISSION_RETRY_AFTER = int(env.get('ADMISSION_RETRY_AFTER', 5))
+ADMISSION_DIR = env.get(
+    'ADMISSION_DIR', os.path.join(SANDBOX_DIR, 'admission')
+)
+
+# Метрики /metrics/ (файлы воркеров gunicorn, лучше на tmpfs)
+METRICS_ENABLED = env.get('METRICS_ENABLED', 'true') == 'true'
+METRICS_DIR = env.get('METRICS_DIR', os.path.join(SANDBOX_DIR, 'metrics'))
@@ -0,0 +1,14 @@
+import pytest
+from app.service.toolchains import FakeToolchain
+
+
+@pytest.fixture()
+def fake_toolchain(mocker):
+
+    def patch(**kwargs):
+        toolchain = FakeToolchain(**kwargs)
+        mocker.patch('app.service.main.toolchain', toolchain)
+        mocker.patch('app.service.aio.toolchain', toolchain)
+        return toolchain
+
+    return patch
@@ -1,5 +1,23 @@
-from typing import Optional, List
-from dataclasses import dataclass
+from typing import Any, Optional, List, Union
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ResourceLimits:
+
+    """ Ограничения ресурсов компиляции или запуска программы.
+        Не заданные значения берутся из настроек сервиса """
+
+    cpu_time: Optional[float] = None
+    wall_time: Optional[float] = None
+    memory: Optional[int] = None
+
+
+@dataclass
+class LimitsData:
+
+    compile: Optional[ResourceLimits] = None
+    execute: Optional[ResourceLimits] = None
 
 
 @dataclass
@@ -9,6 +27,11 @@ class DebugData:
     code: Optional[str] = None
     result: Optional[str] = None
     error: Optional[str] = None
+    cached: Optional[bool] = None
+    resources: bool = False
+    usage: Optional[Any] = None
+    compile_usage: Optional[Any] = None
+    limits: Optional[LimitsData] = None
 
 
 @dataclass
@@ -21,6 +44,18 @@ class TestData:
     result: Optional[str] = None
     error: Optional[str] = None
     ok: Optional[bool] = None
+    cached: Optional[bool] = None
+    usage: Optional[Any] = None
+    mismatch: Optional[int] = None
+
+
+@dataclass
+class CheckerPreset:
+
+    """ Встроенная функция проверки результата теста """
+
+    preset: str
+    eps: float = 1e-6
 
 
 @dataclass
@@ -33,4 +68,41 @@ class TestsData:
     num_ok: int = 0
     ok: Optional[bool] = None
     code: Optional[str] = None
-    checker: Optional[str] = None
+    checker: Union[str, CheckerPreset, None] = None
+    fail_fast: bool = False
+    error: Optional[str] = None
+    resources: bool = False
+    compile_usage: Optional[Any] = None
+    limits: Optional[LimitsData] = None
+
+
+@dataclass
+class SubmissionData:
+
+    code: str
+
+
+@dataclass
+class BatchTestsData:
+
+    """ Несколько программ, которые проверяются
+        на одном наборе тестов одной функцией checker """
+
+    tests: List[TestData]
+    submissions: List[SubmissionData]
+    checker: Union[str, CheckerPreset, None] = None
+    fail_fast: bool = False
+    limits: Optional[LimitsData] = None
+    results: List[Any] = field(default_factory=list)
+
+
+@dataclass
+class SuiteData:
+
+    """ Набор тестов с функцией checker
+        для повторного использования в /testing/ """
+
+    tests: List[TestData]
+    checker: Union[str, CheckerPreset, None] = None
+    id: Optional[str] = None
+    num: int = 0
@@ -0,0 +1,22 @@
+import time
+from typing import Optional
+from dataclasses import dataclass, field
+
+
+class JobStatus:
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
+@dataclass
+class Job:
+
+    id: str
+    type: str
+    status: str = JobStatus.QUEUED
+    result: Optional[dict] = None
+    created: float = field(default_factory=time.time)
+    expires: Optional[float] = None
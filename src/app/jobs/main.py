@@ -0,0 +1,128 @@
+import time
+import uuid
+import queue
+import threading
+from typing import Any, Optional
+from app import config, metrics
+from app.jobs.entities import Job, JobStatus
+from app.jobs.store import JobStore, create_store
+from app.schema import DebugSchema, TestsSchema
+from app.service.main import PascalService
+from app.service.exceptions import ServiceException
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobQueue:
+
+    """ Очередь заданий /jobs/ и фиксированный пул потоков,
+        выполняющих их через PascalService. Срок хранения
+        (result_ttl) задается заданию при постановке в очередь
+        и продлевается при запуске и завершении, поэтому задания
+        завершившегося воркера не остаются в хранилище навсегда """
+
+    handlers = {
+        'debug': (PascalService.debug, DebugSchema),
+        'testing': (PascalService.testing, TestsSchema),
+    }
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        result_ttl: int,
+        store: Optional[JobStore] = None
+    ):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._store = store
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> JobStore:
+        with self._lock:
+            if self._store is None:
+                self._store = create_store()
+            return self._store
+
+    def _start(self):
+
+        """ Потоки запускаются при первом задании, т.е. уже после fork """
+
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f'jobs-{number}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, job_type: str, data: Any) -> Job:
+
+        """ Ставит в очередь уже провалидированные данные запроса """
+
+        self._start()
+        job = Job(
+            id=uuid.uuid4().hex,
+            type=job_type,
+            expires=time.time() + self.result_ttl
+        )
+        self.store.save(job)
+        try:
+            self._queue.put_nowait((job, data))
+        except queue.Full:
+            self.store.delete(job.id)
+            raise JobQueueFull()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def _run(self, job: Job, data: Any):
+        handler, schema_class = self.handlers[job.type]
+        job.status = JobStatus.RUNNING
+        job.expires = time.time() + self.result_ttl
+        self.store.save(job)
+        try:
+            job.result = schema_class().dump(handler(data))
+        except ServiceException as ex:
+            job.status = JobStatus.FAILED
+            job.result = {'error': ex.message, 'details': ex.details}
+        except Exception as ex:
+            job.status = JobStatus.FAILED
+            job.result = {'error': str(ex), 'details': None}
+        else:
+            job.status = JobStatus.DONE
+        job.expires = time.time() + self.result_ttl
+        self.store.save(job)
+
+    def _work(self):
+        while True:
+            job, data = self._queue.get()
+            try:
+                in_flight = metrics.IN_FLIGHT.labels(source='job')
+                with in_flight.track_inprogress():
+                    self._run(job, data)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            'queued': self._queue.qsize(),
+            'workers': len(self._threads),
+        }
+
+
+job_queue = JobQueue(
+    workers=config.JOBS_WORKERS,
+    queue_size=config.JOBS_QUEUE_SIZE,
+    result_ttl=config.JOBS_RESULT_TTL
+)
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+from app import config
+from app.jobs.entities import Job
+from app.utils import make_private_dir
+
+
+class JobStore:
+
+    """ Хранилище заданий и их результатов.
+        Задания с истекшим сроком хранения (expires) не возвращаются """
+
+    def save(self, job: Job):
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def delete(self, job_id: str):
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+
+    """ Хранилище в памяти воркера.
+        Подходит только для запуска с одним воркером gunicorn """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.expires is not None and job.expires <= now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def save(self, job: Job):
+        with self._lock:
+            self._purge(time.time())
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge(time.time())
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+class SQLiteJobStore(JobStore):
+
+    """ Хранилище в файле SQLite, общее для всех воркеров.
+        Задания без срока хранения, оставшиеся от прежних версий,
+        удаляются при открытии через JOBS_RESULT_TTL после создания.
+        Файл (0600) и его каталог (0700) доступны только сервису:
+        в них программы и результаты других пользователей """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            make_private_dir(directory)
+        # Файлы -wal и -shm SQLite создает с правами основного файла
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)
+        self._connection = sqlite3.connect(
+            path,
+            timeout=config.TIMEOUT,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, '
+                'type TEXT NOT NULL, '
+                'status TEXT NOT NULL, '
+                'result TEXT, '
+                'created REAL NOT NULL, '
+                'expires REAL)'
+            )
+            self._connection.execute(
+                'DELETE FROM jobs WHERE expires IS NULL AND created <= ?',
+                (time.time() - config.JOBS_RESULT_TTL,)
+            )
+
+    def save(self, job: Job):
+        result = None if job.result is None else json.dumps(job.result)
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM jobs WHERE expires <= ?', (time.time(),)
+            )
+            self._connection.execute(
+                'INSERT OR REPLACE INTO jobs '
+                '(id, type, status, result, created, expires) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    job.id, job.type, job.status, result,
+                    job.created, job.expires
+                )
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT id, type, status, result, created, expires '
+                'FROM jobs WHERE id = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (job_id, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, job_type, status, result, created, expires = row
+        return Job(
+            id=job_id,
+            type=job_type,
+            status=status,
+            result=None if result is None else json.loads(result),
+            created=created,
+            expires=expires
+        )
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM jobs WHERE id = ?', (job_id,)
+            )
+
+
+def create_store() -> JobStore:
+    if config.JOBS_STORE == 'sqlite':
+        return SQLiteJobStore(config.JOBS_SQLITE_PATH)
+    return MemoryJobStore()
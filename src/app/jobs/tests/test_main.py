@@ -0,0 +1,128 @@
+import time
+import threading
+import pytest
+from app.entities import DebugData
+from app.jobs.entities import JobStatus
+from app.jobs.main import JobQueue, JobQueueFull
+from app.jobs.store import MemoryJobStore
+from app.service.exceptions import CheckerException
+
+
+def wait_job(job_queue: JobQueue, job_id: str):
+    for _ in range(100):
+        job = job_queue.get(job_id)
+        if job.status in (JobStatus.DONE, JobStatus.FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('Job is not finished')
+
+
+@pytest.fixture()
+def store() -> MemoryJobStore:
+    return MemoryJobStore()
+
+
+@pytest.fixture()
+def job_queue(store) -> JobQueue:
+    return JobQueue(workers=1, queue_size=10, result_ttl=60, store=store)
+
+
+def test_submit__done__ok(job_queue, mocker):
+
+    # arrange
+    debug_mock = mocker.patch(
+        'app.service.main.PascalService.debug',
+        return_value=DebugData(result='some result')
+    )
+    mocker.patch.dict(
+        JobQueue.handlers,
+        {'debug': (debug_mock, JobQueue.handlers['debug'][1])}
+    )
+    data = DebugData(code='some code')
+
+    # act
+    job = job_queue.submit('debug', data)
+    result = wait_job(job_queue, job.id)
+
+    # assert
+    debug_mock.assert_called_once_with(data)
+    assert result.status == JobStatus.DONE
+    assert result.result == {'result': 'some result', 'error': None}
+    assert result.expires > time.time()
+
+
+def test_submit__service_exception__failed(job_queue, mocker):
+
+    # arrange
+    debug_mock = mocker.Mock(
+        side_effect=CheckerException(details='some details')
+    )
+    mocker.patch.dict(
+        JobQueue.handlers,
+        {'debug': (debug_mock, JobQueue.handlers['debug'][1])}
+    )
+
+    # act
+    job = job_queue.submit('debug', DebugData(code='some code'))
+    result = wait_job(job_queue, job.id)
+
+    # assert
+    assert result.status == JobStatus.FAILED
+    assert result.result == {
+        'error': CheckerException.default_message,
+        'details': 'some details'
+    }
+
+
+def test_submit__queue_full__raise_exception(store, mocker):
+
+    # arrange
+    event = threading.Event()
+    debug_mock = mocker.Mock(side_effect=lambda data: event.wait(5))
+    mocker.patch.dict(
+        JobQueue.handlers,
+        {'debug': (debug_mock, JobQueue.handlers['debug'][1])}
+    )
+    job_queue = JobQueue(workers=1, queue_size=1, result_ttl=60, store=store)
+    job_queue.submit('debug', DebugData(code='1'))
+    for _ in range(100):
+        if debug_mock.called:
+            break
+        time.sleep(0.01)
+    job_queue.submit('debug', DebugData(code='2'))
+
+    # act
+    with pytest.raises(JobQueueFull):
+        job_queue.submit('debug', DebugData(code='3'))
+
+    # assert
+    assert len(store._jobs) == 2
+    event.set()
+
+
+def test_submit__queued_and_running__expires(job_queue, store, mocker):
+
+    # arrange
+    # Задания воркера, завершившегося до их выполнения,
+    # удаляются из хранилища по истечении срока
+    event = threading.Event()
+    debug_mock = mocker.Mock(side_effect=lambda data: event.wait(5))
+    mocker.patch.dict(
+        JobQueue.handlers,
+        {'debug': (debug_mock, JobQueue.handlers['debug'][1])}
+    )
+    running = job_queue.submit('debug', DebugData(code='1'))
+    for _ in range(100):
+        if debug_mock.called:
+            break
+        time.sleep(0.01)
+
+    # act
+    queued = job_queue.submit('debug', DebugData(code='2'))
+
+    # assert
+    assert store.get(running.id).status == JobStatus.RUNNING
+    assert store.get(queued.id).status == JobStatus.QUEUED
+    for job_id in (running.id, queued.id):
+        assert time.time() < store.get(job_id).expires <= time.time() + 60
+    event.set()
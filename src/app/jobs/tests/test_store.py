@@ -0,0 +1,128 @@
+import os
+import stat
+import time
+import pytest
+from app.jobs.entities import Job, JobStatus
+from app.jobs.store import MemoryJobStore, SQLiteJobStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteJobStore(str(tmp_path / 'jobs.sqlite3'))
+    return MemoryJobStore()
+
+
+def test_save__get__ok(store):
+
+    # arrange
+    job = Job(id='some id', type='debug')
+    store.save(job)
+    job.status = JobStatus.DONE
+    job.result = {'result': 'some result', 'error': None}
+
+    # act
+    store.save(job)
+    result = store.get('some id')
+
+    # assert
+    assert result == job
+
+
+def test_get__not_exists__return_none(store):
+
+    # act
+    assert store.get('some id') is None
+
+
+def test_get__expired__return_none(store):
+
+    # arrange
+    store.save(Job(id='expired', type='debug', expires=time.time() - 1))
+    store.save(Job(id='actual', type='debug', expires=time.time() + 60))
+
+    # act
+    assert store.get('expired') is None
+    assert store.get('actual') is not None
+
+
+def test_delete__ok(store):
+
+    # arrange
+    store.save(Job(id='some id', type='debug'))
+
+    # act
+    store.delete('some id')
+
+    # assert
+    assert store.get('some id') is None
+
+
+def test_sqlite__shared_between_processes__ok(tmp_path):
+
+    # arrange
+    path = str(tmp_path / 'jobs.sqlite3')
+    SQLiteJobStore(path).save(Job(id='some id', type='testing'))
+
+    # act
+    result = SQLiteJobStore(path).get('some id')
+
+    # assert
+    assert result.type == 'testing'
+    assert result.status == JobStatus.QUEUED
+
+
+def test_save__orphaned_jobs__purge(store):
+
+    # arrange
+    expired = time.time() - 1
+    for status in (JobStatus.QUEUED, JobStatus.RUNNING):
+        store.save(
+            Job(id=status, type='debug', status=status, expires=expired)
+        )
+
+    # act
+    store.save(Job(id='some id', type='debug'))
+
+    # assert
+    if isinstance(store, SQLiteJobStore):
+        ids = [row[0] for row in store._connection.execute(
+            'SELECT id FROM jobs'
+        )]
+    else:
+        ids = list(store._jobs)
+    assert ids == ['some id']
+
+
+def test_sqlite__legacy_jobs_without_expires__purge(tmp_path, mocker):
+
+    # arrange
+    mocker.patch('app.config.JOBS_RESULT_TTL', 60)
+    path = str(tmp_path / 'jobs.sqlite3')
+    store = SQLiteJobStore(path)
+    store.save(Job(id='orphan', type='debug', created=time.time() - 120))
+    store.save(Job(id='actual', type='debug'))
+
+    # act
+    result = SQLiteJobStore(path)
+
+    # assert
+    assert result.get('orphan') is None
+    assert result.get('actual') is not None
+
+
+def test_sqlite__private_permissions(tmp_path):
+
+    # arrange
+    directory = tmp_path / 'data'
+    os.makedirs(directory, mode=0o755)
+    path = directory / 'jobs.sqlite3'
+
+    # act
+    store = SQLiteJobStore(str(path))
+    store.save(Job(id='some id', type='debug'))
+
+    # assert
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    for name in os.listdir(directory):
+        assert stat.S_IMODE(os.stat(directory / name).st_mode) == 0o600
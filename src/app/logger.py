@@ -7,6 +7,8 @@ from app import config
 def get_logger():
 
     logger = logging.getLogger('logger')
+    if logger.handlers:
+        return logger
     logger.setLevel(logging.DEBUG if config.DEBUG else logging.ERROR)
     handler = StreamHandler(stream=sys.stdout)
     logger.addHandler(handler)
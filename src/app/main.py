@@ -1,24 +1,97 @@
-from typing import Union
+import json
+import time
+from typing import Union, Iterator
 from flask import (
     Flask,
+    Response,
     request,
+    g,
     render_template,
+    stream_with_context,
     abort
 )
 from marshmallow import ValidationError
 from app.service.main import PascalService
+from app.entities import TestsData
 from app.schema import (
     DebugSchema,
+    TestSchema,
     TestsSchema,
+    BatchTestsSchema,
+    SuiteSchema,
+    JobSchema,
+    JobSubmitSchema,
     BadRequestSchema,
     ServiceExceptionSchema,
 )
-from app.service.exceptions import ServiceException
+from app.service.exceptions import ServiceException, AdmissionException
+from app.service.admission import admission
+from app.service.cache import compile_cache, result_cache
+from app.service.suites import suite_registry
+from app.service.hosts import compiler_pool, checker_pool
+from app.service.aot import start_toolchain_precompilation
+from app.service.workspace import workspace
+from app.service.toolchains import toolchain
+from app.jobs.main import job_queue, JobQueueFull
+from app import config, messages, metrics
+
+
+def ndjson(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False) + '\n'
+
+
+def testing_stream_events(data: TestsData) -> Iterator[str]:
+
+    """ Результаты тестирования в формате NDJSON:
+        результат компиляции, результат каждого теста
+        по мере завершения, итог тестирования """
+
+    test_schema = TestSchema()
+    try:
+        for event, index in PascalService.testing_events(data):
+            if event == 'compile':
+                yield ndjson({'type': 'compile', 'error': data.error})
+            else:
+                yield ndjson({
+                    'type': 'test',
+                    'index': index,
+                    **test_schema.dump(data.tests[index])
+                })
+    except ServiceException as ex:
+        yield ndjson({
+            'type': 'error',
+            'error': ex.message,
+            'details': ex.details
+        })
+    else:
+        summary = TestsSchema(only=('num', 'num_ok', 'ok')).dump(data)
+        yield ndjson({'type': 'summary', **summary})
 
 
 def create_app():
 
     app = Flask(__name__)
+    workspace.start_sweeper(config.WORKSPACE_SWEEP_INTERVAL)
+    if toolchain.hosts_enabled:
+        compiler_pool.start()
+    if config.CHECKER_POOL_ENABLED:
+        checker_pool.start()
+    if toolchain.aot_enabled:
+        start_toolchain_precompilation()
+
+    @app.before_request
+    def start_request_metrics():
+        g.started = time.monotonic()
+        metrics.IN_FLIGHT.labels(source='request').inc()
+
+    @app.teardown_request
+    def finish_request_metrics(ex=None):
+        if 'started' not in g:
+            return
+        metrics.IN_FLIGHT.labels(source='request').dec()
+        metrics.REQUEST_TIME.labels(
+            endpoint=request.endpoint or 'unknown'
+        ).observe(time.monotonic() - g.started)
 
     @app.errorhandler(400)
     def bad_request_handler(ex: ValidationError):
@@ -28,6 +101,16 @@ def create_app():
     def bad_request_handler(ex: ServiceException):
         return ServiceExceptionSchema().dump(ex), 500
 
+    @app.errorhandler(429)
+    def too_many_requests_handler(ex: AdmissionException):
+        return ServiceExceptionSchema().dump(ex), 429, {
+            'Retry-After': str(ex.description.retry_after)
+        }
+
+    @app.errorhandler(503)
+    def unavailable_handler(ex: ServiceException):
+        return ServiceExceptionSchema().dump(ex), 503
+
     @app.route('/', methods=['get'])
     def index():
         return render_template("index.html")
@@ -36,11 +119,13 @@ def create_app():
     def debug():
         schema = DebugSchema()
         try:
-            data = PascalService.debug(
-                schema.load(request.get_json())
-            )
+            data = schema.load(request.get_json())
+            with admission.admit():
+                data = PascalService.debug(data)
         except ValidationError as ex:
             abort(400, ex)
+        except AdmissionException as ex:
+            abort(429, ex)
         except ServiceException as ex:
             abort(500, ex)
         else:
@@ -50,15 +135,107 @@ def create_app():
     def testing():
         schema = TestsSchema()
         try:
-            data = PascalService.testing(
-                schema.load(request.get_json())
+            data = schema.load(request.get_json())
+            with admission.admit():
+                data = PascalService.testing(data)
+        except ValidationError as ex:
+            abort(400, ex)
+        except AdmissionException as ex:
+            abort(429, ex)
+        except ServiceException as ex:
+            abort(500, ex)
+        else:
+            return schema.dump(data)
+
+    @app.route('/testing/stream/', methods=['post'])
+    def testing_stream():
+        try:
+            data = TestsSchema().load(request.get_json())
+            slot = admission.acquire()
+        except ValidationError as ex:
+            abort(400, ex)
+        except AdmissionException as ex:
+            abort(429, ex)
+        else:
+            response = Response(
+                stream_with_context(testing_stream_events(data)),
+                mimetype='application/x-ndjson'
             )
+            response.call_on_close(lambda: admission.release(slot))
+            return response
+
+    @app.route('/batch/testing/', methods=['post'])
+    def batch_testing():
+        schema = BatchTestsSchema()
+        try:
+            data = schema.load(request.get_json())
+            with admission.admit():
+                data = PascalService.batch_testing(data)
         except ValidationError as ex:
             abort(400, ex)
+        except AdmissionException as ex:
+            abort(429, ex)
         except ServiceException as ex:
             abort(500, ex)
         else:
             return schema.dump(data)
+
+    @app.route('/suites/', methods=['post'])
+    def register_suite():
+        schema = SuiteSchema()
+        try:
+            data = schema.load(request.get_json())
+            data = PascalService.register_suite(data)
+        except ValidationError as ex:
+            abort(400, ex)
+        except ServiceException as ex:
+            abort(500, ex)
+        else:
+            return schema.dump(data), 201
+
+    @app.route('/suites/<suite_id>/', methods=['get'])
+    def get_suite(suite_id: str):
+        suite = suite_registry.get(suite_id)
+        if suite is None:
+            return {'error': messages.MSG_18, 'details': None}, 404
+        return {'id': suite_id, 'num': len(suite.values)}
+
+    @app.route('/jobs/', methods=['post'])
+    def submit_job():
+        try:
+            data = JobSubmitSchema().load(request.get_json())
+            job = job_queue.submit(data['type'], data['data'])
+        except ValidationError as ex:
+            abort(400, ex)
+        except JobQueueFull:
+            abort(503, ServiceException(messages.MSG_10))
+        else:
+            return JobSchema().dump(job), 202
+
+    @app.route('/jobs/<job_id>/', methods=['get'])
+    def get_job(job_id: str):
+        job = job_queue.get(job_id)
+        if job is None:
+            return {'error': messages.MSG_11, 'details': None}, 404
+        return JobSchema().dump(job)
+
+    @app.route('/stats/', methods=['get'])
+    def stats():
+        return {
+            'compile_cache': compile_cache.stats(),
+            'result_cache': result_cache.stats(),
+            'jobs': job_queue.stats(),
+            'workspace': workspace.usage(),
+            'admission': admission.stats(),
+            'suites': suite_registry.stats(),
+        }
+
+    @app.route('/metrics', methods=['get'])
+    def metrics_view():
+        return Response(
+            metrics.generate(),
+            content_type=metrics.CONTENT_TYPE
+        )
     return app
 
 
@@ -1,7 +1,9 @@
 MSG_1 = 'Program execution time limit exceeded. Limit 5 seconds!'
 MSG_2 = (
     'Checker func should starts with:\n'
-    '"def checker(right_value: str, value: str) -> bool:"'
+    '"def checker(right_value: str, value: str) -> bool:"\n'
+    'or for a batch checker:\n'
+    '"def checker(pairs: list) -> list:"'
 )
 MSG_3 = 'Checker func has no "return" instruction'
 MSG_4 = 'Checker must return a boolean value'
@@ -9,3 +11,15 @@ MSG_5 = 'Invalid checker call. See details'
 MSG_6 = 'Unexpected error during code execution. See details'
 MSG_7 = 'Compilation error. See details'
 MSG_8 = 'You need to specify the console input'
+MSG_9 = 'Test skipped because a previous test failed'
+MSG_10 = 'Job queue is full. Try again later'
+MSG_11 = 'Job not found'
+MSG_12 = 'Sandbox workspace is full. Try again later'
+MSG_13 = 'Program CPU time limit exceeded'
+MSG_14 = 'Output limit exceeded'
+MSG_15 = 'Service is overloaded. Try again later'
+MSG_16 = 'Batch checker must return a list of booleans, one per test'
+MSG_17 = 'Checker time limit exceeded'
+MSG_18 = 'Test suite not found'
+# MSG_1 для ограничения времени выполнения, заданного в запросе
+MSG_19 = 'Program execution time limit exceeded. Limit {:g} seconds!'
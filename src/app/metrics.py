@@ -0,0 +1,166 @@
+import os
+import re
+from app import config
+
+if config.METRICS_ENABLED:
+    # Режим multiprocess prometheus_client включается переменной
+    # окружения, которая читается при импорте библиотеки: каждый
+    # воркер gunicorn пишет значения в свои файлы <тип>_<pid>.db
+    # в METRICS_DIR, MultiProcessCollector суммирует файлы всех воркеров
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = config.METRICS_DIR
+    os.makedirs(config.METRICS_DIR, exist_ok=True)
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+LIVE_GAUGE_FILE = re.compile(r'^gauge_live\w*?_(\d+)\.db$')
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_dead_workers(directory: str):
+
+    """ Удаляет файлы gauge завершившихся процессов, чтобы их
+        значения не учитывались. Файлы счетчиков и гистограмм
+        остаются: их значения продолжают суммироваться """
+
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    pids = set()
+    for name in names:
+        match = LIVE_GAUGE_FILE.match(name)
+        if match is not None:
+            pids.add(int(match.group(1)))
+    for pid in pids:
+        if is_alive(pid):
+            continue
+        try:
+            multiprocess.mark_process_dead(pid, directory)
+        except FileNotFoundError:
+            # Файлы уже удалил параллельный запрос /metrics
+            pass
+
+
+def collect(directory: str) -> bytes:
+
+    """ Метрики всех процессов, пишущих в directory """
+
+    remove_dead_workers(directory)
+    collector_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collector_registry, path=directory)
+    return generate_latest(collector_registry)
+
+
+def generate() -> bytes:
+
+    """ Метрики в текстовом формате Prometheus: суммы по всем
+        воркерам или, если METRICS_ENABLED выключен, значения
+        текущего процесса """
+
+    if config.METRICS_ENABLED:
+        return collect(config.METRICS_DIR)
+    return generate_latest(registry)
+
+
+if config.METRICS_ENABLED:
+    # Файлы gauge от процесса прошлого запуска с тем же pid
+    multiprocess.mark_process_dead(os.getpid(), config.METRICS_DIR)
+
+registry = CollectorRegistry()
+
+REQUEST_TIME = Histogram(
+    'pascal_request_duration_seconds',
+    'HTTP request latency',
+    labelnames=('endpoint',),
+    registry=registry
+)
+COMPILE_TIME = Histogram(
+    'pascal_compile_duration_seconds',
+    'Compilation time, compile cache hits excluded',
+    registry=registry
+)
+EXECUTE_TIME = Histogram(
+    'pascal_execute_duration_seconds',
+    'Program run time, result cache hits excluded',
+    registry=registry
+)
+CHECKER_TIME = Histogram(
+    'pascal_checker_duration_seconds',
+    'Checker call time',
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+    registry=registry
+)
+TIMEOUTS = Counter(
+    'pascal_timeouts_total',
+    'Compilations, runs and checker calls killed by a time limit',
+    labelnames=('phase', 'limit'),
+    registry=registry
+)
+OUTPUT_OVERFLOWS = Counter(
+    'pascal_output_limit_exceeded_total',
+    'Runs killed because the output exceeded OUTPUT_LIMIT',
+    registry=registry
+)
+STREAM_MISMATCHES = Counter(
+    'pascal_stream_check_mismatches_total',
+    'Runs killed on the first output mismatch by the streaming checker',
+    registry=registry
+)
+COMPILE_ERRORS = Counter(
+    'pascal_compile_errors_total',
+    'Compilations finished with an error',
+    registry=registry
+)
+CHECKER_ERRORS = Counter(
+    'pascal_checker_errors_total',
+    'Invalid checkers and checker calls finished with an error',
+    registry=registry
+)
+IN_FLIGHT = Gauge(
+    'pascal_in_flight',
+    'Requests and /jobs/ jobs in progress',
+    labelnames=('source',),
+    multiprocess_mode='livesum',
+    registry=registry
+)
+ADMISSION_ACTIVE = Gauge(
+    'pascal_admission_active',
+    'Requests admitted by the admission controller and in progress',
+    multiprocess_mode='livesum',
+    registry=registry
+)
+ADMISSION_QUEUED = Gauge(
+    'pascal_admission_queued',
+    'Requests waiting in the admission queue',
+    multiprocess_mode='livesum',
+    registry=registry
+)
+ADMISSION_REJECTIONS = Counter(
+    'pascal_admission_rejections_total',
+    'Requests rejected with 429, reason: queue_full | timeout',
+    labelnames=('reason',),
+    registry=registry
+)
+HOST_FALLBACKS = Counter(
+    'pascal_execution_host_fallbacks_total',
+    'Runs restarted in a separate process after an execution host failure',
+    registry=registry
+)
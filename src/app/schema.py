@@ -5,17 +5,33 @@ from marshmallow.fields import (
     Field,
     Boolean,
     Integer,
+    Float,
+    String,
+    Dict,
+    Raw,
     Method
 )
+from marshmallow.validate import OneOf, Range
 from marshmallow.decorators import (
     post_load,
-    pre_dump
+    pre_dump,
+    post_dump,
+    validates_schema
 )
 from app.entities import (
     DebugData,
     TestData,
-    TestsData
+    TestsData,
+    BatchTestsData,
+    SubmissionData,
+    SuiteData,
+    CheckerPreset,
+    ResourceLimits,
+    LimitsData
 )
+from app import config
+from app.service.checkers import PRESETS
+from app.service.suites import suite_registry
 from app.utils import clean_str
 from app.service.exceptions import ServiceException
 
@@ -29,7 +45,83 @@ class StrField(Field):
         return clean_str(value)
 
 
-class DebugSchema(Schema):
+class OptionalFieldsMixin:
+
+    """ Поля optional_fields не выводятся, если значение не задано """
+
+    optional_fields = ()
+
+    @post_dump
+    def remove_empty_optional_fields(self, data, **kwargs):
+        for name in self.optional_fields:
+            if data.get(name) is None:
+                data.pop(name, None)
+        return data
+
+
+class CheckerPresetSchema(Schema):
+
+    preset = String(required=True, validate=OneOf(PRESETS.keys()))
+    eps = Float(validate=Range(min=0))
+
+    @post_load
+    def make_checker_preset(self, data, **kwargs) -> CheckerPreset:
+        return CheckerPreset(**data)
+
+
+class CheckerField(Field):
+
+    """ Код функции checker или встроенная функция проверки:
+        {"preset": "float", "eps": 1e-6} """
+
+    def _deserialize(self, value, *args, **kwargs):
+        if isinstance(value, dict):
+            return CheckerPresetSchema().load(value)
+        if isinstance(value, str):
+            return clean_str(value)
+        raise ValidationError('Not a valid checker.')
+
+
+class UsageSchema(Schema):
+
+    """ Затраченные процессом ресурсы: время в секундах,
+        пиковый объем памяти в килобайтах """
+
+    wall_time = Float()
+    cpu_time = Float()
+    max_rss = Integer()
+
+
+class ResourceLimitsSchema(Schema):
+
+    """ Ограничения ресурсов фазы, не больше максимальных из настроек """
+
+    cpu_time = Float(validate=Range(
+        min=0, min_inclusive=False, max=config.LIMITS_MAX_CPU_TIME
+    ))
+    wall_time = Float(validate=Range(
+        min=0, min_inclusive=False, max=config.LIMITS_MAX_WALL_TIME
+    ))
+    memory = Integer(validate=Range(min=1, max=config.LIMITS_MAX_MEMORY))
+
+    @post_load
+    def make_resource_limits(self, data, **kwargs) -> ResourceLimits:
+        return ResourceLimits(**data)
+
+
+class LimitsSchema(Schema):
+
+    compile = Nested(ResourceLimitsSchema)
+    execute = Nested(ResourceLimitsSchema)
+
+    @post_load
+    def make_limits_data(self, data, **kwargs) -> LimitsData:
+        return LimitsData(**data)
+
+
+class DebugSchema(OptionalFieldsMixin, Schema):
+
+    optional_fields = ('cached', 'usage', 'compile_usage')
 
     data_in = StrField(
         required=False,
@@ -39,36 +131,79 @@ class DebugSchema(Schema):
     code = StrField(required=True, load_only=True)
     result = StrField(dump_only=True)
     error = StrField(dump_only=True)
+    cached = Boolean(dump_only=True)
+    resources = Boolean(load_only=True)
+    limits = Nested(LimitsSchema, load_only=True)
+    usage = Nested(UsageSchema, dump_only=True)
+    compile_usage = Nested(UsageSchema, dump_only=True)
 
     @post_load
     def make_debug_data(self, data, **kwargs) -> DebugData:
         return DebugData(**data)
 
 
-class TestSchema(Schema):
+class TestSchema(OptionalFieldsMixin, Schema):
+
+    optional_fields = ('cached', 'usage', 'mismatch')
 
     data_in = StrField(load_only=True)
     data_out = StrField(required=True, load_only=True)
     result = StrField(dump_only=True)
     error = StrField(dump_only=True)
     ok = Boolean(dump_only=True)
+    cached = Boolean(dump_only=True)
+    usage = Nested(UsageSchema, dump_only=True)
+    mismatch = Integer(dump_only=True)
 
     @post_load
     def make_test_data(self, data, **kwargs) -> TestData:
         return TestData(**data)
 
 
-class TestsSchema(Schema):
+class TestsSchema(OptionalFieldsMixin, Schema):
 
-    tests = Nested(TestSchema, many=True, required=True)
-    checker = StrField(load_only=True, required=True)
+    """ Тесты и checker передаются в запросе
+        или берутся из зарегистрированного набора suite """
+
+    optional_fields = ('compile_usage',)
+
+    tests = Nested(TestSchema, many=True)
+    checker = CheckerField(load_only=True)
+    suite = String(load_only=True)
     code = StrField(load_only=True, required=True)
+    fail_fast = Boolean(load_only=True)
+    resources = Boolean(load_only=True)
+    limits = Nested(LimitsSchema, load_only=True)
     num = Integer(dump_only=True)
     num_ok = Integer(dump_only=True)
     ok = Boolean(dump_only=True)
+    compile_usage = Nested(UsageSchema, dump_only=True)
+
+    @validates_schema
+    def validate_tests(self, data, **kwargs):
+        if 'suite' in data:
+            extra = [name for name in ('tests', 'checker') if name in data]
+            if extra:
+                raise ValidationError({
+                    name: ['Not allowed with suite.'] for name in extra
+                })
+            return
+        missing = [name for name in ('tests', 'checker') if name not in data]
+        if missing:
+            raise ValidationError({
+                name: ['Missing data for required field.']
+                for name in missing
+            })
 
     @post_load
     def make_tests_data(self, data, **kwargs) -> TestsData:
+        suite_id = data.pop('suite', None)
+        if suite_id is not None:
+            suite = suite_registry.get(suite_id)
+            if suite is None:
+                raise ValidationError('Unknown test suite.', 'suite')
+            data['tests'] = suite.create_tests()
+            data['checker'] = suite.checker
         return TestsData(**data)
 
     @pre_dump
@@ -81,6 +216,86 @@ class TestsSchema(Schema):
         return data
 
 
+class SuiteSchema(Schema):
+
+    tests = Nested(TestSchema, many=True, required=True, load_only=True)
+    checker = CheckerField(load_only=True, required=True)
+    id = String(dump_only=True)
+    num = Integer(dump_only=True)
+
+    @post_load
+    def make_suite_data(self, data, **kwargs) -> SuiteData:
+        return SuiteData(**data)
+
+
+class SubmissionSchema(Schema):
+
+    code = StrField(required=True)
+
+    @post_load
+    def make_submission_data(self, data, **kwargs) -> SubmissionData:
+        return SubmissionData(**data)
+
+
+class BatchTestsSchema(Schema):
+
+    tests = Nested(TestSchema, many=True, required=True, load_only=True)
+    checker = CheckerField(load_only=True, required=True)
+    fail_fast = Boolean(load_only=True)
+    limits = Nested(LimitsSchema, load_only=True)
+    submissions = Nested(
+        SubmissionSchema,
+        many=True,
+        required=True,
+        load_only=True
+    )
+    results = Method('dump_results', dump_only=True)
+
+    @post_load
+    def make_batch_tests_data(self, data, **kwargs) -> BatchTestsData:
+        return BatchTestsData(**data)
+
+    def dump_results(self, data: BatchTestsData):
+        results = []
+        for result in data.results:
+            if isinstance(result, ServiceException):
+                results.append({
+                    'error': result.message,
+                    'details': result.details
+                })
+            else:
+                results.append(TestsSchema().dump(result))
+        return results
+
+
+class JobSubmitSchema(Schema):
+
+    type = String(required=True, validate=OneOf(('debug', 'testing')))
+    data = Dict(required=True)
+
+    data_schemas = {
+        'debug': DebugSchema,
+        'testing': TestsSchema,
+    }
+
+    @post_load
+    def load_data(self, data, **kwargs) -> dict:
+        schema = self.data_schemas[data['type']]()
+        try:
+            data['data'] = schema.load(data['data'])
+        except ValidationError as ex:
+            raise ValidationError({'data': ex.messages})
+        return data
+
+
+class JobSchema(Schema):
+
+    id = String()
+    type = String()
+    status = String()
+    result = Raw()
+
+
 class BadRequestSchema(Schema):
 
     error = Method('dump_error')
@@ -0,0 +1,190 @@
+import os
+import time
+import fcntl
+import random
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from app import config, metrics
+from app.service import exceptions
+
+
+class AdmissionController:
+
+    """ Ограничивает количество одновременно выполняемых запросов.
+        Запрос, которому не хватило места, ждет в очереди не дольше
+        max_wait секунд, а при заполненной очереди сразу получает отказ
+        (AdmissionException, ответ 429 с Retry-After).
+        Места и очередь - файлы с блокировкой flock, общие для всех
+        воркеров gunicorn. Блокировки процесса снимаются ядром
+        при его завершении, поэтому места не теряются """
+
+    poll_interval = 0.02
+
+    def __init__(
+        self,
+        directory: str,
+        limit: int,
+        queue_size: int,
+        max_wait: float,
+        retry_after: int
+    ):
+        self.directory = directory
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def _lock_any(self, kind: str, count: int) -> Optional[int]:
+
+        """ Блокирует любой свободный файл из count файлов kind-N.
+            Возвращает его дескриптор или None, если все заняты """
+
+        if not self._ready:
+            os.makedirs(self.directory, exist_ok=True)
+            self._ready = True
+        start = random.randrange(count)
+        for number in range(count):
+            path = os.path.join(
+                self.directory, f'{kind}-{(start + number) % count}'
+            )
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return fd
+        return None
+
+    @staticmethod
+    def _unlock(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def _reject(self, reason: str):
+        with self._lock:
+            self.rejected += 1
+            if reason == 'timeout':
+                self.timeouts += 1
+        metrics.ADMISSION_REJECTIONS.labels(reason=reason).inc()
+        raise exceptions.AdmissionException(retry_after=self.retry_after)
+
+    def _enqueue(self) -> int:
+
+        """ Занимает место в очереди или отказывает в запросе """
+
+        queue_fd = None
+        if self.queue_size > 0:
+            queue_fd = self._lock_any('queue', self.queue_size)
+        if queue_fd is None:
+            self._reject('queue_full')
+        with self._lock:
+            self.queued += 1
+        metrics.ADMISSION_QUEUED.inc()
+        return queue_fd
+
+    def _dequeue(self, queue_fd: int):
+        with self._lock:
+            self.queued -= 1
+        metrics.ADMISSION_QUEUED.dec()
+        self._unlock(queue_fd)
+
+    def _admit(self, fd: Optional[int]) -> int:
+        if fd is None:
+            self._reject('timeout')
+        with self._lock:
+            self.active += 1
+            self.admitted += 1
+        metrics.ADMISSION_ACTIVE.inc()
+        return fd
+
+    def acquire(self) -> Optional[int]:
+
+        """ Занимает место для запроса, ожидая в очереди.
+            Возвращает значение для release (None без ограничения) """
+
+        if not self.enabled:
+            return None
+        fd = self._lock_any('slot', self.limit)
+        if fd is None:
+            queue_fd = self._enqueue()
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while fd is None and time.monotonic() < deadline:
+                    time.sleep(self.poll_interval)
+                    fd = self._lock_any('slot', self.limit)
+            finally:
+                self._dequeue(queue_fd)
+        return self._admit(fd)
+
+    async def acquire_async(self) -> Optional[int]:
+
+        """ acquire для asyncio: ожидание не блокирует цикл событий """
+
+        if not self.enabled:
+            return None
+        fd = self._lock_any('slot', self.limit)
+        if fd is None:
+            queue_fd = self._enqueue()
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while fd is None and time.monotonic() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+                    fd = self._lock_any('slot', self.limit)
+            finally:
+                self._dequeue(queue_fd)
+        return self._admit(fd)
+
+    def release(self, fd: Optional[int]):
+        if fd is None:
+            return
+        with self._lock:
+            self.active -= 1
+        metrics.ADMISSION_ACTIVE.dec()
+        self._unlock(fd)
+
+    @contextmanager
+    def admit(self):
+        fd = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(fd)
+
+    def stats(self) -> dict:
+
+        """ Состояние в текущем воркере. Сумма по всем
+            воркерам - в метриках pascal_admission_* """
+
+        return {
+            'limit': self.limit,
+            'queue_size': self.queue_size,
+            'max_wait': self.max_wait,
+            'active': self.active,
+            'queued': self.queued,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+        }
+
+
+admission = AdmissionController(
+    directory=config.ADMISSION_DIR,
+    limit=config.ADMISSION_LIMIT,
+    queue_size=config.ADMISSION_QUEUE_SIZE,
+    max_wait=config.ADMISSION_MAX_WAIT,
+    retry_after=config.ADMISSION_RETRY_AFTER
+)
@@ -0,0 +1,414 @@
+import time
+import asyncio
+import subprocess
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    Union
+)
+from app import config, messages
+from app.entities import (
+    DebugData,
+    TestData,
+    TestsData,
+    BatchTestsData,
+    ResourceLimits,
+)
+from app.service import exceptions
+from app.service.main import PascalService
+from app.service.entities import ExecuteResult, PascalFile, ResourceUsage
+from app.service.resources import (
+    RusagePopen,
+    get_usage,
+    get_limits,
+    cpu_limit_exceeded,
+    get_timeout_error,
+    is_timeout_error
+)
+from app.service.cache import compile_cache, result_cache, is_deterministic
+from app.service.hosts import compiler_pool, HostException
+from app.service.checkers import BatchChecker, StreamComparator
+from app.service.output import communicate_async, wait_async
+from app.service.toolchains import toolchain
+
+
+async def to_thread(func: Callable, *args, **kwargs) -> Any:
+
+    """ Выполняет блокирующую функцию (файлы, пул компилятора,
+        функции checker) в пуле потоков цикла событий """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+
+class AsyncPascalService:
+
+    """ PascalService для asyncio: компилятор и программы запускаются
+        без блокировки потока, каналы процессов и ограничения времени
+        обслуживает цикл событий. Проверка результатов, кэши
+        и обработка ошибок - общие с PascalService. Функции checker
+        и работа с файлами выполняются в пуле потоков, чтобы медленная
+        функция checker не останавливала остальные запросы """
+
+    @classmethod
+    async def _finish(cls, proc: subprocess.Popen, started: float):
+
+        """ Уничтожает процесс и возвращает затраченные им ресурсы """
+
+        proc.kill()
+        try:
+            await wait_async(proc, timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        return get_usage(proc, started)
+
+    @classmethod
+    async def _run_compiler(
+        cls,
+        file: PascalFile,
+        limits: ResourceLimits
+    ):
+        result, error = None, None
+        started = time.monotonic()
+        proc = RusagePopen(
+            args=toolchain.get_compile_args(
+                file.filepath_pas,
+                file.filepath_exe
+            ),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            preexec_fn=PascalService._get_preexec_fn(limits, sandbox=False)
+        )
+        try:
+            result, error, _ = await communicate_async(
+                proc,
+                None,
+                timeout=limits.wall_time,
+                limit=config.OUTPUT_LIMIT,
+                head_size=config.OUTPUT_HEAD_SIZE
+            )
+        except subprocess.TimeoutExpired:
+            error = get_timeout_error('compile', limits)
+        except Exception as ex:
+            error = str(ex)
+        finally:
+            file.compile_usage = await cls._finish(proc, started)
+        if cpu_limit_exceeded(proc, file.compile_usage, limits):
+            result, error = None, messages.MSG_13
+        return result, error
+
+    @classmethod
+    async def _compile(
+        cls,
+        file: PascalFile,
+        limits: Optional[ResourceLimits] = None
+    ) -> Optional[str]:
+        cache_key = None
+        if config.COMPILE_CACHE_ENABLED:
+            cache_key = compile_cache.get_key(file.code)
+            if await to_thread(
+                compile_cache.restore, cache_key, file.filepath_exe
+            ):
+                await to_thread(file.update_usage)
+                return None
+
+        limits = limits or get_limits('compile')
+        result, error = None, None
+        started = time.monotonic()
+        if toolchain.hosts_enabled:
+            try:
+                result = await to_thread(
+                    compiler_pool.compile,
+                    file.filepath_pas,
+                    timeout=limits.wall_time
+                )
+            except subprocess.TimeoutExpired:
+                error = get_timeout_error('compile', limits)
+            except HostException:
+                result, error = await cls._run_compiler(file, limits)
+            else:
+                file.compile_usage = ResourceUsage(
+                    wall_time=time.monotonic() - started
+                )
+        else:
+            result, error = await cls._run_compiler(file, limits)
+        return await to_thread(
+            PascalService._get_compile_error,
+            file, result, error, started, cache_key
+        )
+
+    @classmethod
+    async def _run_program(
+        cls,
+        file: PascalFile,
+        data_in: Optional[str] = None,
+        limits: Optional[ResourceLimits] = None,
+        comparator: Optional[StreamComparator] = None
+    ) -> ExecuteResult:
+        limits = limits or get_limits('execute')
+        result, error, usage = None, None, None
+        started = time.monotonic()
+        proc = RusagePopen(
+            args=toolchain.get_execute_args(file.filepath_exe),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            preexec_fn=PascalService._get_preexec_fn(limits)
+        )
+        overflow = False
+        try:
+            result, error, overflow = await communicate_async(
+                proc,
+                data_in,
+                timeout=limits.wall_time,
+                limit=config.OUTPUT_LIMIT,
+                head_size=config.OUTPUT_HEAD_SIZE,
+                tail_size=config.OUTPUT_TAIL_SIZE,
+                comparator=comparator
+            )
+        except subprocess.TimeoutExpired:
+            error = get_timeout_error('execute', limits)
+        except Exception as ex:
+            error = str(ex)
+        finally:
+            usage = await cls._finish(proc, started)
+        return PascalService._get_execute_result(
+            result, error, overflow,
+            cpu_limit_exceeded(proc, usage, limits),
+            usage, comparator, started
+        )
+
+    @classmethod
+    async def _execute(
+        cls,
+        file: PascalFile,
+        data_in: Optional[str] = None,
+        limits: Optional[ResourceLimits] = None,
+        comparator: Optional[StreamComparator] = None
+    ) -> ExecuteResult:
+        limits = limits or get_limits('execute')
+        cache_key = None
+        if config.RESULT_CACHE_ENABLED and is_deterministic(file.code):
+            cache_key = result_cache.get_key(
+                compile_cache.get_key(file.code), data_in, limits
+            )
+            exec_result = result_cache.get(cache_key)
+            if exec_result is not None:
+                return exec_result._replace(cached=True, usage=None)
+        exec_result = await cls._run_program(
+            file=file,
+            data_in=data_in,
+            limits=limits,
+            comparator=comparator
+        )
+        if cache_key and exec_result.mismatch is None \
+                and exec_result.error != messages.MSG_13 \
+                and not is_timeout_error(exec_result.error):
+            result_cache.put(cache_key, exec_result)
+        return exec_result
+
+    @classmethod
+    async def debug(cls, data: DebugData) -> DebugData:
+        file = await to_thread(PascalFile, data.code)
+        try:
+            error = await cls._compile(
+                file, get_limits('compile', data.limits)
+            )
+            if error:
+                data.error = error
+            else:
+                exec_result = await cls._execute(
+                    file=file,
+                    data_in=data.data_in,
+                    limits=get_limits('execute', data.limits)
+                )
+                data.result = exec_result.result
+                data.error = exec_result.error
+                data.cached = exec_result.cached or None
+                if data.resources:
+                    data.usage = exec_result.usage
+            if data.resources:
+                data.compile_usage = file.compile_usage
+        finally:
+            await to_thread(file.remove)
+        return data
+
+    @classmethod
+    async def _run_tests(
+        cls,
+        file: PascalFile,
+        tests: List[TestData],
+        checker: Callable[[str, str], Any],
+        fail_fast: bool = False,
+        resources: bool = False,
+        limits: Optional[ResourceLimits] = None,
+        checker_func: Any = None
+    ) -> AsyncIterator[int]:
+
+        """ Запускает программу на тестах, не более TESTING_WORKERS
+            (TESTING_MAX_WORKERS_PER_REQUEST) тестов одновременно.
+            При fail_fast тесты после первого непройденного
+            отменяются и помечаются пропущенными.
+            Асинхронный генератор индексов тестов в порядке
+            проверки, затем индексов пропущенных тестов """
+
+        limit = max(min(
+            config.TESTING_WORKERS,
+            config.TESTING_MAX_WORKERS_PER_REQUEST
+        ), 1)
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(index: int):
+            async with semaphore:
+                return index, await cls._execute(
+                    file=file,
+                    data_in=tests[index].data_in,
+                    limits=limits,
+                    comparator=PascalService._get_comparator(
+                        checker_func, tests[index]
+                    )
+                )
+
+        tasks = [
+            asyncio.ensure_future(run(index)) for index in range(len(tests))
+        ]
+        pending = set(tasks)
+        failed_index = len(tests)
+        checked = set()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    index, exec_result = task.result()
+                    if index > failed_index:
+                        continue
+                    ok = await to_thread(
+                        PascalService._set_test_result,
+                        tests[index], exec_result, checker, resources
+                    )
+                    checked.add(index)
+                    if fail_fast and not ok and index < failed_index:
+                        failed_index = index
+                        for other in tasks[index + 1:]:
+                            other.cancel()
+                    yield index
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        # Тесты после непройденного, проверенные раньше него,
+        # не пропускаются
+        skipped = [
+            index for index in range(failed_index + 1, len(tests))
+            if index not in checked
+        ]
+        PascalService._skip_tests([tests[index] for index in skipped])
+        for index in skipped:
+            yield index
+
+    @classmethod
+    async def testing_events(
+        cls,
+        data: TestsData
+    ) -> AsyncIterator[Tuple[str, Optional[int]]]:
+
+        """ Асинхронный генератор событий тестирования,
+            как PascalService.testing_events. Если генератор
+            не дочитан, его нужно закрыть (aclose) """
+
+        file = await to_thread(PascalFile, data.code)
+        try:
+            data.error = await cls._compile(
+                file, get_limits('compile', data.limits)
+            )
+            if data.resources:
+                data.compile_usage = file.compile_usage
+            yield 'compile', None
+            if data.error:
+                for index, test in enumerate(data.tests):
+                    test.error = data.error
+                    test.ok = False
+                    yield 'test', index
+            else:
+                await to_thread(PascalService._precompile, file, data.tests)
+                checker = await to_thread(
+                    PascalService._get_checker, data.checker
+                )
+                indexes = cls._run_tests(
+                    file=file,
+                    tests=data.tests,
+                    checker=checker,
+                    fail_fast=data.fail_fast,
+                    resources=data.resources,
+                    limits=get_limits('execute', data.limits),
+                    checker_func=data.checker
+                )
+                if isinstance(checker, BatchChecker):
+                    indexes = [index async for index in indexes]
+                    await to_thread(
+                        PascalService._check_batch, checker, data.tests
+                    )
+                    for index in indexes:
+                        yield 'test', index
+                else:
+                    try:
+                        async for index in indexes:
+                            yield 'test', index
+                    finally:
+                        await indexes.aclose()
+        finally:
+            await to_thread(file.remove)
+
+    @classmethod
+    async def testing(cls, data: TestsData) -> TestsData:
+        async for _ in cls.testing_events(data):
+            pass
+        return data
+
+    @classmethod
+    async def _testing_submission(
+        cls,
+        data: BatchTestsData,
+        code: str,
+        semaphore: asyncio.Semaphore
+    ) -> Union[TestsData, exceptions.ServiceException]:
+        async with semaphore:
+            try:
+                return await cls.testing(
+                    TestsData(
+                        code=code,
+                        checker=data.checker,
+                        fail_fast=data.fail_fast,
+                        limits=data.limits,
+                        tests=[
+                            TestData(
+                                data_in=test.data_in,
+                                data_out=test.data_out
+                            )
+                            for test in data.tests
+                        ]
+                    )
+                )
+            except exceptions.ServiceException as ex:
+                return ex
+            except Exception as ex:
+                return exceptions.ExecutionException(details=str(ex))
+
+    @classmethod
+    async def batch_testing(cls, data: BatchTestsData) -> BatchTestsData:
+        await to_thread(PascalService._get_checker, data.checker)
+        semaphore = asyncio.Semaphore(config.BATCH_WORKERS)
+        data.results = list(await asyncio.gather(*(
+            cls._testing_submission(data, submission.code, semaphore)
+            for submission in data.submissions
+        )))
+        return data
@@ -0,0 +1,63 @@
+import os
+import glob
+import fcntl
+import threading
+import subprocess
+from typing import Optional
+from app import config
+
+AOT_SUFFIX = '.so'
+
+
+def get_aot_path(path: str) -> str:
+
+    """ Mono сам подхватывает AOT-образ <сборка>.so,
+        лежащий рядом со сборкой """
+
+    return path + AOT_SUFFIX
+
+
+def aot_compile(path: str, timeout: Optional[float] = None) -> bool:
+
+    """ AOT-компилирует сборку, возвращает True при успехе """
+
+    option = f'--aot={config.AOT_OPTIONS}' if config.AOT_OPTIONS else '--aot'
+    try:
+        proc = subprocess.run(
+            args=['mono', option, path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return proc.returncode == 0 and os.path.exists(get_aot_path(path))
+
+
+def precompile_toolchain(directory: str):
+
+    """ AOT-компилирует сборки компилятора PascalABC.NET и PABCRtl,
+        для которых еще нет AOT-образа.
+        Воркеры gunicorn выполняют это по очереди под файловой блокировкой,
+        поэтому каждая сборка компилируется один раз """
+
+    paths = sorted(
+        glob.glob(os.path.join(directory, '**', '*.dll'), recursive=True)
+        + glob.glob(os.path.join(directory, '*.exe'))
+    )
+    with open(os.path.join(directory, '.aot.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        for path in paths:
+            if not os.path.exists(get_aot_path(path)):
+                aot_compile(path)
+
+
+def start_toolchain_precompilation() -> threading.Thread:
+    thread = threading.Thread(
+        target=precompile_toolchain,
+        args=(config.AOT_TOOLCHAIN_DIR,),
+        name='aot',
+        daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,288 @@
+import os
+import re
+import uuid
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+from app import config
+from app.service.entities import ExecuteResult
+from app.service.toolchains import toolchain
+
+# Случайные числа, время, потоки, файлы, окружение и хэш-коды
+# объектов, обращения к .NET (System.) и подключение сборок
+NONDETERMINISTIC = re.compile(
+    r'\b(random\w*|\w*milliseconds\w*|\w*datetime\w*|now|today|'
+    r'\w*ticks\w*|\w*timer\w*|\w*guid\w*|environment\w*|getenv|'
+    r'stopwatch|\w*thread\w*|task\w*|parallel\w*|async|await|'
+    r'assign\w*|reset|rewrite|append|file\w*|openread|\w*readall\w*|'
+    r'readlines|exec\w*|process\w*|\w*hashcode\w*)\b'
+    r'|\bsystem\s*\.|\{\$(reference|include|resource)',
+    re.IGNORECASE
+)
+USES = re.compile(r'\buses\b([^;]*)', re.IGNORECASE)
+# Модули, которые можно подключать в кэшируемых программах
+DETERMINISTIC_UNITS = frozenset({'crt'})
+
+
+def normalize_code(code: str) -> str:
+
+    """ Приводит код программы к каноническому виду.
+        Не меняет номера строк и позиции символов,
+        чтобы сообщения об ошибках времени выполнения
+        совпадали с исходным кодом """
+
+    code = code.replace('\ufeff', '').replace('\r', '')
+    return '\n'.join(line.rstrip() for line in code.split('\n')).rstrip('\n')
+
+
+class CompileCache:
+
+    """ LRU-кэш скомпилированных программ на диске.
+        Ключ - хэш нормализованного кода и версии компилятора """
+
+    suffix = '.exe'
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        max_entries: int,
+        compiler_path: str
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.compiler_path = compiler_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._compiler_version = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def compiler_version(self) -> str:
+        if self._compiler_version is None:
+            try:
+                stat = os.stat(self.compiler_path)
+            except OSError:
+                self._compiler_version = 'unknown'
+            else:
+                self._compiler_version = f'{stat.st_size}:{stat.st_mtime_ns}'
+        return self._compiler_version
+
+    def get_key(self, code: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.compiler_version.encode())
+        digest.update(b'\0')
+        digest.update(normalize_code(code).encode())
+        return digest.hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _load(self):
+
+        """ Восстанавливает индекс по файлам, оставшимся на диске
+            (например, от других воркеров или прошлого запуска) """
+
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name[:-len(self.suffix)]] = size
+            self._size += size
+        self._evict()
+
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or self._size > self.max_bytes
+        ):
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._get_path(key))
+            except OSError:
+                pass
+
+    def restore(self, key: str, filepath: str) -> bool:
+
+        """ Копирует программу из кэша в filepath.
+            Возвращает False при промахе """
+
+        path = self._get_path(key)
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    self.misses += 1
+                    return False
+                self._entries[key] = size
+                self._size += size
+            try:
+                _link_or_copy(path, filepath)
+            except OSError:
+                self._forget(key)
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def store(self, key: str, filepath: str):
+
+        """ Сохраняет скомпилированную программу в кэш """
+
+        path = self._get_path(key)
+        tmp_path = f'{path}.{uuid.uuid4()}.tmp'
+        with self._lock:
+            self._load()
+            try:
+                _link_or_copy(filepath, tmp_path)
+                os.replace(tmp_path, path)
+                size = os.path.getsize(path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+            self._forget(key)
+            self._entries[key] = size
+            self._size += size
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size,
+            }
+
+
+def is_deterministic(code: str) -> bool:
+
+    """ Программа не использует случайные числа, время
+        и другие источники, из-за которых результат
+        может отличаться от запуска к запуску. Проверка
+        консервативная: программа, подключающая модули
+        не из DETERMINISTIC_UNITS или обращающаяся к .NET
+        через System., считается недетерминированной,
+        даже если упоминание находится в строке или комментарии """
+
+    if NONDETERMINISTIC.search(code) is not None:
+        return False
+    for match in USES.finditer(code):
+        units = {unit.strip().lower() for unit in match.group(1).split(',')}
+        if not units <= DETERMINISTIC_UNITS:
+            return False
+    return True
+
+
+class ResultCache:
+
+    """ LRU-кэш результатов запуска программ в памяти воркера.
+        Ключ - хэш ключа программы (CompileCache.get_key: код
+        и версия компилятора) и входных данных. Хэш скомпилированной
+        программы не используется: компилятор создает новую сборку
+        (MVID) при каждой компиляции """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(
+        program_key: str,
+        data_in: Optional[str],
+        limits: Optional[Any] = None
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(program_key.encode())
+        if limits is not None:
+            digest.update(repr(limits).encode())
+        if data_in is not None:
+            digest.update(b'\0')
+            digest.update(data_in.encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _get_size(exec_result: ExecuteResult) -> int:
+        return len(exec_result.result or '') + len(exec_result.error or '')
+
+    def get(self, key: str) -> Optional[ExecuteResult]:
+        with self._lock:
+            exec_result = self._items.get(key)
+            if exec_result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+            return exec_result
+
+    def put(self, key: str, exec_result: ExecuteResult):
+        size = self._get_size(exec_result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._size -= self._get_size(previous)
+            self._items[key] = exec_result
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= self._get_size(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._items),
+                'bytes': self._size,
+            }
+
+
+def _link_or_copy(src: str, dst: str):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+compile_cache = CompileCache(
+    directory=config.COMPILE_CACHE_DIR,
+    max_bytes=config.COMPILE_CACHE_MAX_BYTES,
+    max_entries=config.COMPILE_CACHE_MAX_ENTRIES,
+    compiler_path=toolchain.compiler_path
+)
+
+result_cache = ResultCache(max_bytes=config.RESULT_CACHE_MAX_BYTES)
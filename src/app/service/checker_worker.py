@@ -0,0 +1,108 @@
+""" Процесс пула функций checker (hosts.CheckerHostPool).
+    Запускается как отдельный процесс и не импортирует app:
+
+        python checker_worker.py
+
+    Запрос - строка с длиной заголовка, заголовок в JSON
+    {"command": "compile" | "check" | "batch", "code": str, "sizes": [int]}
+    и следующие за ним значения в UTF-8 указанных размеров
+    (размер -1 - None). check получает right_value и value,
+    batch - пары (data_out, result) подряд.
+    Ответ - строка с длиной и JSON {"result": ...} или {"error": str}.
+    result - bool (список bool для batch) или null, если функция
+    вернула значение другого типа. Стандартные потоки перенаправляются
+    в /dev/null, чтобы вывод функции не смешивался с ответами """
+
+import os
+import sys
+import json
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+CACHE_SIZE = 64
+ENCODING = 'utf-8'
+ERRORS = 'surrogatepass'
+
+
+def open_channels() -> Tuple:
+
+    """ Каналы протокола - копии stdin и stdout,
+        сами stdin и stdout перенаправляются в /dev/null """
+
+    reader = os.fdopen(os.dup(0), 'rb')
+    writer = os.fdopen(os.dup(1), 'wb')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    return reader, writer
+
+
+def read_request(reader) -> Optional[Tuple[dict, List[Optional[str]]]]:
+    line = reader.readline()
+    if not line:
+        return None
+    header = json.loads(reader.read(int(line)))
+    values = []
+    for size in header['sizes']:
+        if size < 0:
+            values.append(None)
+        else:
+            values.append(reader.read(size).decode(ENCODING, ERRORS))
+    return header, values
+
+
+def write_response(writer, response: dict):
+    payload = json.dumps(response).encode()
+    writer.write(f'{len(payload)}\n'.encode() + payload)
+    writer.flush()
+
+
+def compile_checker(cache: OrderedDict, code: str) -> Callable:
+    checker = cache.get(code)
+    if checker is not None:
+        cache.move_to_end(code)
+        return checker
+    namespace = {'__name__': 'checker'}
+    exec(code, namespace)
+    checker = namespace['checker']
+    cache[code] = checker
+    while len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+    return checker
+
+
+def handle(cache: OrderedDict, header: dict, values: list) -> dict:
+    command = header['command']
+    try:
+        checker = compile_checker(cache, header['code'])
+        if command == 'compile':
+            return {'result': True}
+        if command == 'batch':
+            result = checker(list(zip(values[::2], values[1::2])))
+            if not isinstance(result, list) \
+                    or not all(isinstance(ok, bool) for ok in result):
+                result = None
+        else:
+            result = checker(*values)
+            if not isinstance(result, bool):
+                result = None
+    except BaseException as ex:
+        if isinstance(ex, KeyboardInterrupt):
+            raise
+        return {'error': str(ex)}
+    return {'result': result}
+
+
+def main() -> int:
+    reader, writer = open_channels()
+    cache = OrderedDict()
+    while True:
+        request = read_request(reader)
+        if request is None:
+            return 0
+        write_response(writer, handle(cache, *request))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+import re
+import math
+import hashlib
+import threading
+import subprocess
+from functools import partial
+from itertools import zip_longest
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+from app import config, messages, metrics
+from app.entities import CheckerPreset
+from app.service import exceptions
+from app.service.hosts import CheckerHostPool, HostException
+
+
+class CheckerCache:
+
+    """ LRU-кэш скомпилированных функций checker.
+        Ключ - хэш исходного кода функции """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(checker_func: str) -> str:
+        return hashlib.sha256(checker_func.encode()).hexdigest()
+
+    def get(self, checker_func: str) -> Optional[Callable]:
+        key = self.get_key(checker_func)
+        with self._lock:
+            checker = self._items.get(key)
+            if checker is not None:
+                self._items.move_to_end(key)
+            return checker
+
+    def put(self, checker_func: str, checker: Callable):
+        key = self.get_key(checker_func)
+        with self._lock:
+            self._items[key] = checker
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+checker_cache = CheckerCache(size=config.CHECKER_CACHE_SIZE)
+
+
+TOKEN = re.compile(r'\S+')
+
+
+def _iter_tokens(value: Optional[str]) -> Iterator[str]:
+    return (match.group() for match in TOKEN.finditer(value or ''))
+
+
+def _iter_lines(value: Optional[str]) -> Iterator[str]:
+
+    """ Итерирует строки без создания списка всех строк """
+
+    value = value or ''
+    start = 0
+    while True:
+        end = value.find('\n', start)
+        if end < 0:
+            yield value[start:]
+            return
+        yield value[start:end]
+        start = end + 1
+
+
+def check_exact(right_value: Optional[str], value: Optional[str]) -> bool:
+
+    """ Точное совпадение """
+
+    return (right_value or '') == (value or '')
+
+
+def check_tokens(right_value: Optional[str], value: Optional[str]) -> bool:
+
+    """ Совпадение последовательностей слов без учета пробельных символов """
+
+    if check_exact(right_value, value):
+        return True
+    return all(
+        right == token for right, token in
+        zip_longest(_iter_tokens(right_value), _iter_tokens(value))
+    )
+
+
+def check_lines(right_value: Optional[str], value: Optional[str]) -> bool:
+
+    """ Построчное совпадение без учета пробелов в конце строк """
+
+    if check_exact(right_value, value):
+        return True
+    return all(
+        right is not None and line is not None
+        and right.rstrip() == line.rstrip()
+        for right, line in
+        zip_longest(_iter_lines(right_value), _iter_lines(value))
+    )
+
+
+def compare_float_tokens(right: str, token: str, eps: float) -> bool:
+    if right == token:
+        return True
+    try:
+        right_number, number = float(right), float(token)
+    except ValueError:
+        return False
+    return math.isclose(right_number, number, rel_tol=eps, abs_tol=eps)
+
+
+def check_float(
+    right_value: Optional[str],
+    value: Optional[str],
+    eps: float
+) -> bool:
+
+    """ Совпадение последовательностей слов, числа сравниваются
+        с абсолютной или относительной погрешностью eps """
+
+    if check_exact(right_value, value):
+        return True
+    return all(
+        right is not None and token is not None
+        and compare_float_tokens(right, token, eps)
+        for right, token in
+        zip_longest(_iter_tokens(right_value), _iter_tokens(value))
+    )
+
+
+PRESETS = {
+    'exact': check_exact,
+    'tokens': check_tokens,
+    'lines': check_lines,
+    'float': check_float,
+}
+
+
+def get_preset_checker(preset: CheckerPreset) -> Callable[[str, str], bool]:
+    checker = PRESETS[preset.preset]
+    if checker is check_float:
+        return partial(check_float, eps=preset.eps)
+    return checker
+
+
+CHECKER_PREFIX = 'def checker(right_value: str, value: str) -> bool:'
+BATCH_CHECKER_PREFIX = 'def checker(pairs: list) -> list:'
+
+
+class BatchChecker:
+
+    """ Функция checker, проверяющая все тесты запроса одним вызовом.
+        Получает список пар (data_out, result) в порядке тестов,
+        возвращает список bool той же длины """
+
+    def __init__(self, func: Callable[[list], Any]):
+        self.func = func
+
+    def __call__(self, pairs: List[Tuple[Optional[str], Optional[str]]]):
+        return self.func(pairs)
+
+
+class PooledChecker:
+
+    """ Функция checker, выполняемая в пуле процессов
+        (hosts.CheckerHostPool). Возвращает результат функции
+        или None, если функция вернула значение другого типа.
+        Ошибки вызова, превышение времени и завершение
+        процесса - CheckerException """
+
+    def __init__(self, pool: CheckerHostPool, code: str, batch: bool = False):
+        self.pool = pool
+        self.code = code
+        self.batch = batch
+
+    def _call(self, command: str, values: List[Optional[str]]) -> Any:
+        try:
+            response = self.pool.call(
+                command, self.code, values, timeout=config.CHECKER_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            metrics.TIMEOUTS.labels(phase='checker', limit='wall').inc()
+            raise exceptions.CheckerException(messages.MSG_17)
+        except HostException as ex:
+            raise exceptions.CheckerException(
+                message=messages.MSG_5,
+                details=str(ex)
+            )
+        if 'error' in response:
+            raise exceptions.CheckerException(
+                message=messages.MSG_5,
+                details=response['error']
+            )
+        return response.get('result')
+
+    def compile(self):
+
+        """ Проверяет, что код функции выполняется """
+
+        self._call('compile', [])
+
+    def __call__(self, *args):
+        if self.batch:
+            pairs, = args
+            return self._call(
+                'batch', [value for pair in pairs for value in pair]
+            )
+        return self._call('check', list(args))
+
+
+class StreamComparator:
+
+    """ Сравнивает вывод программы с правильным ответом
+        по мере его появления. feed возвращает False при первом
+        несовпадении, после которого проверка результата
+        встроенной функцией checker гарантированно не пройдет.
+        mismatch - номер несовпавшей строки или слова (с 1) """
+
+    def __init__(self, right_value: Optional[str]):
+        self.right_value = right_value
+        self.mismatch = None
+        self._pending = ''
+        self._position = 0
+
+    def feed(self, text: str) -> bool:
+        if self.mismatch is not None:
+            return False
+        # Как в clean_str: символы удаляются из всего вывода
+        text = text.replace('\ufeff', '').replace('\r', '')
+        return self._feed(text)
+
+    def _feed(self, text: str) -> bool:
+        raise NotImplementedError
+
+    def _fail(self) -> bool:
+        self.mismatch = self._position
+        return False
+
+
+class TokensComparator(StreamComparator):
+
+    """ Для встроенных функций tokens и float. Слово сравнивается,
+        когда за ним появился пробельный символ """
+
+    def __init__(
+        self,
+        right_value: Optional[str],
+        compare: Callable[[str, str], bool]
+    ):
+        super().__init__(right_value)
+        self.compare = compare
+        self._right_tokens = _iter_tokens(right_value)
+
+    def _feed(self, text: str) -> bool:
+        text = self._pending + text
+        self._pending = ''
+        if text and not text[-1].isspace():
+            parts = text.rsplit(None, 1)
+            self._pending = parts.pop()
+            text = parts[0] if parts else ''
+        for token in _iter_tokens(text):
+            self._position += 1
+            right = next(self._right_tokens, None)
+            if right is None or not self.compare(right, token):
+                return self._fail()
+        return True
+
+
+class LinesComparator(StreamComparator):
+
+    """ Для встроенной функции lines. Строка сравнивается,
+        когда она завершена. Пустые строки откладываются до первой
+        непустой: в конце вывода они удаляются (clean_str) """
+
+    def __init__(self, right_value: Optional[str]):
+        super().__init__(right_value)
+        self._right_lines = _iter_lines(right_value)
+        self._empty_lines = 0
+
+    def _feed(self, text: str) -> bool:
+        lines = (self._pending + text).split('\n')
+        self._pending = lines.pop()
+        for line in lines:
+            if not line:
+                self._empty_lines += 1
+                continue
+            for value in [''] * self._empty_lines + [line]:
+                self._position += 1
+                right = next(self._right_lines, None)
+                if right is None or right.rstrip() != value.rstrip():
+                    return self._fail()
+            self._empty_lines = 0
+        return True
+
+
+def get_stream_comparator(
+    preset: CheckerPreset,
+    right_value: Optional[str]
+) -> Optional[StreamComparator]:
+
+    """ Потоковое сравнение для встроенной функции checker.
+        None - функция не поддерживает потоковое сравнение """
+
+    if preset.preset == 'lines':
+        return LinesComparator(right_value)
+    if preset.preset == 'tokens':
+        return TokensComparator(right_value, compare=str.__eq__)
+    if preset.preset == 'float':
+        return TokensComparator(
+            right_value,
+            compare=partial(compare_float_tokens, eps=preset.eps)
+        )
+    return None
@@ -1,9 +1,21 @@
 import os
 import uuid
 from collections import namedtuple
-from app import config
+from app.service.workspace import workspace
+from app.service.toolchains import toolchain
 
-ExecuteResult = namedtuple('ExecuteResult', ('result', 'error'))
+ExecuteResult = namedtuple(
+    'ExecuteResult',
+    ('result', 'error', 'cached', 'usage', 'mismatch'),
+    defaults=(False, None, None)
+)
+
+# wall_time, cpu_time (user + sys) - секунды, max_rss - килобайты
+ResourceUsage = namedtuple(
+    'ResourceUsage',
+    ('wall_time', 'cpu_time', 'max_rss'),
+    defaults=(None, None)
+)
 
 
 def opener(path, flags):
@@ -16,20 +28,23 @@ class PascalFile:
 
     def __init__(self, code: str):
         file_id = uuid.uuid4()
-        self.filepath_pas = os.path.join(
-            config.SANDBOX_DIR, f'{file_id}.pas'
-        )
-        self.filepath_exe = os.path.join(
-            config.SANDBOX_DIR, f'{file_id}.exe'
-        )
+        self.code = code
+        self.directory = workspace.create_job_dir()
+        self.filepath_pas = os.path.join(self.directory, f'{file_id}.pas')
+        self.filepath_exe = toolchain.get_artifact_path(self.filepath_pas)
+        self.filepath_aot = f'{self.filepath_exe}.so'
+        self.compile_usage = None
         with open(self.filepath_pas, 'w') as file:
             file.write(code)
+        self.update_usage()
         # with open(self.filepath_exe, 'w', opener=opener) as _:
         #     pass
 
+    def update_usage(self):
+
+        """ Учитывает в квоте записанные в каталог файлы """
+
+        workspace.update_job_dir(self.directory)
+
     def remove(self):
-        try:
-            os.remove(self.filepath_pas)
-            os.remove(self.filepath_exe)
-        except:
-            pass
+        workspace.remove_job_dir(self.directory)
@@ -29,3 +29,25 @@ class ExecutionException(ServiceException):
 class CompileException(ServiceException):
 
     default_message = messages.MSG_7
+
+
+class WorkspaceException(ServiceException):
+
+    default_message = messages.MSG_12
+
+
+class AdmissionException(ServiceException):
+
+    """ Запрос не принят: очередь ожидания заполнена
+        или время ожидания истекло """
+
+    default_message = messages.MSG_15
+
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        details: Optional[Any] = None,
+        retry_after: int = 1
+    ):
+        super().__init__(message, details)
+        self.retry_after = retry_after
@@ -0,0 +1,168 @@
+""" Детерминированная замена компилятора PascalABC.NET и Mono
+    для нагрузочного тестирования без Mono (TOOLCHAIN=fake).
+    Запускается как отдельный процесс и не импортирует app:
+
+        python fake_toolchain.py compile <file.pas> <file.exe> [параметры]
+        python fake_toolchain.py run <file.exe> [параметры] < input
+        python fake_toolchain.py host <file.exe> [параметры]
+
+    "Компиляция" копирует код в файл программы, "программа" выводит
+    свой консольный ввод, дополненный до --output-size байт.
+    Ошибки инжектируются с заданной вероятностью (выбор зависит
+    только от кода и ввода) или комментарием в коде программы,
+    содержащим fake:compile_error, fake:runtime_error или fake:timeout.
+    Программа с комментарием fake:busy занимает процессор до превышения
+    ограничения процессорного времени.
+    host - процесс-хост программы с протоколом ExecutionHost.cs """
+
+import sys
+import time
+import hashlib
+import argparse
+from typing import Optional, Tuple
+
+COMPILE_ERROR = 'fake:compile_error'
+RUNTIME_ERROR = 'fake:runtime_error'
+TIMEOUT = 'fake:timeout'
+BUSY = 'fake:busy'
+
+
+def fraction(*parts: str) -> float:
+
+    """ Детерминированное псевдослучайное число в [0, 1) """
+
+    digest = hashlib.sha256('\0'.join(parts).encode()).hexdigest()
+    return int(digest[:8], 16) / 2 ** 32
+
+
+def injected(code: str, directive: str, rate: float, *parts: str) -> bool:
+    return directive in code or fraction(directive, code, *parts) < rate
+
+
+def compile_program(args) -> int:
+    time.sleep(args.compile_latency)
+    with open(args.source, encoding='utf-8', errors='replace') as file:
+        code = file.read()
+    if injected(code, COMPILE_ERROR, args.compile_error_rate):
+        print(f'[1,1] {args.source}: Fake compilation error')
+        return 1
+    with open(args.artifact, 'w', encoding='utf-8') as file:
+        file.write(code)
+    return 0
+
+
+def burn(cpu_limit: Optional[float]):
+
+    """ Занимает процессор на cpu_limit секунд, без ограничения -
+        пока процесс не будет уничтожен """
+
+    started = time.process_time()
+    while not cpu_limit or time.process_time() - started < cpu_limit:
+        pass
+
+
+def execute(
+    args,
+    code: str,
+    data_in: str,
+    cpu_limit: Optional[float] = None
+) -> Tuple[int, str, str]:
+
+    """ Код возврата, вывод и вывод ошибок программы """
+
+    time.sleep(args.execute_latency)
+    if BUSY in code:
+        burn(cpu_limit)
+    if injected(code, TIMEOUT, args.timeout_rate, data_in):
+        time.sleep(3600)
+    if injected(code, RUNTIME_ERROR, args.runtime_error_rate, data_in):
+        return 1, '', (
+            'Unhandled Exception: System.Exception: Fake runtime error\n'
+        )
+    output = data_in
+    line = hashlib.sha256(code.encode()).hexdigest() + '\n'
+    if output and not output.endswith('\n'):
+        output += '\n'
+    while len(output) < args.output_size:
+        output += line
+    return 0, output, ''
+
+
+def read_artifact(args) -> str:
+    with open(args.artifact, encoding='utf-8') as file:
+        return file.read()
+
+
+def run_program(args) -> int:
+    code, output, error = execute(args, read_artifact(args), sys.stdin.read())
+    sys.stdout.write(output)
+    sys.stderr.write(error)
+    return code
+
+
+def write_message(stream, value: str):
+    payload = value.encode('utf-8')
+    stream.write(f'{len(payload)}\n'.encode() + payload)
+
+
+def run_host(args) -> int:
+    code = read_artifact(args)
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    while True:
+        header = stdin.readline()
+        if not header:
+            return 0
+        size, cpu_limit = header.split()
+        cpu_limit = float(cpu_limit)
+        data_in = stdin.read(int(size)).decode('utf-8')
+        started = time.process_time()
+        exit_code, output, error = execute(args, code, data_in, cpu_limit)
+        cpu_time = time.process_time() - started
+        if cpu_limit and cpu_time >= cpu_limit:
+            status, output, error = 2, '', ''
+        elif len(output) > args.output_limit:
+            status, output = 1, output[:args.output_limit]
+        else:
+            status = 0
+        write_message(stdout, f'{exit_code} {cpu_time} {status}')
+        write_message(stdout, output)
+        write_message(stdout, error)
+        stdout.flush()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest='command', required=True)
+    compile_parser = commands.add_parser('compile')
+    compile_parser.add_argument('source')
+    compile_parser.add_argument('artifact')
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('artifact')
+    host_parser = commands.add_parser('host')
+    host_parser.add_argument('artifact')
+    host_parser.add_argument('--output-limit', type=int, default=2 ** 31)
+    for command_parser in (compile_parser, run_parser, host_parser):
+        command_parser.add_argument(
+            '--compile-latency', type=float, default=0
+        )
+        command_parser.add_argument(
+            '--execute-latency', type=float, default=0
+        )
+        command_parser.add_argument('--output-size', type=int, default=0)
+        command_parser.add_argument(
+            '--compile-error-rate', type=float, default=0
+        )
+        command_parser.add_argument(
+            '--runtime-error-rate', type=float, default=0
+        )
+        command_parser.add_argument('--timeout-rate', type=float, default=0)
+    args = parser.parse_args()
+    if args.command == 'compile':
+        return compile_program(args)
+    if args.command == 'host':
+        return run_host(args)
+    return run_program(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,423 @@
+import os
+import sys
+import json
+import time
+import queue
+import select
+import threading
+import subprocess
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional
+from app import config
+from app.entities import ResourceLimits
+from app.service import checker_worker
+from app.service.resources import set_rlimits
+
+
+class HostException(Exception):
+
+    """ Процесс-хост недоступен или завершился во время работы """
+
+
+class Host:
+
+    """ Долгоживущий процесс Mono, принимающий задания через stdin
+        и возвращающий ответы с заголовком-длиной через stdout """
+
+    def __init__(
+        self,
+        args: List[str],
+        preexec_fn: Optional[Callable[[], None]] = None
+    ):
+        try:
+            self.proc = subprocess.Popen(
+                args=args,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                preexec_fn=preexec_fn
+            )
+        except OSError as ex:
+            raise HostException(str(ex))
+        self.jobs = 0
+        self._buffer = bytearray()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def kill(self):
+        try:
+            self.proc.kill()
+            self.proc.wait()
+        except OSError:
+            pass
+
+    def _read_chunk(self, deadline: float):
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise subprocess.TimeoutExpired(self.proc.args, timeout)
+        ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+        if not ready:
+            raise subprocess.TimeoutExpired(self.proc.args, timeout)
+        chunk = os.read(self.proc.stdout.fileno(), 65536)
+        if not chunk:
+            raise HostException('Host process exited')
+        self._buffer += chunk
+
+    def _read_response(self, deadline: float) -> bytes:
+        while b'\n' not in self._buffer:
+            self._read_chunk(deadline)
+        header, _, rest = self._buffer.partition(b'\n')
+        try:
+            size = int(header)
+        except ValueError:
+            size = -1
+        if size < 0:
+            raise HostException(f'Invalid host response header: {header!r}')
+        self._buffer = bytearray(rest)
+        while len(self._buffer) < size:
+            self._read_chunk(deadline)
+        payload = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return payload
+
+    def _send(self, *chunks: bytes):
+        try:
+            for chunk in chunks:
+                self.proc.stdin.write(chunk)
+            self.proc.stdin.flush()
+        except (OSError, ValueError) as ex:
+            raise HostException(str(ex))
+
+    def request(self, line: str, timeout: float) -> bytes:
+
+        """ Отправляет задание и ждет ответ не дольше timeout секунд """
+
+        deadline = time.monotonic() + timeout
+        self._send(line.encode() + b'\n')
+        payload = self._read_response(deadline)
+        self.jobs += 1
+        return payload
+
+
+# cpu_time - процессорное время хоста за время запуска, секунды.
+# overflow и cpu_exceeded - программа прервана хостом
+HostRun = namedtuple(
+    'HostRun',
+    ('stdout', 'stderr', 'exit_code', 'cpu_time', 'overflow', 'cpu_exceeded')
+)
+HOST_OVERFLOW = b'1'
+HOST_CPU_EXCEEDED = b'2'
+
+
+class ExecutionHost(Host):
+
+    """ Процесс-хост программы (ExecutionHost.cs): загружает
+        сборку один раз и запускает программу на каждом вводе """
+
+    def run(
+        self,
+        data_in: Optional[str],
+        timeout: float,
+        cpu_time: Optional[float] = None
+    ) -> HostRun:
+
+        """ Запускает программу и ждет результат не дольше
+            timeout секунд (иначе subprocess.TimeoutExpired).
+            Программу, превысившую cpu_time секунд процессорного
+            времени или размер вывода, хост прерывает сам """
+
+        deadline = time.monotonic() + timeout
+        data = (data_in or '').encode('utf-8')
+        self._send(f'{len(data)} {cpu_time or 0}\n'.encode(), data)
+        try:
+            exit_code, cpu_time, status = self._read_response(
+                deadline
+            ).split()
+            stdout = self._read_response(deadline)
+            stderr = self._read_response(deadline)
+        except ValueError as ex:
+            raise HostException(f'Invalid host response: {ex}')
+        self.jobs += 1
+        return HostRun(
+            stdout=stdout.decode('utf-8', errors='replace'),
+            stderr=stderr.decode('utf-8', errors='replace'),
+            exit_code=int(exit_code),
+            cpu_time=float(cpu_time),
+            overflow=status == HOST_OVERFLOW,
+            cpu_exceeded=status == HOST_CPU_EXCEEDED
+        )
+
+
+class ExecutionSession:
+
+    """ Процесс-хост одной программы на время ее тестирования.
+        Хост запускается заранее, при создании сессии, а после ошибки
+        или превышения времени уничтожается и сразу запускается
+        заново, как процессы HostPool. close уничтожает хост, чтобы
+        состояние не переходило между программами пользователей """
+
+    def __init__(
+        self,
+        args: List[str],
+        preexec_fn: Optional[Callable[[], None]] = None
+    ):
+        self.args = args
+        self.preexec_fn = preexec_fn
+        self._host: Optional[ExecutionHost] = None
+        self.start()
+
+    def start(self):
+
+        """ Запускает хост, если он не запущен или завершился.
+            Ошибка запуска не выбрасывается: тест, для которого
+            хост так и не запустился, получит HostException """
+
+        if self._host is not None and self._host.alive:
+            return
+        self.close()
+        try:
+            self._host = ExecutionHost(self.args, self.preexec_fn)
+        except HostException:
+            pass
+
+    def run(
+        self,
+        data_in: Optional[str],
+        timeout: float,
+        cpu_time: Optional[float] = None
+    ) -> HostRun:
+        if self._host is None or not self._host.alive:
+            self.close()
+            self._host = ExecutionHost(self.args, self.preexec_fn)
+        try:
+            return self._host.run(data_in, timeout=timeout, cpu_time=cpu_time)
+        except Exception:
+            self.close()
+            self.start()
+            raise
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._host is not None:
+            self._host.kill()
+            self._host = None
+
+
+class CheckerHost(Host):
+
+    """ Процесс пула функций checker (checker_worker.py) """
+
+    def call(
+        self,
+        command: str,
+        code: str,
+        values: List[Optional[str]],
+        timeout: float
+    ) -> Dict[str, Any]:
+
+        """ Отправляет команду и ждет ответ не дольше
+            timeout секунд (иначе subprocess.TimeoutExpired) """
+
+        deadline = time.monotonic() + timeout
+        blobs = [
+            None if value is None
+            else value.encode(checker_worker.ENCODING, checker_worker.ERRORS)
+            for value in values
+        ]
+        header = json.dumps({
+            'command': command,
+            'code': code,
+            'sizes': [-1 if blob is None else len(blob) for blob in blobs],
+        }).encode()
+        self._send(
+            f'{len(header)}\n'.encode(), header,
+            *(blob for blob in blobs if blob)
+        )
+        try:
+            response = json.loads(self._read_response(deadline))
+        except ValueError as ex:
+            raise HostException(f'Invalid host response: {ex}')
+        if not isinstance(response, dict):
+            raise HostException('Invalid host response')
+        self.jobs += 1
+        return response
+
+
+class HostPool:
+
+    """ Пул прогретых процессов-хостов.
+        Зависший или упавший процесс уничтожается,
+        вместо него сразу запускается новый """
+
+    host_class = Host
+
+    def __init__(
+        self,
+        args: List[str],
+        size: int,
+        max_jobs: int,
+        preexec_fn: Optional[Callable[[], None]] = None
+    ):
+        self.args = args
+        self.size = size
+        self.max_jobs = max_jobs
+        self.preexec_fn = preexec_fn
+        self._idle = queue.LifoQueue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def _spawn(self) -> Host:
+        with self._lock:
+            if self._started >= self.size:
+                raise HostException('No free host')
+            self._started += 1
+        try:
+            return self.host_class(self.args, self.preexec_fn)
+        except HostException:
+            self._discard()
+            raise
+
+    def _discard(self, host: Optional[Host] = None):
+        if host is not None:
+            host.kill()
+        with self._lock:
+            self._started -= 1
+
+    def _respawn(self):
+        try:
+            self._idle.put(self._spawn())
+        except HostException:
+            pass
+
+    def start(self):
+
+        """ Заранее запускает все процессы пула """
+
+        for _ in range(self.size - self._started):
+            self._respawn()
+
+    def _acquire(self) -> Host:
+        while True:
+            try:
+                host = self._idle.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if host.alive:
+                return host
+            self._discard(host)
+
+    def _call(self, func: Callable[[Host], Any]) -> Any:
+
+        """ Выполняет func в свободном процессе пула. Процесс,
+            завершившийся ошибкой, и процесс, выполнивший max_jobs
+            заданий, заменяются новым """
+
+        host = self._acquire()
+        try:
+            result = func(host)
+        except BaseException:
+            self._discard(host)
+            self._respawn()
+            raise
+        if host.jobs >= self.max_jobs:
+            self._discard(host)
+            self._respawn()
+        else:
+            self._idle.put(host)
+        return result
+
+    def stop(self):
+        while True:
+            try:
+                host = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(host)
+
+
+class CompilerHostPool(HostPool):
+
+    """ Пул прогретых процессов компилятора """
+
+    def compile(self, filepath: str, timeout: float) -> str:
+
+        """ Компилирует файл в свободном процессе пула.
+            Если свободного процесса нет - HostException,
+            при превышении времени - subprocess.TimeoutExpired """
+
+        payload = self._call(
+            lambda host: host.request(filepath, timeout=timeout)
+        )
+        return payload.decode('utf-8', errors='replace')
+
+
+class CheckerHostPool(HostPool):
+
+    """ Пул процессов функций checker. Если все процессы заняты,
+        вызов ждет освобождения процесса не дольше wait секунд """
+
+    host_class = CheckerHost
+
+    def __init__(self, *args, wait: float = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait = wait
+
+    def _acquire(self) -> Host:
+        while True:
+            try:
+                return super()._acquire()
+            except HostException:
+                if self._started < self.size:
+                    raise
+            try:
+                host = self._idle.get(timeout=self.wait)
+            except queue.Empty:
+                raise HostException('No free host')
+            if host.alive:
+                return host
+            self._discard(host)
+
+    def call(
+        self,
+        command: str,
+        code: str,
+        values: List[Optional[str]],
+        timeout: float
+    ) -> Dict[str, Any]:
+
+        """ Выполняет команду checker_worker.py в свободном процессе.
+            Если свободного процесса нет или он завершился - HostException,
+            при превышении времени - subprocess.TimeoutExpired """
+
+        return self._call(
+            lambda host: host.call(command, code, values, timeout=timeout)
+        )
+
+
+def checker_preexec_fn():
+
+    """ Ограничивает память процесса checker
+        и меняет его пользователя """
+
+    set_rlimits(ResourceLimits(memory=config.CHECKER_MEMORY_LIMIT))
+    os.setgid(config.SANDBOX_USER_UID)
+    os.setuid(config.SANDBOX_USER_UID)
+
+
+compiler_pool = CompilerHostPool(
+    args=['mono', config.COMPILER_HOST_PATH, config.PASCAL_COMPILER_PATH],
+    size=config.COMPILER_HOST_POOL_SIZE,
+    max_jobs=config.COMPILER_HOST_MAX_JOBS
+)
+
+checker_pool = CheckerHostPool(
+    args=[sys.executable, '-I', os.path.abspath(checker_worker.__file__)],
+    size=config.CHECKER_POOL_SIZE,
+    max_jobs=config.CHECKER_POOL_MAX_CALLS,
+    preexec_fn=checker_preexec_fn,
+    wait=config.CHECKER_TIMEOUT
+)
@@ -1,15 +1,68 @@
 import os
+import time
 import subprocess
-from typing import Optional
+from concurrent.futures import as_completed
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union
+)
 from app.service.entities import PascalFile
 from app.entities import (
     DebugData,
+    TestData,
     TestsData,
-
+    BatchTestsData,
+    SuiteData,
+    CheckerPreset,
+    ResourceLimits,
 )
-from app import config, messages
+from app import config, messages, metrics
 from app.service import exceptions
-from app.service.entities import ExecuteResult
+from app.service.entities import ExecuteResult, ResourceUsage
+from app.service.resources import (
+    RusagePopen,
+    get_usage,
+    get_limits,
+    set_rlimits,
+    cpu_limit_exceeded,
+    get_timeout_error,
+    is_timeout_error
+)
+from app.service.cache import (
+    compile_cache,
+    result_cache,
+    is_deterministic
+)
+from app.service.hosts import (
+    compiler_pool,
+    checker_pool,
+    HostException,
+    ExecutionSession
+)
+from app.service.suites import suite_registry
+from app.service.pool import (
+    submit_bounded,
+    get_batch_executor,
+    ProcessGroup
+)
+from app.service.aot import aot_compile
+from app.service.toolchains import toolchain
+from app.service.output import communicate
+from app.service.checkers import (
+    BATCH_CHECKER_PREFIX,
+    CHECKER_PREFIX,
+    BatchChecker,
+    PooledChecker,
+    checker_cache,
+    get_preset_checker,
+    get_stream_comparator,
+    StreamComparator
+)
 from app.utils import clean_str, clean_error
 
 
@@ -23,132 +76,722 @@ class PascalService:
         return change_process_user()
 
     @classmethod
-    def _compile(cls, file: PascalFile) -> Optional[str]:
+    def _get_preexec_fn(
+        cls,
+        limits: ResourceLimits,
+        sandbox: bool = True
+    ) -> Callable[[], None]:
+
+        """ Ограничивает ресурсы дочернего процесса
+            и (для программ) меняет его пользователя """
+
+        def preexec_fn():
+            set_rlimits(limits)
+            if sandbox:
+                cls._preexec_fn()
+        return preexec_fn
+
+    @classmethod
+    def _run_compiler(
+        cls,
+        file: PascalFile,
+        limits: ResourceLimits
+    ) -> Tuple[Optional[str], Optional[str]]:
 
-        """ Компилирует код программы """
+        """ Запускает компилятор в отдельном процессе """
 
         result, error = None, None
-        pascal_path = '/usr/bin/pascal/pabcnetcclear.exe'
-        proc = subprocess.Popen(
-            args=['mono', pascal_path, file.filepath_pas],
+        started = time.monotonic()
+        proc = RusagePopen(
+            args=toolchain.get_compile_args(
+                file.filepath_pas,
+                file.filepath_exe
+            ),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
+            preexec_fn=cls._get_preexec_fn(limits, sandbox=False),
             text=True
         )
         try:
-            result, error = proc.communicate(timeout=config.TIMEOUT)
+            result, error = proc.communicate(timeout=limits.wall_time)
         except subprocess.TimeoutExpired:
-            error = messages.MSG_1
+            error = get_timeout_error('compile', limits)
         except Exception as ex:
             error = str(ex)
         finally:
             proc.kill()
+            file.compile_usage = get_usage(proc, started)
+        if cpu_limit_exceeded(proc, file.compile_usage, limits):
+            result, error = None, messages.MSG_13
+        return result, error
+
+    @classmethod
+    def _compile(
+        cls,
+        file: PascalFile,
+        limits: Optional[ResourceLimits] = None
+    ) -> Optional[str]:
+
+        """ Компилирует код программы.
+            При включенном кэше повторно не компилирует
+            уже известный код. Процесс-хост компилятора
+            ограничивается только временем выполнения """
+
+        cache_key = None
+        if config.COMPILE_CACHE_ENABLED:
+            cache_key = compile_cache.get_key(file.code)
+            if compile_cache.restore(cache_key, file.filepath_exe):
+                file.update_usage()
+                return None
+
+        limits = limits or get_limits('compile')
+        result, error = None, None
+        started = time.monotonic()
+        if toolchain.hosts_enabled:
+            try:
+                result = compiler_pool.compile(
+                    file.filepath_pas,
+                    timeout=limits.wall_time
+                )
+            except subprocess.TimeoutExpired:
+                error = get_timeout_error('compile', limits)
+            except HostException:
+                result, error = cls._run_compiler(file, limits)
+            else:
+                file.compile_usage = ResourceUsage(
+                    wall_time=time.monotonic() - started
+                )
+        else:
+            result, error = cls._run_compiler(file, limits)
+        return cls._get_compile_error(file, result, error, started, cache_key)
+
+    @classmethod
+    def _get_compile_error(
+        cls,
+        file: PascalFile,
+        result: Optional[str],
+        error: Optional[str],
+        started: float,
+        cache_key: Optional[str]
+    ) -> Optional[str]:
+
+        """ Ошибка завершенной компиляции. Файлы компиляции
+            учитываются в квоте рабочих каталогов, скомпилированная
+            без ошибок программа сохраняется в кэш """
+
+        file.update_usage()
         if result and result != 'OK\n':
             error = result
-        return clean_error(error)
+        error = clean_error(error)
+        metrics.COMPILE_TIME.observe(time.monotonic() - started)
+        if is_timeout_error(error):
+            metrics.TIMEOUTS.labels(phase='compile', limit='wall').inc()
+        elif error == messages.MSG_13:
+            metrics.TIMEOUTS.labels(phase='compile', limit='cpu').inc()
+        elif error:
+            metrics.COMPILE_ERRORS.inc()
+        if cache_key and not error:
+            compile_cache.store(cache_key, file.filepath_exe)
+        return error
 
     @classmethod
-    def _execute(
+    def _run_program(
         cls,
         file: PascalFile,
-        data_in: Optional[str] = None
+        data_in: Optional[str] = None,
+        group: Optional[ProcessGroup] = None,
+        limits: Optional[ResourceLimits] = None,
+        comparator: Optional[StreamComparator] = None
     ) -> ExecuteResult:
 
         """ Запускает скомпилирвованный файл,
             передает входные данные
-            и возвращает результат работы программы """
-        result, error = None, None
-        proc = subprocess.Popen(
-            args=['mono', file.filepath_exe],
+            и возвращает результат работы программы.
+            Вывод больше OUTPUT_LIMIT байт не читается целиком:
+            программа уничтожается, в результате остаются
+            начало и конец вывода. С comparator программа
+            уничтожается при первом несовпадении вывода с ответом """
+        limits = limits or get_limits('execute')
+        result, error, usage = None, None, None
+        started = time.monotonic()
+        proc = RusagePopen(
+            args=toolchain.get_execute_args(file.filepath_exe),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            preexec_fn=cls._preexec_fn,
-            text=True
+            preexec_fn=cls._get_preexec_fn(limits)
         )
+        if group is not None:
+            group.add(proc)
+        overflow = False
         try:
-            result, error = proc.communicate(
-                input=data_in,
-                timeout=config.TIMEOUT
+            result, error, overflow = communicate(
+                proc,
+                data_in,
+                timeout=limits.wall_time,
+                limit=config.OUTPUT_LIMIT,
+                head_size=config.OUTPUT_HEAD_SIZE,
+                tail_size=config.OUTPUT_TAIL_SIZE,
+                comparator=comparator
             )
-            if isinstance(result, str) and '\uffff' in result:
-                result = None
-                error = messages.MSG_8
         except subprocess.TimeoutExpired:
-            error = messages.MSG_1
+            error = get_timeout_error('execute', limits)
         except Exception as ex:
             error = str(ex)
         finally:
             proc.kill()
+            usage = get_usage(proc, started)
+        return cls._get_execute_result(
+            result, error, overflow,
+            cpu_limit_exceeded(proc, usage, limits),
+            usage, comparator, started
+        )
+
+    @classmethod
+    def _run_in_host(
+        cls,
+        session: ExecutionSession,
+        data_in: Optional[str],
+        limits: ResourceLimits
+    ) -> ExecuteResult:
+
+        """ Запускает программу в процессе-хосте. При переполнении
+            вывода и превышении процессорного времени хост прерывает
+            программу сам, уничтожается хост только по времени
+            выполнения. Если хост недоступен или завершился -
+            HostException """
+
+        started = time.monotonic()
+        try:
+            run = session.run(
+                data_in,
+                timeout=limits.wall_time,
+                cpu_time=limits.cpu_time
+            )
+        except subprocess.TimeoutExpired:
+            usage = ResourceUsage(wall_time=time.monotonic() - started)
+            return cls._get_execute_result(
+                None, get_timeout_error('execute', limits),
+                False, False, usage, None, started
+            )
+        usage = ResourceUsage(
+            wall_time=time.monotonic() - started,
+            cpu_time=run.cpu_time
+        )
+        result = run.stdout
+        if run.overflow:
+            result = result[:config.OUTPUT_HEAD_SIZE]
+        cpu_exceeded = run.cpu_exceeded or (
+            bool(limits.cpu_time) and run.cpu_time >= limits.cpu_time
+        )
+        return cls._get_execute_result(
+            result, run.stderr, run.overflow, cpu_exceeded,
+            usage, None, started
+        )
+
+    @classmethod
+    def _get_execute_result(
+        cls,
+        result: Optional[str],
+        error: Optional[str],
+        overflow: bool,
+        cpu_exceeded: bool,
+        usage: Optional[ResourceUsage],
+        comparator: Optional[StreamComparator],
+        started: float
+    ) -> ExecuteResult:
+
+        """ Результат завершенной программы: ошибки вывода,
+            превышение процессорного времени и метрики запуска """
+
+        mismatch = comparator.mismatch if comparator is not None else None
+        if mismatch is not None:
+            error = None
+            metrics.STREAM_MISMATCHES.inc()
+        elif overflow:
+            error = messages.MSG_14
+            metrics.OUTPUT_OVERFLOWS.inc()
+        elif result and '\uffff' in result:
+            result = None
+            error = messages.MSG_8
+        if not overflow and mismatch is None and cpu_exceeded:
+            result, error = None, messages.MSG_13
+        metrics.EXECUTE_TIME.observe(time.monotonic() - started)
+        if is_timeout_error(error):
+            metrics.TIMEOUTS.labels(phase='execute', limit='wall').inc()
+        elif error == messages.MSG_13:
+            metrics.TIMEOUTS.labels(phase='execute', limit='cpu').inc()
         return ExecuteResult(
             result=clean_str(result or None),
-            error=clean_error(error or None)
+            error=clean_error(error or None),
+            usage=usage,
+            mismatch=mismatch
         )
 
+    @classmethod
+    def _execute(
+        cls,
+        file: PascalFile,
+        data_in: Optional[str] = None,
+        group: Optional[ProcessGroup] = None,
+        limits: Optional[ResourceLimits] = None,
+        comparator: Optional[StreamComparator] = None,
+        session: Optional[ExecutionSession] = None
+    ) -> ExecuteResult:
+
+        """ Запускает программу. При включенном кэше результатов
+            детерминированная программа не запускается повторно
+            на тех же входных данных с теми же ограничениями.
+            Результат, прерванный потоковым сравнением,
+            не кэшируется: он зависит от ответа теста.
+            С session (и без потокового сравнения) программа
+            запускается в процессе-хосте, а если он недоступен -
+            в отдельном процессе """
+
+        limits = limits or get_limits('execute')
+        cache_key = None
+        if config.RESULT_CACHE_ENABLED and is_deterministic(file.code):
+            cache_key = result_cache.get_key(
+                compile_cache.get_key(file.code), data_in, limits
+            )
+            exec_result = result_cache.get(cache_key)
+            if exec_result is not None:
+                return exec_result._replace(cached=True, usage=None)
+        exec_result = None
+        if session is not None and comparator is None:
+            try:
+                exec_result = cls._run_in_host(session, data_in, limits)
+            except HostException:
+                metrics.HOST_FALLBACKS.inc()
+        if exec_result is None:
+            exec_result = cls._run_program(
+                file=file,
+                data_in=data_in,
+                group=group,
+                limits=limits,
+                comparator=comparator
+            )
+        if cache_key and exec_result.mismatch is None \
+                and exec_result.error != messages.MSG_13 \
+                and not is_timeout_error(exec_result.error):
+            result_cache.put(cache_key, exec_result)
+        return exec_result
+
     @classmethod
     def _validate_checker_func(cls, checker_func: str):
         if not checker_func.startswith(
-            'def checker(right_value: str, value: str) -> bool:'
+            (CHECKER_PREFIX, BATCH_CHECKER_PREFIX)
         ):
             raise exceptions.CheckerException(messages.MSG_2)
         if checker_func.find('return') < 0:
             raise exceptions.CheckerException(messages.MSG_3)
 
     @classmethod
-    def _check(cls, checker_func: str, **checker_func_vars) -> bool:
-        cls._validate_checker_func(checker_func)
+    def _get_checker(
+        cls,
+        checker_func: Union[str, CheckerPreset]
+    ) -> Callable[[str, str], Any]:
+
+        """ Возвращает скомпилированную функцию checker.
+            Код проверяется и компилируется только при промахе кэша.
+            При CHECKER_POOL_ENABLED функция выполняется в пуле
+            процессов. Пакетная функция checker возвращается
+            как BatchChecker """
+
+        if isinstance(checker_func, CheckerPreset):
+            return get_preset_checker(checker_func)
+        checker = checker_cache.get(checker_func)
+        if checker is None:
+            batch = checker_func.startswith(BATCH_CHECKER_PREFIX)
+            try:
+                cls._validate_checker_func(checker_func)
+                if config.CHECKER_POOL_ENABLED:
+                    checker = PooledChecker(checker_pool, checker_func, batch)
+                    checker.compile()
+                else:
+                    checker = cls._exec_checker_func(checker_func)
+            except exceptions.CheckerException:
+                metrics.CHECKER_ERRORS.inc()
+                raise
+            if batch:
+                checker = BatchChecker(checker)
+            checker_cache.put(checker_func, checker)
+        return checker
+
+    @classmethod
+    def _exec_checker_func(cls, checker_func: str) -> Callable:
+
+        """ Компилирует функцию checker в процессе сервиса """
+
+        checker_func_vars = {}
         try:
-            exec(
-                checker_func + '\nresult = checker(right_value, value)',
-                globals(),
-                checker_func_vars
-            )
+            exec(checker_func, globals(), checker_func_vars)
         except Exception as ex:
             raise exceptions.CheckerException(
                 message=messages.MSG_5,
                 details=str(ex)
             )
+        return checker_func_vars['checker']
+
+    @classmethod
+    def _check(
+        cls,
+        checker_func: Union[str, Callable[[str, str], Any]],
+        right_value: Optional[str],
+        value: Optional[str]
+    ) -> bool:
+        if callable(checker_func):
+            checker = checker_func
         else:
-            result = checker_func_vars['result']
-            if not isinstance(result, bool):
-                raise exceptions.CheckerException(messages.MSG_4)
-            return result
+            checker = cls._get_checker(checker_func)
+        try:
+            with metrics.CHECKER_TIME.time():
+                result = checker(right_value, value)
+        except exceptions.CheckerException:
+            metrics.CHECKER_ERRORS.inc()
+            raise
+        except Exception as ex:
+            metrics.CHECKER_ERRORS.inc()
+            raise exceptions.CheckerException(
+                message=messages.MSG_5,
+                details=str(ex)
+            )
+        if not isinstance(result, bool):
+            metrics.CHECKER_ERRORS.inc()
+            raise exceptions.CheckerException(messages.MSG_4)
+        return result
+
+    @classmethod
+    def _check_batch(cls, checker: BatchChecker, tests: List[TestData]):
+
+        """ Проверяет все тесты одним вызовом пакетной функции checker.
+            Результат пропущенных тестов и тестов, снятых потоковым
+            сравнением, не меняется """
+
+        pairs = [(test.data_out, test.result) for test in tests]
+        try:
+            with metrics.CHECKER_TIME.time():
+                results = checker(pairs)
+        except exceptions.CheckerException:
+            metrics.CHECKER_ERRORS.inc()
+            raise
+        except Exception as ex:
+            metrics.CHECKER_ERRORS.inc()
+            raise exceptions.CheckerException(
+                message=messages.MSG_5,
+                details=str(ex)
+            )
+        if not isinstance(results, list) or len(results) != len(tests) \
+                or not all(isinstance(ok, bool) for ok in results):
+            metrics.CHECKER_ERRORS.inc()
+            raise exceptions.CheckerException(messages.MSG_16)
+        for test, ok in zip(tests, results):
+            if test.ok is None:
+                test.ok = ok
 
     @classmethod
     def debug(cls, data: DebugData) -> DebugData:
         file = PascalFile(data.code)
-        error = cls._compile(file)
+        error = cls._compile(file, get_limits('compile', data.limits))
         if error:
             data.error = error
         else:
             exec_result = cls._execute(
                 file=file,
-                data_in=data.data_in
+                data_in=data.data_in,
+                limits=get_limits('execute', data.limits)
             )
             data.result = exec_result.result
             data.error = exec_result.error
+            data.cached = exec_result.cached or None
+            if data.resources:
+                data.usage = exec_result.usage
+        if data.resources:
+            data.compile_usage = file.compile_usage
         file.remove()
         return data
 
     @classmethod
-    def testing(cls, data: TestsData) -> TestsData:
+    def _set_test_result(
+        cls,
+        test: TestData,
+        exec_result: ExecuteResult,
+        checker: Callable[[str, str], Any],
+        resources: bool = False
+    ) -> bool:
+        test.result = exec_result.result
+        test.error = exec_result.error
+        test.cached = exec_result.cached or None
+        test.usage = exec_result.usage if resources else None
+        if exec_result.mismatch is not None:
+            test.mismatch = exec_result.mismatch
+            test.ok = False
+            return test.ok
+        if isinstance(checker, BatchChecker):
+            # Проверяется после всех тестов в _check_batch,
+            # для fail_fast непройденный тест - тест с ошибкой
+            test.ok = None
+            return test.error is None
+        test.ok = cls._check(
+            checker_func=checker,
+            right_value=test.data_out,
+            value=test.result
+        )
+        return test.ok
+
+    @classmethod
+    def _get_comparator(
+        cls,
+        checker_func: Union[str, CheckerPreset, None],
+        test: TestData
+    ) -> Optional[StreamComparator]:
+
+        """ Потоковое сравнение вывода с ответом теста,
+            если оно включено и поддерживается функцией checker """
+
+        if config.STREAM_CHECK_ENABLED \
+                and isinstance(checker_func, CheckerPreset):
+            return get_stream_comparator(checker_func, test.data_out)
+        return None
+
+    @classmethod
+    def _create_session(
+        cls,
+        file: PascalFile,
+        tests: List[TestData],
+        limits: ResourceLimits
+    ) -> Optional[ExecutionSession]:
+
+        """ Процесс-хост для последовательного запуска тестов,
+            запускается сразу. Процесс ограничивается только
+            по памяти: процессорное время каждого теста ограничивает
+            сам хост, время выполнения - сервис """
+
+        if not toolchain.execution_host_enabled \
+                or len(tests) < config.EXECUTION_HOST_MIN_TESTS:
+            return None
+        return ExecutionSession(
+            args=toolchain.get_execution_host_args(
+                file.filepath_exe, config.OUTPUT_LIMIT
+            ),
+            preexec_fn=cls._get_preexec_fn(
+                ResourceLimits(memory=limits.memory)
+            )
+        )
+
+    @classmethod
+    def _skip_tests(cls, tests: List[TestData]):
+        for test in tests:
+            test.result = None
+            test.error = messages.MSG_9
+            test.ok = False
+
+    @classmethod
+    def _run_tests(
+        cls,
+        file: PascalFile,
+        tests: List[TestData],
+        checker: Callable[[str, str], Any],
+        fail_fast: bool = False,
+        resources: bool = False,
+        limits: Optional[ResourceLimits] = None,
+        checker_func: Union[str, CheckerPreset, None] = None
+    ) -> Iterator[int]:
+
+        """ Запускает программу на тестах и проверяет результаты.
+            Генератор, возвращает индексы тестов по мере их завершения.
+            При TESTING_WORKERS > 1 тесты выполняются параллельно.
+            При fail_fast тесты после первого непройденного
+            не запускаются (запущенные - уничтожаются)
+            и помечаются пропущенными. checker_func - исходная
+            функция checker для потокового сравнения.
+            Последовательно запускаемые тесты выполняются
+            в процессе-хосте, если он включен """
+
+        limit = min(
+            config.TESTING_WORKERS,
+            config.TESTING_MAX_WORKERS_PER_REQUEST
+        )
+        if limit <= 1 or len(tests) <= 1:
+            limits = limits or get_limits('execute')
+            session = cls._create_session(file, tests, limits)
+            try:
+                for index, test in enumerate(tests):
+                    exec_result = cls._execute(
+                        file=file,
+                        data_in=test.data_in,
+                        limits=limits,
+                        comparator=cls._get_comparator(checker_func, test),
+                        session=session
+                    )
+                    ok = cls._set_test_result(
+                        test, exec_result, checker, resources
+                    )
+                    yield index
+                    if fail_fast and not ok:
+                        cls._skip_tests(tests[index + 1:])
+                        yield from range(index + 1, len(tests))
+                        return
+            finally:
+                if session is not None:
+                    session.close()
+            return
+
+        groups = [ProcessGroup() for _ in tests]
+        futures = submit_bounded(
+            lambda index: cls._execute(
+                file=file,
+                data_in=tests[index].data_in,
+                group=groups[index],
+                limits=limits,
+                comparator=cls._get_comparator(checker_func, tests[index])
+            ),
+            range(len(tests)),
+            limit=limit
+        )
+        indexes = {future: index for index, future in enumerate(futures)}
+
+        def cancel(start: int):
+            for index in range(start, len(tests)):
+                futures[index].cancel()
+                groups[index].cancel()
+
+        failed_index = len(tests)
+        emitted = set()
+        try:
+            for future in as_completed(futures):
+                index = indexes[future]
+                if index > failed_index or future.cancelled():
+                    continue
+                ok = cls._set_test_result(
+                    tests[index], future.result(), checker, resources
+                )
+                emitted.add(index)
+                yield index
+                if fail_fast and not ok and index < failed_index:
+                    failed_index = index
+                    cancel(index + 1)
+        except BaseException:
+            cancel(0)
+            raise
+        # Тесты после непройденного, результат которых уже отправлен
+        # (они завершились раньше него), не пропускаются
+        skipped = [
+            index for index in range(failed_index + 1, len(tests))
+            if index not in emitted
+        ]
+        cls._skip_tests([tests[index] for index in skipped])
+        yield from skipped
+
+    @classmethod
+    def _precompile(cls, file: PascalFile, tests: List[TestData]):
+
+        """ AOT-компилирует программу, если она будет запущена
+            на большом количестве тестов. При ошибке программа
+            запускается в режиме JIT """
+
+        if toolchain.aot_enabled and len(tests) >= config.AOT_MIN_TESTS:
+            aot_compile(file.filepath_exe, timeout=config.TIMEOUT)
+            file.update_usage()
+
+    @classmethod
+    def testing_events(
+        cls,
+        data: TestsData
+    ) -> Iterator[Tuple[str, Optional[int]]]:
+
+        """ Прогоняет программу на тестах.
+            Генератор событий: ('compile', None) после компиляции
+            (ошибка в data.error), затем ('test', индекс теста)
+            по мере завершения тестов. С пакетной функцией checker
+            события тестов возвращаются после проверки всех тестов """
+
         file = PascalFile(data.code)
-        error = cls._compile(file)
-        for test in data.tests:
-            if error:
-                test.error = error
-                test.ok = False
+        try:
+            data.error = cls._compile(
+                file, get_limits('compile', data.limits)
+            )
+            if data.resources:
+                data.compile_usage = file.compile_usage
+            yield 'compile', None
+            if data.error:
+                for index, test in enumerate(data.tests):
+                    test.error = data.error
+                    test.ok = False
+                    yield 'test', index
             else:
-                exec_result = cls._execute(
+                cls._precompile(file, data.tests)
+                checker = cls._get_checker(data.checker)
+                indexes = cls._run_tests(
                     file=file,
-                    data_in=test.data_in
+                    tests=data.tests,
+                    checker=checker,
+                    fail_fast=data.fail_fast,
+                    resources=data.resources,
+                    limits=get_limits('execute', data.limits),
+                    checker_func=data.checker
                 )
-                test.result = exec_result.result
-                test.error = exec_result.error
-                test.ok = cls._check(
-                    checker_func=data.checker,
-                    right_value=test.data_out,
-                    value=test.result
+                if isinstance(checker, BatchChecker):
+                    indexes = list(indexes)
+                    cls._check_batch(checker, data.tests)
+                for index in indexes:
+                    yield 'test', index
+        finally:
+            file.remove()
+
+    @classmethod
+    def testing(cls, data: TestsData) -> TestsData:
+        for _ in cls.testing_events(data):
+            pass
+        return data
+
+    @classmethod
+    def _testing_submission(
+        cls,
+        data: BatchTestsData,
+        code: str
+    ) -> Union[TestsData, exceptions.ServiceException]:
+        try:
+            return cls.testing(
+                TestsData(
+                    code=code,
+                    checker=data.checker,
+                    fail_fast=data.fail_fast,
+                    limits=data.limits,
+                    tests=[
+                        TestData(data_in=test.data_in, data_out=test.data_out)
+                        for test in data.tests
+                    ]
                 )
-        file.remove()
+            )
+        except exceptions.ServiceException as ex:
+            return ex
+        except Exception as ex:
+            return exceptions.ExecutionException(details=str(ex))
+
+    @classmethod
+    def batch_testing(cls, data: BatchTestsData) -> BatchTestsData:
+
+        """ Прогоняет несколько программ на одном наборе тестов.
+            Checker проверяется один раз для всего пакета,
+            ошибка одной программы не влияет на остальные """
+
+        cls._get_checker(data.checker)
+        executor = get_batch_executor()
+        futures = [
+            executor.submit(cls._testing_submission, data, submission.code)
+            for submission in data.submissions
+        ]
+        data.results = [future.result() for future in futures]
+        return data
+
+    @classmethod
+    def register_suite(cls, data: SuiteData) -> SuiteData:
+
+        """ Регистрирует набор тестов. Checker проверяется
+            при регистрации, как для пакетного тестирования """
+
+        cls._get_checker(data.checker)
+        data.id = suite_registry.put(data.tests, data.checker)
+        data.num = len(data.tests)
         return data
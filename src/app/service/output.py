@@ -0,0 +1,287 @@
+import os
+import time
+import codecs
+import select
+import asyncio
+import selectors
+import subprocess
+from typing import Optional, Tuple
+from app.service.checkers import StreamComparator
+
+
+class OutputBuffer:
+
+    """ Вывод процесса не больше limit байт.
+        При переполнении сохраняются первые head_size
+        и последние tail_size байт вывода """
+
+    separator = b'\n...\n'
+
+    def __init__(self, limit: int, head_size: int, tail_size: int = 0):
+        self.limit = limit
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.size = 0
+        self._data = bytearray()
+        self._tail = bytearray()
+
+    @property
+    def overflow(self) -> bool:
+        return self.size > self.limit
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        room = self.limit - len(self._data)
+        if room > 0:
+            self._data += chunk[:room]
+        if self.tail_size:
+            self._tail += chunk[-self.tail_size:]
+            del self._tail[:-self.tail_size]
+
+    def getvalue(self) -> str:
+        if not self.overflow:
+            return self._data.decode('utf-8', errors='replace')
+        value = bytes(self._data[:self.head_size])
+        if self.tail_size:
+            value += self.separator + bytes(self._tail)
+        return value.decode('utf-8', errors='replace')
+
+
+class Capture:
+
+    """ Обмен данными с процессом: запись ввода частями
+        и чтение вывода в OutputBuffer. Процесс уничтожается
+        при переполнении вывода или несовпадении с ответом """
+
+    def __init__(
+        self,
+        proc: subprocess.Popen,
+        data_in: Optional[str],
+        limit: int,
+        head_size: int,
+        tail_size: int = 0,
+        comparator: Optional[StreamComparator] = None
+    ):
+        self.proc = proc
+        self.data = (data_in or '').encode('utf-8')
+        self.offset = 0
+        self.buffers = {
+            proc.stdout: OutputBuffer(limit, head_size, tail_size),
+            proc.stderr: OutputBuffer(limit, head_size, tail_size),
+        }
+        self.comparator = comparator
+        self.decoder = codecs.getincrementaldecoder('utf-8')(
+            errors='replace'
+        )
+        self.stopped = False
+
+    @property
+    def has_input(self) -> bool:
+        return self.proc.stdin is not None and bool(self.data)
+
+    def write_input(self) -> bool:
+
+        """ Записывает очередную часть ввода.
+            Возвращает True, когда ввод записан целиком """
+
+        chunk = self.data[self.offset:self.offset + select.PIPE_BUF]
+        try:
+            self.offset += os.write(self.proc.stdin.fileno(), chunk)
+        except BlockingIOError:
+            return False
+        except BrokenPipeError:
+            self.offset = len(self.data)
+        return self.offset >= len(self.data)
+
+    def read_output(self, stream) -> bool:
+
+        """ Читает очередную часть вывода.
+            Возвращает True, когда канал закрыт """
+
+        try:
+            chunk = os.read(stream.fileno(), 32768)
+        except BlockingIOError:
+            return False
+        if not chunk:
+            return True
+        buffer = self.buffers[stream]
+        buffer.write(chunk)
+        if buffer.overflow:
+            self.stop()
+        elif self.comparator is not None and stream is self.proc.stdout:
+            if not self.comparator.feed(self.decoder.decode(chunk)):
+                self.stop()
+        return False
+
+    def stop(self):
+        self.proc.kill()
+        self.stopped = True
+
+    def close(self):
+        for stream in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            if stream is not None and not stream.closed:
+                stream.close()
+
+    def result(self) -> Tuple[str, str, bool]:
+
+        """ stdout, stderr и признак переполнения """
+
+        overflow = any(buffer.overflow for buffer in self.buffers.values())
+        stdout, stderr = (
+            buffer.getvalue() for buffer in self.buffers.values()
+        )
+        return stdout, stderr, overflow
+
+
+def communicate(
+    proc: subprocess.Popen,
+    data_in: Optional[str],
+    timeout: Optional[float],
+    limit: int,
+    head_size: int,
+    tail_size: int = 0,
+    comparator: Optional[StreamComparator] = None
+) -> Tuple[str, str, bool]:
+
+    """ Аналог Popen.communicate для процесса с бинарными каналами.
+        Вывод читается по мере появления, процесс уничтожается,
+        как только stdout или stderr превысит limit байт.
+        Если задан comparator, stdout сравнивается с правильным
+        ответом, и процесс уничтожается при первом несовпадении.
+        Возвращает stdout, stderr и признак переполнения.
+        При превышении timeout - subprocess.TimeoutExpired """
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    capture = Capture(
+        proc, data_in, limit, head_size, tail_size, comparator
+    )
+    try:
+        _communicate(capture, deadline, timeout)
+    finally:
+        capture.close()
+    return capture.result()
+
+
+def _communicate(
+    capture: Capture,
+    deadline: Optional[float],
+    timeout: Optional[float]
+):
+    proc = capture.proc
+    with selectors.DefaultSelector() as selector:
+        if capture.has_input:
+            selector.register(proc.stdin, selectors.EVENT_WRITE)
+        elif proc.stdin is not None:
+            proc.stdin.close()
+        for stream in capture.buffers:
+            selector.register(stream, selectors.EVENT_READ)
+        while selector.get_map():
+            wait = None
+            if deadline is not None:
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    raise subprocess.TimeoutExpired(proc.args, timeout)
+            for key, _ in selector.select(wait):
+                stream = key.fileobj
+                if stream is proc.stdin:
+                    closed = capture.write_input()
+                else:
+                    closed = capture.read_output(stream)
+                if capture.stopped:
+                    return
+                if closed:
+                    selector.unregister(stream)
+                    stream.close()
+    proc.wait(timeout=_remaining(deadline))
+
+
+async def communicate_async(
+    proc: subprocess.Popen,
+    data_in: Optional[str],
+    timeout: Optional[float],
+    limit: int,
+    head_size: int,
+    tail_size: int = 0,
+    comparator: Optional[StreamComparator] = None
+) -> Tuple[str, str, bool]:
+
+    """ communicate для asyncio: каналы процесса обслуживает
+        цикл событий, ожидание не занимает поток """
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    capture = Capture(
+        proc, data_in, limit, head_size, tail_size, comparator
+    )
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    streams = set()
+
+    def watch(stream, callback):
+        os.set_blocking(stream.fileno(), False)
+        streams.add(stream)
+        if stream is proc.stdin:
+            loop.add_writer(stream.fileno(), callback)
+        else:
+            loop.add_reader(stream.fileno(), callback, stream)
+
+    def unwatch(stream):
+        if stream is proc.stdin:
+            loop.remove_writer(stream.fileno())
+        else:
+            loop.remove_reader(stream.fileno())
+        streams.discard(stream)
+
+    def on_event(stream=proc.stdin):
+        if stream is proc.stdin:
+            closed = capture.write_input()
+        else:
+            closed = capture.read_output(stream)
+        if closed:
+            unwatch(stream)
+            stream.close()
+        if (capture.stopped or not streams) and not done.done():
+            done.set_result(None)
+
+    if capture.has_input:
+        watch(proc.stdin, on_event)
+    elif proc.stdin is not None:
+        proc.stdin.close()
+    for stream in capture.buffers:
+        watch(stream, on_event)
+    try:
+        await asyncio.wait_for(done, _remaining(deadline))
+    except asyncio.TimeoutError:
+        raise subprocess.TimeoutExpired(proc.args, timeout)
+    finally:
+        for stream in list(streams):
+            unwatch(stream)
+        capture.close()
+    if not capture.stopped:
+        await wait_async(proc, _remaining(deadline))
+    return capture.result()
+
+
+async def wait_async(proc: subprocess.Popen, timeout: Optional[float]):
+
+    """ Popen.wait для asyncio. Процесс опрашивается с растущим
+        интервалом (RusagePopen при этом сохраняет rusage) """
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    interval = 0.001
+    while True:
+        try:
+            return proc.wait(timeout=0)
+        except subprocess.TimeoutExpired:
+            remaining = _remaining(deadline)
+            if remaining == 0:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+        if remaining is not None:
+            interval = min(interval, remaining)
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, 0.05)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0)
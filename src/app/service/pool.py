@@ -0,0 +1,108 @@
+import threading
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+from app import config
+
+_executor: Optional[ThreadPoolExecutor] = None
+_batch_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+
+    """ Общий для воркера пул потоков запуска программ.
+        Создается при первом обращении, т.е. уже после fork """
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.TESTING_WORKERS,
+                thread_name_prefix='testing'
+            )
+        return _executor
+
+
+def get_batch_executor() -> ThreadPoolExecutor:
+
+    """ Пул потоков пакетного тестирования.
+        Отделен от пула запуска программ: программа пакета
+        ждет свои тесты, и в общем пуле это могло бы
+        занять все потоки """
+
+    global _batch_executor
+    with _executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(
+                max_workers=config.BATCH_WORKERS,
+                thread_name_prefix='batch'
+            )
+        return _batch_executor
+
+
+def submit_bounded(
+    func: Callable,
+    items: Iterable,
+    limit: int
+) -> List[Future]:
+
+    """ Выполняет func(item) в общем пуле так,
+        чтобы одновременно выполнялось не более limit заданий.
+        Не блокирует вызывающий поток. Возвращает futures в порядке items,
+        отмена future еще не начатого задания исключает его из очереди """
+
+    executor = get_executor()
+    items = list(items)
+    futures = [Future() for _ in items]
+    indexes = iter(range(len(items)))
+    lock = threading.Lock()
+
+    def run(index: int):
+        future = futures[index]
+        try:
+            result = func(items[index])
+        except BaseException as ex:
+            future.set_exception(ex)
+        else:
+            future.set_result(result)
+        finally:
+            submit_next()
+
+    def submit_next():
+        while True:
+            with lock:
+                index = next(indexes, None)
+            if index is None:
+                return
+            if futures[index].set_running_or_notify_cancel():
+                executor.submit(run, index)
+                return
+
+    for _ in range(min(max(limit, 1), len(items))):
+        submit_next()
+    return futures
+
+
+class ProcessGroup:
+
+    """ Процессы, которые нужно уничтожить при отмене задания """
+
+    def __init__(self):
+        self.cancelled = False
+        self._procs = []
+        self._lock = threading.Lock()
+
+    def add(self, proc: subprocess.Popen):
+        with self._lock:
+            self._procs.append(proc)
+            if not self.cancelled:
+                return
+        proc.kill()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            procs = list(self._procs)
+        for proc in procs:
+            proc.kill()
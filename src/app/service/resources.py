@@ -0,0 +1,127 @@
+import os
+import math
+import time
+import signal
+import resource
+import subprocess
+from typing import Optional
+from app import config, messages
+from app.entities import LimitsData, ResourceLimits
+from app.service.entities import ResourceUsage
+
+# Общее начало MSG_1 и MSG_19
+TIMEOUT_ERROR_PREFIX = messages.MSG_19.split('{')[0]
+
+
+def get_limits(
+    phase: str,
+    requested: Optional[LimitsData] = None
+) -> ResourceLimits:
+
+    """ Ограничения фазы compile или execute: заданные в запросе,
+        остальные - из настроек. None - без ограничения """
+
+    prefix = phase.upper()
+    limits = ResourceLimits(
+        cpu_time=getattr(config, f'{prefix}_CPU_LIMIT') or None,
+        wall_time=getattr(config, f'{prefix}_WALL_LIMIT') or None,
+        memory=getattr(config, f'{prefix}_MEMORY_LIMIT') or None
+    )
+    phase_limits = getattr(requested, phase, None)
+    if phase_limits is not None:
+        for name in ('cpu_time', 'wall_time', 'memory'):
+            value = getattr(phase_limits, name)
+            if value is not None:
+                setattr(limits, name, value)
+    return limits
+
+
+def get_timeout_error(phase: str, limits: ResourceLimits) -> str:
+
+    """ Ошибка превышения времени выполнения с примененным
+        ограничением. Для ограничения из настроек - прежний текст MSG_1 """
+
+    default = getattr(config, f'{phase.upper()}_WALL_LIMIT') or None
+    if limits.wall_time == default:
+        return messages.MSG_1
+    return messages.MSG_19.format(limits.wall_time)
+
+
+def is_timeout_error(error: Optional[str]) -> bool:
+    return bool(error) and error.startswith(TIMEOUT_ERROR_PREFIX)
+
+
+def set_rlimits(limits: ResourceLimits):
+
+    """ Вызывается в дочернем процессе перед запуском программы.
+        По мягкому ограничению процессорного времени ядро посылает
+        SIGXCPU, по жесткому (на секунду больше) - SIGKILL """
+
+    if limits.cpu_time:
+        seconds = math.ceil(limits.cpu_time)
+        resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+    if limits.memory:
+        resource.setrlimit(
+            resource.RLIMIT_AS, (limits.memory, limits.memory)
+        )
+
+
+def cpu_limit_exceeded(
+    proc: subprocess.Popen,
+    usage: Optional[ResourceUsage],
+    limits: ResourceLimits
+) -> bool:
+
+    """ Процесс уничтожен ядром из-за ограничения RLIMIT_CPU """
+
+    if not limits.cpu_time:
+        return False
+    returncode = getattr(proc, 'returncode', None)
+    if returncode == -signal.SIGXCPU:
+        return True
+    return (
+        returncode == -signal.SIGKILL
+        and usage is not None
+        and usage.cpu_time is not None
+        and usage.cpu_time >= limits.cpu_time
+    )
+
+
+class RusagePopen(subprocess.Popen):
+
+    """ Popen, который при ожидании завершения процесса
+        сохраняет его rusage (os.wait4 вместо os.waitpid) """
+
+    rusage = None
+
+    def _try_wait(self, wait_flags):
+        try:
+            pid, status, rusage = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            return self.pid, 0
+        if pid == self.pid:
+            self.rusage = rusage
+        return pid, status
+
+
+def get_usage(
+    proc: subprocess.Popen,
+    started: float
+) -> Optional[ResourceUsage]:
+
+    """ Дожидается завершения (уже убитого) процесса
+        и возвращает затраченные им ресурсы """
+
+    wall_time = time.monotonic() - started
+    try:
+        proc.wait(timeout=1)
+    except Exception:
+        return None
+    rusage = getattr(proc, 'rusage', None)
+    if rusage is None:
+        return ResourceUsage(wall_time=wall_time)
+    return ResourceUsage(
+        wall_time=wall_time,
+        cpu_time=rusage.ru_utime + rusage.ru_stime,
+        max_rss=rusage.ru_maxrss
+    )
@@ -0,0 +1,215 @@
+import os
+import re
+import sys
+import json
+import mmap
+import uuid
+import struct
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple, Union
+from app import config
+from app.utils import make_private_dir
+from app.entities import CheckerPreset, TestData
+
+# Файл набора тестов: MAGIC, размер метаданных (uint32), метаданные
+# в JSON {"checker": str | {"preset": str, "eps": float}, "count": int},
+# размеры значений (int64, -1 - None) - data_in и data_out каждого
+# теста подряд, затем сами значения в UTF-8. Числа - little-endian
+MAGIC = b'PSUITE1\n'
+ENCODING = 'utf-8'
+ERRORS = 'surrogatepass'
+SUITE_ID = re.compile(r'^[0-9a-f]{64}$')
+
+
+class Suite:
+
+    """ Зарегистрированный набор тестов и функция checker """
+
+    def __init__(
+        self,
+        checker: Union[str, CheckerPreset],
+        values: List[Tuple[Optional[str], Optional[str]]],
+        size: int
+    ):
+        self.checker = checker
+        self.values = values
+        self.size = size
+
+    def create_tests(self) -> List[TestData]:
+
+        """ Новые тесты для запроса: результаты
+            записываются в них, набор не меняется """
+
+        return [
+            TestData(data_in=data_in, data_out=data_out)
+            for data_in, data_out in self.values
+        ]
+
+
+def encode_suite(
+    tests: List[TestData],
+    checker: Union[str, CheckerPreset]
+) -> List[bytes]:
+    if isinstance(checker, CheckerPreset):
+        checker = {'preset': checker.preset, 'eps': checker.eps}
+    meta = json.dumps(
+        {'checker': checker, 'count': len(tests)},
+        sort_keys=True
+    ).encode()
+    blobs = []
+    for test in tests:
+        for value in (test.data_in, test.data_out):
+            blobs.append(
+                None if value is None else value.encode(ENCODING, ERRORS)
+            )
+    sizes = array('q', [-1 if blob is None else len(blob) for blob in blobs])
+    if sys.byteorder == 'big':
+        sizes.byteswap()
+    return [
+        MAGIC,
+        struct.pack('<I', len(meta)),
+        meta,
+        sizes.tobytes(),
+        *(blob for blob in blobs if blob)
+    ]
+
+
+def decode_suite(data: memoryview) -> Suite:
+
+    """ Читает набор из отображенного в память файла.
+        Строки декодируются прямо из отображения, без копии файла """
+
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError('Invalid suite file')
+    offset = len(MAGIC)
+    meta_size, = struct.unpack_from('<I', data, offset)
+    offset += 4
+    meta = json.loads(bytes(data[offset:offset + meta_size]))
+    offset += meta_size
+    sizes = array('q')
+    sizes.frombytes(data[offset:offset + meta['count'] * 2 * sizes.itemsize])
+    if sys.byteorder == 'big':
+        sizes.byteswap()
+    offset += len(sizes) * sizes.itemsize
+    strings = []
+    for size in sizes:
+        if size < 0:
+            strings.append(None)
+            continue
+        strings.append(str(data[offset:offset + size], ENCODING, ERRORS))
+        offset += size
+    checker = meta['checker']
+    if isinstance(checker, dict):
+        checker = CheckerPreset(**checker)
+    return Suite(
+        checker=checker,
+        values=list(zip(strings[::2], strings[1::2])),
+        size=len(data)
+    )
+
+
+class SuiteRegistry:
+
+    """ Наборы тестов на диске, общие для воркеров.
+        Каталог (0700) и файлы (0600) доступны только сервису.
+        Идентификатор набора - хэш содержимого файла, поэтому
+        повторная регистрация того же набора возвращает тот же id.
+        Прочитанные наборы хранятся в LRU-кэше воркера
+        размером не больше max_bytes (по размеру файлов) """
+
+    suffix = '.suite'
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _get_path(self, suite_id: str) -> str:
+        return os.path.join(self.directory, suite_id + self.suffix)
+
+    def put(
+        self,
+        tests: List[TestData],
+        checker: Union[str, CheckerPreset]
+    ) -> str:
+
+        """ Сохраняет набор, возвращает его id """
+
+        chunks = encode_suite(tests, checker)
+        digest = hashlib.sha256()
+        for chunk in chunks:
+            digest.update(chunk)
+        suite_id = digest.hexdigest()
+        path = self._get_path(suite_id)
+        if os.path.exists(path):
+            return suite_id
+        make_private_dir(self.directory)
+        tmp_path = f'{path}.{uuid.uuid4()}.tmp'
+        try:
+            # Набор содержит эталонные ответы: файл только для сервиса
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with open(fd, 'wb') as file:
+                file.writelines(chunks)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return suite_id
+
+    def _read(self, suite_id: str) -> Optional[Suite]:
+        try:
+            with open(self._get_path(suite_id), 'rb') as file:
+                with mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as mapped:
+                    with memoryview(mapped) as data:
+                        return decode_suite(data)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, suite_id: str) -> Optional[Suite]:
+
+        """ Набор по id или None, если набор не зарегистрирован """
+
+        if not SUITE_ID.match(suite_id):
+            return None
+        with self._lock:
+            suite = self._items.get(suite_id)
+            if suite is not None:
+                self.hits += 1
+                self._items.move_to_end(suite_id)
+                return suite
+            self.misses += 1
+        suite = self._read(suite_id)
+        if suite is None or suite.size > self.max_bytes:
+            return suite
+        with self._lock:
+            if suite_id not in self._items:
+                self._items[suite_id] = suite
+                self._size += suite.size
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= evicted.size
+        return suite
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._items),
+                'bytes': self._size,
+            }
+
+
+suite_registry = SuiteRegistry(
+    directory=config.SUITES_DIR,
+    max_bytes=config.SUITES_CACHE_MAX_BYTES
+)
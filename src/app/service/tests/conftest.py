@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture()
+def program(tmp_path, mocker):
+
+    def create(code: str):
+        filepath_pas = tmp_path / 'program.pas'
+        filepath_pas.write_text(code)
+        return mocker.Mock(
+            code=code,
+            filepath_pas=str(filepath_pas),
+            filepath_exe=str(tmp_path / 'program.exe')
+        )
+
+    return create
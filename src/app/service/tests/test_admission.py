@@ -0,0 +1,134 @@
+import time
+import pytest
+import threading
+from app.service.admission import AdmissionController
+from app.service.exceptions import AdmissionException
+
+
+@pytest.fixture()
+def create_controller(tmp_path):
+
+    def create() -> AdmissionController:
+        return AdmissionController(
+            directory=str(tmp_path),
+            limit=1,
+            queue_size=1,
+            max_wait=1,
+            retry_after=7
+        )
+
+    return create
+
+
+@pytest.fixture()
+def controller(create_controller) -> AdmissionController:
+    return create_controller()
+
+
+def test_acquire__disabled__ok(controller):
+
+    # arrange
+    controller.limit = 0
+
+    # act
+    fd_1 = controller.acquire()
+    fd_2 = controller.acquire()
+
+    # assert
+    assert fd_1 is None
+    assert fd_2 is None
+    controller.release(fd_1)
+    assert controller.stats()['admitted'] == 0
+
+
+def test_acquire__free_slots__ok(controller):
+
+    # arrange
+    controller.limit = 2
+    controller.queue_size = 0
+
+    # act
+    fd_1 = controller.acquire()
+    fd_2 = controller.acquire()
+
+    # assert
+    assert controller.stats()['active'] == 2
+    controller.release(fd_1)
+    controller.release(fd_2)
+    stats = controller.stats()
+    assert stats['active'] == 0
+    assert stats['admitted'] == 2
+
+
+def test_acquire__queue_full__reject(controller):
+
+    # arrange
+    controller.queue_size = 0
+    fd = controller.acquire()
+
+    # act
+    with pytest.raises(AdmissionException) as ex:
+        controller.acquire()
+
+    # assert
+    assert ex.value.retry_after == 7
+    assert controller.stats()['rejected'] == 1
+    assert controller.stats()['timeouts'] == 0
+    controller.release(fd)
+
+
+def test_acquire__max_wait__reject(controller):
+
+    # arrange
+    controller.max_wait = 0.1
+    fd = controller.acquire()
+    started = time.monotonic()
+
+    # act
+    with pytest.raises(AdmissionException):
+        controller.acquire()
+
+    # assert
+    assert time.monotonic() - started < 1
+    stats = controller.stats()
+    assert stats['timeouts'] == 1
+    assert stats['queued'] == 0
+    controller.release(fd)
+
+
+def test_acquire__slot_released__admit_waiting(controller):
+
+    # arrange
+    controller.max_wait = 5
+    fd = controller.acquire()
+    timer = threading.Timer(0.1, controller.release, args=(fd,))
+
+    # act
+    timer.start()
+    with controller.admit():
+        stats = controller.stats()
+
+    # assert
+    assert stats['active'] == 1
+    assert stats['admitted'] == 2
+    assert controller.stats()['active'] == 0
+
+
+def test_acquire__other_controller__share_slots(create_controller):
+
+    # arrange
+    controller_1 = create_controller()
+    controller_1.queue_size = 0
+    controller_2 = create_controller()
+    controller_2.queue_size = 0
+    fd = controller_1.acquire()
+
+    # act
+    with pytest.raises(AdmissionException):
+        controller_2.acquire()
+    controller_1.release(fd)
+    with controller_2.admit():
+        pass
+
+    # assert
+    assert controller_2.stats()['admitted'] == 1
@@ -0,0 +1,253 @@
+import time
+import asyncio
+from app import messages
+from app.entities import (
+    DebugData,
+    TestData,
+    TestsData,
+    CheckerPreset,
+    ResourceLimits
+)
+from app.service.aio import AsyncPascalService
+from app.service.entities import ExecuteResult
+
+
+def test_compile_and_execute__fake_toolchain__ok(fake_toolchain, program):
+
+    # arrange
+    fake_toolchain()
+    file = program('begin end.')
+
+    async def run():
+        error = await AsyncPascalService._compile(file)
+        return error, await AsyncPascalService._execute(
+            file=file, data_in='1 2'
+        )
+
+    # act
+    error, result = asyncio.run(run())
+
+    # assert
+    assert error is None
+    assert result.error is None
+    assert result.result == '1 2'
+    assert result.usage.wall_time > 0
+    assert result.usage.cpu_time is not None
+
+
+def test_compile__compile_error__ok(fake_toolchain, program):
+
+    # arrange
+    fake_toolchain()
+    file = program('{ fake:compile_error } begin end.')
+
+    # act
+    error = asyncio.run(AsyncPascalService._compile(file))
+
+    # assert
+    assert 'Fake compilation error' in error
+
+
+def test_execute__timeout__return_error(fake_toolchain, program):
+
+    # arrange
+    fake_toolchain()
+    file = program('{ fake:timeout } begin end.')
+    asyncio.run(AsyncPascalService._compile(file))
+    started = time.monotonic()
+
+    # act
+    result = asyncio.run(AsyncPascalService._execute(
+        file=file,
+        data_in='1',
+        limits=ResourceLimits(wall_time=0.5)
+    ))
+
+    # assert
+    assert result.error == (
+        'Program execution time limit exceeded. Limit 0.5 seconds!'
+    )
+    assert time.monotonic() - started < 3
+
+
+def test_execute__many_programs__run_concurrently(fake_toolchain, program):
+
+    # arrange
+    fake_toolchain(execute_latency=0.5)
+    file = program('begin end.')
+    asyncio.run(AsyncPascalService._compile(file))
+    started = time.monotonic()
+
+    async def run():
+        return await asyncio.gather(*(
+            AsyncPascalService._execute(file=file, data_in=str(number))
+            for number in range(50)
+        ))
+
+    # act
+    results = asyncio.run(run())
+
+    # assert
+    assert [result.result for result in results] == [
+        str(number) for number in range(50)
+    ]
+    assert time.monotonic() - started < 10
+
+
+def test_testing__fail_fast__skip_tests(mocker):
+
+    # arrange
+    mocker.patch('app.config.TESTING_WORKERS', 4)
+    mocker.patch('app.config.TESTING_MAX_WORKERS_PER_REQUEST', 4)
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.aio.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.aio.AsyncPascalService._compile',
+        return_value=None
+    )
+
+    async def execute(file, data_in, limits, comparator):
+        if data_in == 'slow':
+            await asyncio.sleep(10)
+        return ExecuteResult(result=data_in, error=None)
+
+    mocker.patch(
+        'app.service.aio.AsyncPascalService._execute',
+        side_effect=execute
+    )
+    data = TestsData(
+        code='some code',
+        checker=CheckerPreset(preset='exact'),
+        fail_fast=True,
+        tests=[
+            TestData(data_in='1', data_out='1'),
+            TestData(data_in='2', data_out='3'),
+            TestData(data_in='slow', data_out='slow'),
+        ]
+    )
+    started = time.monotonic()
+
+    # act
+    result = asyncio.run(AsyncPascalService.testing(data))
+
+    # assert
+    assert time.monotonic() - started < 5
+    assert [test.ok for test in result.tests] == [True, False, False]
+    assert result.tests[2].error == messages.MSG_9
+    file_mock.remove.assert_called_once_with()
+
+
+def test_testing__fail_fast_out_of_order__keep_checked_results(mocker):
+
+    # arrange
+    mocker.patch('app.config.TESTING_WORKERS', 4)
+    mocker.patch('app.config.TESTING_MAX_WORKERS_PER_REQUEST', 4)
+    mocker.patch('app.service.aio.PascalFile', return_value=mocker.Mock())
+    mocker.patch(
+        'app.service.aio.AsyncPascalService._compile',
+        return_value=None
+    )
+    delays = {'0': 0.2, '1': 0.1, '2': 0, '3': 0.5}
+
+    async def execute(file, data_in, limits, comparator):
+        await asyncio.sleep(delays[data_in])
+        return ExecuteResult(result=data_in, error=None)
+
+    mocker.patch(
+        'app.service.aio.AsyncPascalService._execute',
+        side_effect=execute
+    )
+    data = TestsData(
+        code='some code',
+        checker=CheckerPreset(preset='exact'),
+        fail_fast=True,
+        tests=[
+            TestData(data_in='0', data_out='wrong'),
+            TestData(data_in='1', data_out='1'),
+            TestData(data_in='2', data_out='wrong'),
+            TestData(data_in='3', data_out='3'),
+        ]
+    )
+
+    # act
+    result = asyncio.run(AsyncPascalService.testing(data))
+
+    # assert
+    assert [test.ok for test in result.tests] == [False, True, False, False]
+    assert [test.error for test in result.tests] == [
+        None, None, None, messages.MSG_9
+    ]
+    assert result.tests[2].result == '2'
+
+
+def test_debug__compile_error__not_execute(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(compile_usage=None)
+    mocker.patch('app.service.aio.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.aio.AsyncPascalService._compile',
+        return_value='some error'
+    )
+    execute_mock = mocker.patch(
+        'app.service.aio.AsyncPascalService._execute'
+    )
+
+    # act
+    result = asyncio.run(AsyncPascalService.debug(
+        DebugData(code='some code')
+    ))
+
+    # assert
+    assert result.error == 'some error'
+    execute_mock.assert_not_called()
+    file_mock.remove.assert_called_once_with()
+
+
+def test_testing__slow_checker__not_block_other_requests(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(code='some code', compile_usage=None)
+    mocker.patch('app.service.aio.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.aio.AsyncPascalService._compile',
+        return_value=None
+    )
+    mocker.patch(
+        'app.service.aio.AsyncPascalService._execute',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+
+    def slow_checker(right_value, value):
+        time.sleep(1)
+        return right_value == value
+
+    mocker.patch(
+        'app.service.aio.PascalService._get_checker',
+        return_value=slow_checker
+    )
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        tests=[TestData(data_in='1', data_out='1')]
+    )
+    finished = {}
+
+    async def debug():
+        await asyncio.sleep(0.05)
+        await AsyncPascalService.debug(DebugData(code='some code'))
+        finished['debug'] = time.monotonic()
+
+    async def testing():
+        await AsyncPascalService.testing(data)
+        finished['testing'] = time.monotonic()
+
+    async def run():
+        await asyncio.gather(testing(), debug())
+
+    # act
+    asyncio.run(run())
+
+    # assert
+    assert finished['debug'] < finished['testing'] - 0.5
+    assert data.tests[0].ok is True
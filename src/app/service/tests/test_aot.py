@@ -0,0 +1,77 @@
+import subprocess
+from app.service import aot
+
+
+def test_aot_compile__ok(mocker, tmp_path):
+
+    # arrange
+    path = str(tmp_path / 'program.exe')
+    (tmp_path / 'program.exe.so').write_bytes(b'')
+    run_mock = mocker.patch(
+        'subprocess.run',
+        return_value=mocker.Mock(returncode=0)
+    )
+
+    # act
+    result = aot.aot_compile(path, timeout=5)
+
+    # assert
+    assert result is True
+    run_mock.assert_called_once_with(
+        args=['mono', '--aot', path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=5
+    )
+
+
+def test_aot_compile__options__ok(mocker, tmp_path):
+
+    # arrange
+    path = str(tmp_path / 'program.exe')
+    mocker.patch('app.config.AOT_OPTIONS', 'full')
+    run_mock = mocker.patch(
+        'subprocess.run',
+        return_value=mocker.Mock(returncode=0)
+    )
+
+    # act
+    aot.aot_compile(path)
+
+    # assert
+    assert run_mock.call_args.kwargs['args'] == ['mono', '--aot=full', path]
+
+
+def test_aot_compile__error__return_false(mocker, tmp_path):
+
+    # arrange
+    mocker.patch(
+        'subprocess.run',
+        side_effect=subprocess.TimeoutExpired(cmd='', timeout=5)
+    )
+
+    # act
+    result = aot.aot_compile(str(tmp_path / 'program.exe'), timeout=5)
+
+    # assert
+    assert result is False
+
+
+def test_precompile_toolchain__skip_compiled(mocker, tmp_path):
+
+    # arrange
+    (tmp_path / 'pabcnetcclear.exe').write_bytes(b'')
+    (tmp_path / 'Compiler.dll').write_bytes(b'')
+    (tmp_path / 'Compiler.dll.so').write_bytes(b'')
+    (tmp_path / 'Lib').mkdir()
+    (tmp_path / 'Lib' / 'PABCRtl.dll').write_bytes(b'')
+    aot_compile_mock = mocker.patch('app.service.aot.aot_compile')
+
+    # act
+    aot.precompile_toolchain(str(tmp_path))
+
+    # assert
+    assert aot_compile_mock.call_args_list == [
+        mocker.call(str(tmp_path / 'Lib' / 'PABCRtl.dll')),
+        mocker.call(str(tmp_path / 'pabcnetcclear.exe')),
+    ]
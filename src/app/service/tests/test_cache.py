@@ -0,0 +1,250 @@
+import pytest
+from app.service.cache import (
+    CompileCache,
+    ResultCache,
+    normalize_code,
+    is_deterministic
+)
+from app.service.entities import ExecuteResult
+
+
+@pytest.fixture()
+def create_cache(tmp_path):
+
+    def create() -> CompileCache:
+        return CompileCache(
+            directory=str(tmp_path / 'cache'),
+            max_bytes=1024,
+            max_entries=10,
+            compiler_path=str(tmp_path / 'compiler.exe')
+        )
+
+    return create
+
+
+@pytest.fixture()
+def cache(create_cache) -> CompileCache:
+    return create_cache()
+
+
+@pytest.fixture()
+def exe(tmp_path):
+
+    def create(name: str, content: bytes = b'exe') -> str:
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+
+    return create
+
+
+def test_normalize_code__ok():
+
+    # act
+    result = normalize_code('\ufeffbegin  \r\n  writeln(1);\t\r\nend.\n\n')
+
+    # assert
+    assert result == 'begin\n  writeln(1);\nend.'
+
+
+def test_get_key__same_normalized_code__same_key(cache):
+
+    # arrange
+    # act
+    key_1 = cache.get_key('begin\r\nend.')
+    key_2 = cache.get_key('begin  \nend.\n')
+    key_3 = cache.get_key('begin\nwriteln(1);\nend.')
+
+    # assert
+    assert key_1 == key_2
+    assert key_1 != key_3
+
+
+def test_get_key__compiler_changed__other_key(cache, create_cache, tmp_path):
+
+    # arrange
+    compiler = tmp_path / 'compiler.exe'
+    compiler.write_bytes(b'v1')
+    key_1 = cache.get_key('begin end.')
+    compiler.write_bytes(b'v2.0')
+
+    # act
+    key_2 = create_cache().get_key('begin end.')
+
+    # assert
+    assert key_1 != key_2
+
+
+def test_restore__miss__return_false(cache, tmp_path):
+
+    # arrange
+    target = str(tmp_path / 'target.exe')
+
+    # act
+    result = cache.restore('key', target)
+
+    # assert
+    assert result is False
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 0
+
+
+def test_restore__hit__copy_exe(cache, exe, tmp_path):
+
+    # arrange
+    cache.store('key', exe('source.exe', b'program'))
+    target = tmp_path / 'target.exe'
+
+    # act
+    result = cache.restore('key', str(target))
+
+    # assert
+    assert result is True
+    assert target.read_bytes() == b'program'
+    assert cache.stats() == {
+        'hits': 1,
+        'misses': 0,
+        'entries': 1,
+        'bytes': 7,
+    }
+
+
+def test_restore__stored_by_other_process__hit(
+    cache,
+    create_cache,
+    exe,
+    tmp_path
+):
+
+    # arrange
+    create_cache().store('key', exe('source.exe'))
+    cache._loaded = True
+    target = tmp_path / 'target.exe'
+
+    # act
+    result = cache.restore('key', str(target))
+
+    # assert
+    assert result is True
+    assert target.read_bytes() == b'exe'
+
+
+def test_store__entries_limit__evict_lru(cache, exe, tmp_path):
+
+    # arrange
+    cache.max_entries = 2
+    cache.store('key_1', exe('1.exe'))
+    cache.store('key_2', exe('2.exe'))
+    cache.restore('key_1', str(tmp_path / 'target.exe'))
+
+    # act
+    cache.store('key_3', exe('3.exe'))
+
+    # assert
+    assert cache.restore('key_1', str(tmp_path / 'target_1.exe')) is True
+    assert cache.restore('key_2', str(tmp_path / 'target_2.exe')) is False
+    assert cache.restore('key_3', str(tmp_path / 'target_3.exe')) is True
+
+
+def test_store__bytes_limit__evict_lru(cache, exe, tmp_path):
+
+    # arrange
+    cache.max_bytes = 10
+    cache.store('key_1', exe('1.exe', b'x' * 6))
+
+    # act
+    cache.store('key_2', exe('2.exe', b'x' * 6))
+
+    # assert
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] == 6
+    assert not (tmp_path / 'cache' / 'key_1.exe').exists()
+    assert (tmp_path / 'cache' / 'key_2.exe').exists()
+
+
+@pytest.mark.parametrize('code,result', [
+    ('begin writeln(1) end.', True),
+    ('begin randomize; writeln(random(10)) end.', False),
+    ('begin writeln(Milliseconds) end.', False),
+    ('begin writeln(DateTime.Now) end.', False),
+    ('begin writeln(Random(1, 10)) end.', False),
+    ('begin assign(f, \'in.txt\'); end.', False),
+    ('begin writeln(ReadAllText(\'in.txt\')) end.', False),
+    ('var nowhere: integer; begin end.', True),
+    ('begin writeln(MillisecondsDelta) end.', False),
+    ('begin writeln(System.DateTime.Now.Second) end.', False),
+    ('type clock = System . Environment; begin end.', False),
+    ('uses System; begin writeln(Math.Sin(1)) end.', False),
+    ('uses Crt, Utils; begin end.', False),
+    ('uses crt; begin ClrScr; writeln(1) end.', True),
+    ('{$reference Some.dll} begin end.', False),
+    ('begin writeln(new object().GetHashCode) end.', False),
+])
+def test_is_deterministic__ok(code, result):
+
+    # act
+    assert is_deterministic(code) is result
+
+
+def test_result_cache__get_key__ok():
+
+    # act
+    key_1 = ResultCache.get_key('program', '1')
+    key_2 = ResultCache.get_key('program', '2')
+    key_3 = ResultCache.get_key('program', None)
+    key_4 = ResultCache.get_key('other program', '1')
+
+    # assert
+    assert len({key_1, key_2, key_3, key_4}) == 4
+    assert key_1 == ResultCache.get_key('program', '1')
+
+
+def test_result_cache__get__ok():
+
+    # arrange
+    cache = ResultCache(max_bytes=100)
+    exec_result = ExecuteResult(result='1', error=None)
+    cache.put('key', exec_result)
+
+    # act
+    result_1 = cache.get('key')
+    result_2 = cache.get('other key')
+
+    # assert
+    assert result_1 == exec_result
+    assert result_2 is None
+    assert cache.stats() == {
+        'hits': 1,
+        'misses': 1,
+        'entries': 1,
+        'bytes': 1
+    }
+
+
+def test_result_cache__bytes_limit__evict_lru():
+
+    # arrange
+    cache = ResultCache(max_bytes=10)
+    cache.put('key_1', ExecuteResult(result='x' * 4, error=None))
+    cache.put('key_2', ExecuteResult(result='x' * 4, error=None))
+    cache.get('key_1')
+
+    # act
+    cache.put('key_3', ExecuteResult(result=None, error='x' * 4))
+
+    # assert
+    assert cache.get('key_1') is not None
+    assert cache.get('key_2') is None
+    assert cache.get('key_3') is not None
+
+
+def test_result_cache__too_large__not_cached():
+
+    # arrange
+    cache = ResultCache(max_bytes=10)
+
+    # act
+    cache.put('key', ExecuteResult(result='x' * 11, error=None))
+
+    # assert
+    assert cache.get('key') is None
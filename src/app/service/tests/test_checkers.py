@@ -0,0 +1,192 @@
+import pytest
+from app.entities import CheckerPreset
+from app.service import checkers
+from app.service.checkers import CheckerCache
+from app.utils import clean_str
+
+
+def checker_1(right_value, value):
+    return True
+
+
+def checker_2(right_value, value):
+    return False
+
+
+def test_checker_cache__get__ok():
+
+    # arrange
+    cache = CheckerCache(size=2)
+    cache.put('source 1', checker_1)
+
+    # act
+    result_1 = cache.get('source 1')
+    result_2 = cache.get('source 2')
+
+    # assert
+    assert result_1 is checker_1
+    assert result_2 is None
+
+
+def test_checker_cache__size__evict_lru():
+
+    # arrange
+    cache = CheckerCache(size=2)
+    cache.put('source 1', checker_1)
+    cache.put('source 2', checker_2)
+    cache.get('source 1')
+
+    # act
+    cache.put('source 3', checker_2)
+
+    # assert
+    assert cache.get('source 1') is checker_1
+    assert cache.get('source 2') is None
+    assert cache.get('source 3') is checker_2
+
+
+@pytest.mark.parametrize('right_value,value,result', [
+    ('1 2', '1 2', True),
+    (None, None, True),
+    ('1 2', '1  2', False),
+    ('1', None, False),
+])
+def test_check_exact__ok(right_value, value, result):
+
+    # act
+    assert checkers.check_exact(right_value, value) is result
+
+
+@pytest.mark.parametrize('right_value,value,result', [
+    ('1 2\n3', '1   2 3', True),
+    ('1 2', '\t1\n\n2  ', True),
+    ('1 2', '1 2 3', False),
+    ('1 2 3', '1 2', False),
+    ('1 2', '1 3', False),
+    (None, '', True),
+])
+def test_check_tokens__ok(right_value, value, result):
+
+    # act
+    assert checkers.check_tokens(right_value, value) is result
+
+
+@pytest.mark.parametrize('right_value,value,result', [
+    ('1 2\n3', '1 2  \n3', True),
+    ('1 2\n3', '1 2 3', False),
+    ('1 2\n3', '1  2\n3', False),
+    ('1\n2', '1\n2\n3', False),
+    ('1\n\n2', '1\n2', False),
+])
+def test_check_lines__ok(right_value, value, result):
+
+    # act
+    assert checkers.check_lines(right_value, value) is result
+
+
+@pytest.mark.parametrize('right_value,value,result', [
+    ('0.08', '0.0800001', True),
+    ('0.08 word', '0.08  word', True),
+    ('1000000', '1000000.5', True),
+    ('0.08', '0.081', False),
+    ('0.08 word', '0.08 other', False),
+    ('0.08', '0.08 1', False),
+    ('nan', 'word', False),
+])
+def test_check_float__ok(right_value, value, result):
+
+    # act
+    assert checkers.check_float(right_value, value, eps=1e-6) is result
+
+
+def test_get_preset_checker__float__ok():
+
+    # arrange
+    checker = checkers.get_preset_checker(
+        CheckerPreset(preset='float', eps=0.01)
+    )
+
+    # act
+    assert checker('0.08', '0.085') is True
+    assert checker('0.08', '0.1') is False
+
+
+def test_check_tokens__huge_output__ok():
+
+    # arrange
+    value = '1 ' * 200000
+
+    # act
+    assert checkers.check_tokens(value, value.replace(' ', '\n')) is True
+
+
+def feed(comparator, output: str, size: int) -> bool:
+    for start in range(0, len(output), size):
+        if not comparator.feed(output[start:start + size]):
+            return False
+    return True
+
+
+@pytest.mark.parametrize('preset,right_value,output,mismatch', [
+    ('lines', '1 2\n3', '1 2\n4\n5\n', 2),
+    ('lines', '1 2\n3', '1 2  \r\n3\n\n\n', None),
+    ('lines', '1\n2', '1\n2\n3\n', 3),
+    ('lines', '1\n2', '1\n\n2\n', 2),
+    ('lines', '1', '2', None),
+    ('tokens', '1 2 3', '1\n2  4 5', 3),
+    ('tokens', '1 2', '1 2\n\n', None),
+    ('tokens', '1 2', '1 2 3 ', 3),
+    ('tokens', '12', '1\ufeff2 ', None),
+    ('float', '0.08 1', '0.0800001 2 ', 2),
+])
+def test_stream_comparator__ok(preset, right_value, output, mismatch):
+
+    # arrange
+    preset = CheckerPreset(preset=preset)
+    checker = checkers.get_preset_checker(preset)
+
+    for size in (1, 3, len(output)):
+        comparator = checkers.get_stream_comparator(preset, right_value)
+
+        # act
+        ok = feed(comparator, output, size)
+
+        # assert
+        assert comparator.mismatch == mismatch
+        assert ok is (mismatch is None)
+        if not ok:
+            assert checker(right_value, clean_str(output)) is False
+
+
+@pytest.mark.parametrize('preset,output', [
+    ('lines', '1\n2\n\n\n\n'),
+    ('lines', '1\n2  \n'),
+    ('lines', '1\n2\n3'),
+    ('tokens', ' 1\n\t2'),
+    ('tokens', '1 2 3'),
+    ('float', '1.0 2.0000001'),
+])
+def test_stream_comparator__prefix__not_mismatch(preset, output):
+
+    # arrange
+    comparator = checkers.get_stream_comparator(
+        CheckerPreset(preset=preset), '1\n2'
+    )
+
+    # act
+    ok = feed(comparator, output, 1)
+
+    # assert
+    assert ok is True
+    assert comparator.mismatch is None
+
+
+def test_get_stream_comparator__exact__return_none():
+
+    # act
+    comparator = checkers.get_stream_comparator(
+        CheckerPreset(preset='exact'), '1'
+    )
+
+    # assert
+    assert comparator is None
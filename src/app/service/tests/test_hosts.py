@@ -0,0 +1,393 @@
+import sys
+import subprocess
+import pytest
+from app.service.hosts import (
+    Host,
+    CompilerHostPool,
+    CheckerHostPool,
+    ExecutionSession,
+    HostException
+)
+from app.service import fake_toolchain, checker_worker
+
+# Процесс, реализующий протокол хоста компилятора:
+# отвечает "OK\n" или выводом "error: <путь>",
+# зависает на пути "hang", завершается на пути "exit"
+# и отвечает мусором вместо длины на пути "garbage"
+HOST_SCRIPT = '''
+import sys, time
+for line in sys.stdin:
+    path = line.strip()
+    if path == 'hang':
+        time.sleep(60)
+    if path == 'exit':
+        sys.exit(1)
+    if path == 'garbage':
+        sys.stdout.buffer.write(b'garbage\\n')
+        sys.stdout.buffer.flush()
+        continue
+    payload = ('OK\\n' if path == 'ok' else 'error: ' + path).encode()
+    sys.stdout.buffer.write(str(len(payload)).encode() + b'\\n' + payload)
+    sys.stdout.buffer.flush()
+'''
+HOST_ARGS = [sys.executable, '-c', HOST_SCRIPT]
+
+
+@pytest.fixture()
+def session(tmp_path) -> ExecutionSession:
+    artifact = tmp_path / 'program.exe'
+    artifact.write_text('{ fake:runtime_error } begin end.')
+    session = ExecutionSession([
+        sys.executable, fake_toolchain.__file__, 'host', str(artifact),
+        '--output-limit=4', '--runtime-error-rate=0.5'
+    ])
+    yield session
+    session.close()
+
+
+@pytest.fixture()
+def pool() -> CompilerHostPool:
+    pool = CompilerHostPool(args=HOST_ARGS, size=1, max_jobs=10)
+    yield pool
+    pool.stop()
+
+
+def test_host__request__ok():
+
+    # arrange
+    host = Host(HOST_ARGS)
+
+    # act
+    result_1 = host.request('ok', timeout=5)
+    result_2 = host.request('файл.pas', timeout=5)
+
+    # assert
+    assert result_1 == b'OK\n'
+    assert result_2 == 'error: файл.pas'.encode()
+    assert host.jobs == 2
+    host.kill()
+
+
+def test_host__not_exists__raise_exception():
+
+    # act
+    with pytest.raises(HostException):
+        Host(['/not/exists/mono'])
+
+
+def test_pool__compile__reuse_host(pool):
+
+    # act
+    pool.compile('ok', timeout=5)
+    host = pool._idle.queue[0]
+    result = pool.compile('ok', timeout=5)
+
+    # assert
+    assert result == 'OK\n'
+    assert pool._idle.queue == [host]
+    assert host.jobs == 2
+
+
+def test_pool__timeout__restart_host(pool):
+
+    # arrange
+    pool.start()
+    host = pool._idle.queue[0]
+
+    # act
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.compile('hang', timeout=0.5)
+
+    # assert
+    assert not host.alive
+    assert pool.compile('ok', timeout=5) == 'OK\n'
+
+
+def test_pool__host_crashed__raise_exception_and_restart(pool):
+
+    # act
+    with pytest.raises(HostException):
+        pool.compile('exit', timeout=5)
+
+    # assert
+    assert pool.compile('ok', timeout=5) == 'OK\n'
+
+
+def test_pool__garbage_response__raise_exception_and_restart(pool):
+
+    # arrange
+    pool.start()
+    host = pool._idle.queue[0]
+
+    # act
+    with pytest.raises(HostException):
+        pool.compile('garbage', timeout=5)
+
+    # assert
+    assert not host.alive
+    assert pool.compile('ok', timeout=5) == 'OK\n'
+
+
+def test_pool__max_jobs__recycle_host(pool):
+
+    # arrange
+    pool.max_jobs = 1
+    pool.compile('ok', timeout=5)
+    host = pool._idle.queue[0]
+
+    # act
+    pool.compile('ok', timeout=5)
+
+    # assert
+    assert pool._idle.queue[0] is not host
+
+
+def test_pool__no_free_host__raise_exception(pool):
+
+    # arrange
+    pool.size = 0
+
+    # act
+    with pytest.raises(HostException):
+        pool.compile('ok', timeout=5)
+
+
+def test_execution_session__run__reuse_host(session):
+
+    # act
+    run_1 = session.run('1', timeout=5)
+    host = session._host
+    run_2 = session.run('123456', timeout=5)
+
+    # assert
+    assert run_1.exit_code == 1
+    assert 'Fake runtime error' in run_1.stderr
+    assert run_2.stdout == ''
+    assert session._host is host
+    assert host.jobs == 2
+    session.close()
+    assert session._host is None
+    assert not host.alive
+
+
+def test_execution_session__create__start_host(tmp_path):
+
+    # arrange
+    artifact = tmp_path / 'program.exe'
+    artifact.write_text('begin end.')
+
+    # act
+    session = ExecutionSession([
+        sys.executable, fake_toolchain.__file__, 'host', str(artifact)
+    ])
+
+    # assert
+    assert session._host is not None
+    assert session._host.alive
+    session.close()
+
+
+def test_execution_session__output_overflow__stop_program(tmp_path):
+
+    # arrange
+    artifact = tmp_path / 'program.exe'
+    artifact.write_text('begin end.')
+    session = ExecutionSession([
+        sys.executable, fake_toolchain.__file__, 'host', str(artifact),
+        '--output-limit=4'
+    ])
+
+    # act
+    result = session.run('123456', timeout=5)
+
+    # assert
+    assert result.overflow is True
+    assert result.cpu_exceeded is False
+    assert result.stdout == '1234'
+    session.close()
+
+
+def test_execution_session__cpu_limit__stop_program(tmp_path):
+
+    # arrange
+    artifact = tmp_path / 'program.exe'
+    artifact.write_text('{ fake:busy } begin end.')
+    session = ExecutionSession([
+        sys.executable, fake_toolchain.__file__, 'host', str(artifact)
+    ])
+    host = session._host
+
+    # act
+    result = session.run('1', timeout=5, cpu_time=0.2)
+
+    # assert
+    assert result.cpu_exceeded is True
+    assert 0.2 <= result.cpu_time < 5
+    assert result.stdout == ''
+    assert session._host is host
+    session.close()
+
+
+def test_execution_session__timeout__restart_host(session, mocker):
+
+    # arrange
+    session.run('1', timeout=5)
+    host = session._host
+    mocker.patch.object(
+        host,
+        '_read_response',
+        side_effect=subprocess.TimeoutExpired('host', 1)
+    )
+
+    # act
+    with pytest.raises(subprocess.TimeoutExpired):
+        session.run('1', timeout=1)
+    result = session.run('2', timeout=5)
+
+    # assert
+    assert not host.alive
+    assert session._host is not host
+    assert result.exit_code == 1
+
+
+def test_execution_session__host_exited__restart_host(session):
+
+    # arrange
+    host = session._host
+    host.kill()
+
+    # act
+    result = session.run('1', timeout=5)
+
+    # assert
+    assert session._host is not host
+    assert result.exit_code == 1
+
+
+CHECKER = (
+    'def checker(right_value: str, value: str) -> bool:\n'
+    '    print(value)\n'
+    '    return right_value == value'
+)
+
+
+@pytest.fixture()
+def checker_pool() -> CheckerHostPool:
+    pool = CheckerHostPool(
+        args=[sys.executable, checker_worker.__file__],
+        size=1,
+        max_jobs=10
+    )
+    yield pool
+
+
+def test_checker_pool__call__reuse_host(checker_pool):
+
+    # arrange
+    value = 'строка\n' * 100000
+
+    # act
+    result_1 = checker_pool.call('check', CHECKER, [value, value], timeout=5)
+    host = checker_pool._idle.queue[0]
+    result_2 = checker_pool.call('check', CHECKER, ['1', None], timeout=5)
+
+    # assert
+    assert result_1 == {'result': True}
+    assert result_2 == {'result': False}
+    assert checker_pool._idle.queue == [host]
+    assert host.jobs == 2
+
+
+def test_checker_pool__batch__ok(checker_pool):
+
+    # arrange
+    code = (
+        'def checker(pairs: list) -> list:\n'
+        '    return [right == value for right, value in pairs]'
+    )
+
+    # act
+    result = checker_pool.call('batch', code, ['1', '1', '2', None], timeout=5)
+
+    # assert
+    assert result == {'result': [True, False]}
+
+
+def test_checker_pool__not_bool__result_none(checker_pool):
+
+    # arrange
+    code = 'def checker(right_value: str, value: str) -> bool:\n    return 1'
+
+    # act
+    result = checker_pool.call('check', code, ['1', '1'], timeout=5)
+
+    # assert
+    assert result == {'result': None}
+
+
+def test_checker_pool__error__ok(checker_pool):
+
+    # arrange
+    code = 'def checker(right_value: str, value: str) -> bool:\n    1 / 0'
+
+    # act
+    compile_result = checker_pool.call('compile', code, [], timeout=5)
+    check_result = checker_pool.call('check', code, ['1', '1'], timeout=5)
+    syntax_result = checker_pool.call('compile', 'def checker(', [], timeout=5)
+
+    # assert
+    assert compile_result == {'result': True}
+    assert check_result == {'error': 'division by zero'}
+    assert 'error' in syntax_result
+
+
+def test_checker_pool__timeout__restart_host(checker_pool):
+
+    # arrange
+    code = (
+        'def checker(right_value: str, value: str) -> bool:\n'
+        '    while value == "hang":\n'
+        '        pass\n'
+        '    return True'
+    )
+    checker_pool.call('check', code, ['1', '1'], timeout=5)
+    host = checker_pool._idle.queue[0]
+
+    # act
+    with pytest.raises(subprocess.TimeoutExpired):
+        checker_pool.call('check', code, ['1', 'hang'], timeout=0.5)
+    result = checker_pool.call('check', code, ['1', '1'], timeout=5)
+
+    # assert
+    assert not host.alive
+    assert result == {'result': True}
+    assert checker_pool._idle.queue[0] is not host
+
+
+def test_checker_pool__max_jobs__restart_host(checker_pool):
+
+    # arrange
+    checker_pool.max_jobs = 1
+    checker_pool.call('check', CHECKER, ['1', '1'], timeout=5)
+    host = checker_pool._idle.queue[0]
+
+    # act
+    checker_pool.call('check', CHECKER, ['1', '1'], timeout=5)
+
+    # assert
+    assert not host.alive
+    assert checker_pool._idle.queue[0] is not host
+
+
+def test_checker_pool__busy__raise_exception(checker_pool):
+
+    # arrange
+    checker_pool.wait = 0.1
+    host = checker_pool._acquire()
+
+    # act
+    with pytest.raises(HostException):
+        checker_pool.call('check', CHECKER, ['1', '1'], timeout=5)
+
+    # assert
+    host.kill()
@@ -0,0 +1,132 @@
+import sys
+import time
+import pytest
+import subprocess
+from app.entities import CheckerPreset
+from app.service.checkers import get_stream_comparator
+from app.service.output import OutputBuffer, communicate
+
+
+def start(code: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        args=[sys.executable, '-c', code],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+
+def test_output_buffer__overflow__keep_head_and_tail():
+
+    # arrange
+    buffer = OutputBuffer(limit=8, head_size=3, tail_size=4)
+
+    # act
+    for chunk in (b'abcde', b'fghij', b'klm'):
+        buffer.write(chunk)
+
+    # assert
+    assert buffer.overflow is True
+    assert buffer.size == 13
+    assert buffer.getvalue() == 'abc\n...\njklm'
+
+
+def test_output_buffer__not_overflow__return_all():
+
+    # arrange
+    buffer = OutputBuffer(limit=8, head_size=3, tail_size=4)
+
+    # act
+    buffer.write('привет'.encode()[:8])
+
+    # assert
+    assert buffer.overflow is False
+    assert buffer.getvalue() == 'прив'
+
+
+def test_communicate__large_input__ok():
+
+    # arrange
+    proc = start('import sys; print(len(sys.stdin.read()))')
+
+    # act
+    stdout, stderr, overflow = communicate(
+        proc, 'x' * 1000000, timeout=10, limit=1024, head_size=1024
+    )
+
+    # assert
+    assert stdout == '1000000\n'
+    assert stderr == ''
+    assert overflow is False
+
+
+def test_communicate__infinite_output__kill_early():
+
+    # arrange
+    proc = start('while True: print("line")')
+    started = time.monotonic()
+
+    # act
+    stdout, stderr, overflow = communicate(
+        proc, None, timeout=10, limit=100000, head_size=10, tail_size=5
+    )
+
+    # assert
+    assert overflow is True
+    assert time.monotonic() - started < 5
+    assert stdout.startswith('line\nline\n\n...\n')
+    assert len(stdout) == 10 + len('\n...\n') + 5
+    assert proc.wait(timeout=5) < 0
+
+
+def test_communicate__timeout__raise_exception():
+
+    # arrange
+    proc = start('import time; time.sleep(10)')
+
+    # act
+    with pytest.raises(subprocess.TimeoutExpired):
+        communicate(proc, None, timeout=0.2, limit=100, head_size=100)
+
+    # assert
+    proc.kill()
+    proc.wait()
+
+
+def test_communicate__comparator_mismatch__kill_early():
+
+    # arrange
+    proc = start('print(1)\nwhile True: print("wrong")')
+    comparator = get_stream_comparator(CheckerPreset(preset='lines'), '1\n2')
+    started = time.monotonic()
+
+    # act
+    stdout, stderr, overflow = communicate(
+        proc, None, timeout=10, limit=10 ** 9, head_size=1024,
+        comparator=comparator
+    )
+
+    # assert
+    assert time.monotonic() - started < 5
+    assert overflow is False
+    assert comparator.mismatch == 2
+    assert stdout.startswith('1\nwrong\n')
+    assert proc.wait(timeout=5) < 0
+
+
+def test_communicate__comparator_match__ok():
+
+    # arrange
+    proc = start('print(1); print(2)')
+    comparator = get_stream_comparator(CheckerPreset(preset='tokens'), '1 2')
+
+    # act
+    stdout, stderr, overflow = communicate(
+        proc, None, timeout=10, limit=1024, head_size=1024,
+        comparator=comparator
+    )
+
+    # assert
+    assert stdout == '1\n2\n'
+    assert comparator.mismatch is None
+    assert proc.returncode == 0
@@ -0,0 +1,46 @@
+import time
+import threading
+from app.service import pool
+
+
+def test_submit_bounded__results_in_order(mocker):
+
+    # arrange
+    mocker.patch('app.service.pool._executor', None)
+    mocker.patch('app.config.TESTING_WORKERS', 4)
+
+    def func(item):
+        time.sleep(0.05 * (4 - item))
+        return item
+
+    # act
+    futures = pool.submit_bounded(func, range(4), limit=4)
+
+    # assert
+    assert [future.result() for future in futures] == [0, 1, 2, 3]
+
+
+def test_submit_bounded__limit__ok(mocker):
+
+    # arrange
+    mocker.patch('app.service.pool._executor', None)
+    mocker.patch('app.config.TESTING_WORKERS', 8)
+    lock = threading.Lock()
+    state = {'running': 0, 'max_running': 0}
+
+    def func(item):
+        with lock:
+            state['running'] += 1
+            state['max_running'] = max(state['max_running'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+        return item
+
+    # act
+    futures = pool.submit_bounded(func, range(10), limit=2)
+    results = [future.result() for future in futures]
+
+    # assert
+    assert results == list(range(10))
+    assert state['max_running'] == 2
@@ -0,0 +1,155 @@
+import sys
+import time
+import subprocess
+from app import messages
+from app.entities import LimitsData, ResourceLimits
+from app.service.resources import (
+    RusagePopen,
+    get_usage,
+    get_limits,
+    set_rlimits,
+    cpu_limit_exceeded,
+    get_timeout_error,
+    is_timeout_error
+)
+
+
+def test_get_usage__finished_process__ok():
+
+    # arrange
+    started = time.monotonic()
+    proc = RusagePopen(
+        args=[sys.executable, '-c', 'sum(range(10 ** 6))'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    proc.communicate(timeout=10)
+
+    # act
+    usage = get_usage(proc, started)
+
+    # assert
+    assert usage.wall_time > 0
+    assert usage.cpu_time > 0
+    assert usage.max_rss > 0
+
+
+def test_get_usage__killed_process__ok():
+
+    # arrange
+    started = time.monotonic()
+    proc = RusagePopen(
+        args=[sys.executable, '-c', 'import time; time.sleep(10)']
+    )
+    proc.kill()
+
+    # act
+    usage = get_usage(proc, started)
+
+    # assert
+    assert usage.wall_time < 10
+    assert usage.cpu_time is not None
+
+
+def test_get_usage__process_without_rusage__only_wall_time(mocker):
+
+    # arrange
+    proc = mocker.Mock(rusage=None)
+
+    # act
+    usage = get_usage(proc, time.monotonic())
+
+    # assert
+    proc.wait.assert_called_once_with(timeout=1)
+    assert usage.wall_time >= 0
+    assert usage.cpu_time is None
+    assert usage.max_rss is None
+
+
+def test_get_limits__requested__override_config(mocker):
+
+    # arrange
+    mocker.patch('app.config.EXECUTE_CPU_LIMIT', 5)
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 10)
+    mocker.patch('app.config.EXECUTE_MEMORY_LIMIT', 0)
+    requested = LimitsData(execute=ResourceLimits(cpu_time=1.5))
+
+    # act
+    limits = get_limits('execute', requested)
+
+    # assert
+    assert limits == ResourceLimits(cpu_time=1.5, wall_time=10, memory=None)
+
+
+def test_get_limits__default__wall_limit_above_cpu_limit():
+
+    # act
+    limits = get_limits('execute')
+
+    # assert
+    assert limits.wall_time > limits.cpu_time
+
+
+def test_get_timeout_error__default_limit__msg_1(mocker):
+
+    # arrange
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 6)
+
+    # act
+    error = get_timeout_error('execute', ResourceLimits(wall_time=6))
+
+    # assert
+    assert error == messages.MSG_1
+    assert is_timeout_error(error)
+
+
+def test_get_timeout_error__requested_limit__format_limit(mocker):
+
+    # arrange
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 6)
+
+    # act
+    error = get_timeout_error('execute', ResourceLimits(wall_time=0.5))
+
+    # assert
+    assert error == (
+        'Program execution time limit exceeded. Limit 0.5 seconds!'
+    )
+    assert is_timeout_error(error)
+    assert not is_timeout_error(messages.MSG_13)
+
+def test_cpu_limit_exceeded__spinning_process__killed_by_kernel():
+
+    # arrange
+    limits = ResourceLimits(cpu_time=1, wall_time=10)
+    started = time.monotonic()
+    proc = RusagePopen(
+        args=[sys.executable, '-c', 'while True: pass'],
+        preexec_fn=lambda: set_rlimits(limits)
+    )
+    proc.wait(timeout=limits.wall_time)
+
+    # act
+    usage = get_usage(proc, started)
+
+    # assert
+    assert cpu_limit_exceeded(proc, usage, limits) is True
+    assert usage.wall_time < limits.wall_time
+
+
+def test_cpu_limit_exceeded__killed_by_wall_timeout__false():
+
+    # arrange
+    limits = ResourceLimits(cpu_time=5, wall_time=0.1)
+    started = time.monotonic()
+    proc = RusagePopen(
+        args=[sys.executable, '-c', 'import time; time.sleep(10)'],
+        preexec_fn=lambda: set_rlimits(limits)
+    )
+    proc.kill()
+
+    # act
+    usage = get_usage(proc, started)
+
+    # assert
+    assert cpu_limit_exceeded(proc, usage, limits) is False
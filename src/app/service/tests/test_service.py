@@ -1,4 +1,6 @@
 # Тесты запускать только в контейнере!
+import sys
+import time
 import pytest
 import subprocess
 from unittest.mock import call
@@ -7,12 +9,31 @@ from app import config, messages
 from app.entities import (
     DebugData,
     TestsData,
-    TestData
+    TestData,
+    CheckerPreset,
+    BatchTestsData,
+    SubmissionData,
+    ResourceLimits
 )
-from app.service.entities import ExecuteResult
+from app.service.entities import ExecuteResult, ResourceUsage
 from app.service.entities import PascalFile
 from app.service.exceptions import CheckerException
 from app.service import exceptions
+from app.service import main as service_main
+from app.service.hosts import (
+    HostException,
+    CheckerHostPool,
+    CompilerHostPool
+)
+from app.service import checker_worker
+from app.service.checkers import (
+    checker_cache,
+    BatchChecker,
+    PooledChecker,
+    LinesComparator
+)
+from app.service.cache import ResultCache
+from app.service.resources import get_limits
 
 
 def test_execute__float_result__ok():
@@ -196,7 +217,7 @@ def test_execute__timeout__return_error(mocker):
     )
     file = PascalFile(code)
     PascalService._compile(file)
-    mocker.patch('app.config.TIMEOUT', 1)
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 1)
 
     # act
     execute_result = PascalService._execute(file=file)
@@ -228,7 +249,7 @@ def test_execute__deep_recursive__error(mocker):
     )
     file = PascalFile(code)
     PascalService._compile(file)
-    mocker.patch('app.config.TIMEOUT', 1)
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 1)
 
     # act
     execute_result = PascalService._execute(file=file, data_in='50')
@@ -278,7 +299,7 @@ def test_execute__proc_exception__return_error(mocker):
     file = PascalFile(code)
     mocker.patch.object(subprocess.Popen, '__init__', return_value=None)
     communicate_mock = mocker.patch(
-        'subprocess.Popen.communicate',
+        'app.service.main.communicate',
         side_effect=Exception(error_msg)
     )
     kill_mock = mocker.patch('subprocess.Popen.kill')
@@ -288,8 +309,13 @@ def test_execute__proc_exception__return_error(mocker):
 
     # assert
     communicate_mock.assert_called_once_with(
-        input=data_in,
-        timeout=config.TIMEOUT
+        mocker.ANY,
+        data_in,
+        timeout=config.EXECUTE_WALL_LIMIT,
+        limit=config.OUTPUT_LIMIT,
+        head_size=config.OUTPUT_HEAD_SIZE,
+        tail_size=config.OUTPUT_TAIL_SIZE,
+        comparator=None
     )
     kill_mock.assert_called_once()
     file.remove()
@@ -302,7 +328,7 @@ def test_compile__timeout__error(mocker):
     # arrange
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
 
     mocker.patch.object(subprocess.Popen, '__init__', return_value=None)
     communicate_mock = mocker.patch(
@@ -316,7 +342,9 @@ def test_compile__timeout__error(mocker):
 
     # assert
     assert error == messages.MSG_1
-    communicate_mock.assert_called_once_with(timeout=config.TIMEOUT)
+    communicate_mock.assert_called_once_with(
+        timeout=config.COMPILE_WALL_LIMIT
+    )
     kill_mock.assert_called_once()
 
 
@@ -326,7 +354,7 @@ def test_compile__exception__return_error(mocker):
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
     error_msg = 'some error'
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
 
     mocker.patch.object(subprocess.Popen, '__init__', return_value=None)
     communicate_mock = mocker.patch(
@@ -340,7 +368,9 @@ def test_compile__exception__return_error(mocker):
 
     # assert
     assert result == error_msg
-    communicate_mock.assert_called_once_with(timeout=config.TIMEOUT)
+    communicate_mock.assert_called_once_with(
+        timeout=config.COMPILE_WALL_LIMIT
+    )
     kill_mock.assert_called_once()
 
 
@@ -349,7 +379,7 @@ def test_compile__error__error(mocker):
     # arrange
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
     compile_error = 'some error'
     mocker.patch.object(subprocess.Popen, '__init__', return_value=None)
     communicate_mock = mocker.patch(
@@ -363,7 +393,9 @@ def test_compile__error__error(mocker):
 
     # assert
     assert error == compile_error
-    communicate_mock.assert_called_once_with(timeout=config.TIMEOUT)
+    communicate_mock.assert_called_once_with(
+        timeout=config.COMPILE_WALL_LIMIT
+    )
     kill_mock.assert_called_once()
 
 
@@ -372,7 +404,7 @@ def test_compile__ok(mocker):
     # arrange
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
     mocker.patch.object(subprocess.Popen, '__init__', return_value=None)
     communicate_mock = mocker.patch(
         'subprocess.Popen.communicate',
@@ -384,7 +416,9 @@ def test_compile__ok(mocker):
     PascalService._compile(file_mock)
 
     # assert
-    communicate_mock.assert_called_once_with(timeout=config.TIMEOUT)
+    communicate_mock.assert_called_once_with(
+        timeout=config.COMPILE_WALL_LIMIT
+    )
     kill_mock.assert_called_once()
 
 
@@ -512,12 +546,185 @@ def test_check__checker_func__invalid_syntax__raise_exception():
     assert ex.value.details == 'invalid syntax (<string>, line 1)'
 
 
+BATCH_CHECKER = (
+    'def checker(pairs: list) -> list:\n'
+    '    return [right == value for right, value in pairs]'
+)
+
+
+def test_get_checker__batch_checker__ok():
+
+    # act
+    checker = PascalService._get_checker(BATCH_CHECKER)
+
+    # assert
+    assert isinstance(checker, BatchChecker)
+    assert checker([('1', '1'), ('1', '2')]) == [True, False]
+
+
+def test_check_batch__skipped_test__not_changed():
+
+    # arrange
+    checker = PascalService._get_checker(BATCH_CHECKER)
+    tests = [
+        TestData(data_out='1', result='1'),
+        TestData(data_out='2', result='3'),
+        TestData(data_out='3', error=messages.MSG_9, ok=False),
+    ]
+
+    # act
+    PascalService._check_batch(checker, tests)
+
+    # assert
+    assert [test.ok for test in tests] == [True, False, False]
+
+
+@pytest.mark.parametrize('checker_func', [
+    'def checker(pairs: list) -> list:\n    return [True]',
+    'def checker(pairs: list) -> list:\n    return [1, 1]',
+    'def checker(pairs: list) -> list:\n    return True',
+])
+def test_check_batch__invalid_result__raise_exception(checker_func):
+
+    # arrange
+    checker = PascalService._get_checker(checker_func)
+    tests = [TestData(data_out='1'), TestData(data_out='2')]
+
+    # act
+    with pytest.raises(CheckerException) as ex:
+        PascalService._check_batch(checker, tests)
+
+    # assert
+    assert ex.value.message == messages.MSG_16
+
+
+def test_testing__batch_checker__check_once(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        side_effect=[
+            ExecuteResult(result='1', error=None),
+            ExecuteResult(result='3', error=None),
+        ]
+    )
+    check_mock = mocker.patch('app.service.main.PascalService._check')
+    check_batch_mock = mocker.spy(PascalService, '_check_batch')
+    data = TestsData(
+        code='some code',
+        checker=BATCH_CHECKER,
+        tests=[TestData(data_out='1'), TestData(data_out='2')]
+    )
+
+    # act
+    events = list(PascalService.testing_events(data))
+
+    # assert
+    assert events == [('compile', None), ('test', 0), ('test', 1)]
+    check_mock.assert_not_called()
+    check_batch_mock.assert_called_once()
+    assert [test.ok for test in data.tests] == [True, False]
+
+
+@pytest.fixture()
+def checker_pool(mocker):
+    pool = CheckerHostPool(
+        args=[sys.executable, checker_worker.__file__],
+        size=1,
+        max_jobs=10
+    )
+    mocker.patch('app.config.CHECKER_POOL_ENABLED', True)
+    mocker.patch('app.config.CHECKER_TIMEOUT', 1)
+    mocker.patch('app.service.main.checker_pool', pool)
+    checker_cache.clear()
+    yield pool
+    checker_cache.clear()
+    pool.stop()
+
+
+@pytest.mark.parametrize('value,ok', [('value', True), ('other', False)])
+def test_check__checker_pool__ok(checker_pool, value, ok):
+
+    # arrange
+    checker_func = (
+        'def checker(right_value: str, value: str) -> bool:\n'
+        '    return right_value == value'
+    )
+
+    # act
+    check_result = PascalService._check(
+        checker_func=checker_func,
+        right_value='value',
+        value=value
+    )
+
+    # assert
+    assert check_result is ok
+    assert isinstance(checker_cache.get(checker_func), PooledChecker)
+
+
+@pytest.mark.parametrize('body,message,details', [
+    ('    return None', messages.MSG_4, None),
+    ('    return 1 / 0', messages.MSG_5, 'division by zero'),
+    ('    return True\nundefined', messages.MSG_5,
+     "name 'undefined' is not defined"),
+    ('    while True:\n        pass\n    return True',
+     messages.MSG_17, None),
+])
+def test_check__checker_pool_error__raise_exception(
+    checker_pool,
+    body,
+    message,
+    details
+):
+
+    # arrange
+    checker_func = (
+        'def checker(right_value: str, value: str) -> bool:\n' + body
+    )
+
+    # act
+    with pytest.raises(CheckerException) as ex:
+        PascalService._check(
+            checker_func=checker_func,
+            right_value='value',
+            value='value'
+        )
+
+    # assert
+    assert ex.value.message == message
+    assert ex.value.details == details
+
+
+def test_check_batch__checker_pool__ok(checker_pool):
+
+    # arrange
+    checker = PascalService._get_checker(BATCH_CHECKER)
+    tests = [
+        TestData(data_out='1', result='1'),
+        TestData(data_out='2', result=None),
+    ]
+
+    # act
+    PascalService._check_batch(checker, tests)
+
+    # assert
+    assert isinstance(checker, BatchChecker)
+    assert [test.ok for test in tests] == [True, False]
+
+
 def test_debug__compile_is_success__ok(mocker):
 
     # arrange
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
     compile_mock = mocker.patch(
         'app.service.main.PascalService._compile',
         return_value=None
@@ -540,10 +747,11 @@ def test_debug__compile_is_success__ok(mocker):
 
     # assert
     file_mock.remove.assert_called_once()
-    compile_mock.assert_called_once_with(file_mock)
+    compile_mock.assert_called_once_with(file_mock, get_limits('compile'))
     execute_mock.assert_called_once_with(
         file=file_mock,
-        data_in=data.data_in
+        data_in=data.data_in,
+        limits=get_limits('execute')
     )
     assert debug_result.result == execute_result.result
     assert debug_result.error == execute_result.error
@@ -555,7 +763,7 @@ def test_debug__compile_return_error__ok(mocker):
     compile_error = 'some error'
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
     compile_mock = mocker.patch(
         'app.service.main.PascalService._compile',
         return_value=compile_error
@@ -571,7 +779,7 @@ def test_debug__compile_return_error__ok(mocker):
 
     # assert
     file_mock.remove.assert_called_once()
-    compile_mock.assert_called_once_with(file_mock)
+    compile_mock.assert_called_once_with(file_mock, get_limits('compile'))
     execute_mock.assert_not_called()
     assert debug_result.result is None
     assert debug_result.error == compile_error
@@ -582,7 +790,7 @@ def test_testing__compile_is_success__ok(mocker):
     # arrange
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
     compile_mock = mocker.patch(
         'app.service.main.PascalService._compile',
         return_value=None
@@ -595,6 +803,11 @@ def test_testing__compile_is_success__ok(mocker):
         'app.service.main.PascalService._execute',
         return_value=execute_result
     )
+    checker_mock = mocker.Mock()
+    get_checker_mock = mocker.patch(
+        'app.service.main.PascalService._get_checker',
+        return_value=checker_mock
+    )
     check_result = mocker.Mock()
     check_mock = mocker.patch(
         'app.service.main.PascalService._check',
@@ -619,25 +832,32 @@ def test_testing__compile_is_success__ok(mocker):
     testing_result = PascalService.testing(data)
 
     # assert
-    compile_mock.assert_called_once_with(file_mock)
+    compile_mock.assert_called_once_with(file_mock, get_limits('compile'))
+    get_checker_mock.assert_called_once_with(data.checker)
     assert execute_mock.call_args_list == [
         call(
             file=file_mock,
-            data_in=test_1.data_in
+            data_in=test_1.data_in,
+            limits=get_limits('execute'),
+            comparator=None,
+            session=None
         ),
         call(
             file=file_mock,
-            data_in=test_2.data_in
+            data_in=test_2.data_in,
+            limits=get_limits('execute'),
+            comparator=None,
+            session=None
         )
     ]
     assert check_mock.call_args_list == [
         call(
-            checker_func=data.checker,
+            checker_func=checker_mock,
             right_value=test_1.data_out,
             value=execute_result.result
         ),
         call(
-            checker_func=data.checker,
+            checker_func=checker_mock,
             right_value=test_2.data_out,
             value=execute_result.result
         )
@@ -658,7 +878,7 @@ def test_testing__compile_return_error__ok(mocker):
     # arrange
     file_mock = mocker.Mock()
     file_mock.remove = mocker.Mock()
-    mocker.patch.object(PascalFile, '__new__', return_value=file_mock)
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
     compile_error = 'some error'
     compile_mock = mocker.patch(
         'app.service.main.PascalService._compile',
@@ -666,6 +886,9 @@ def test_testing__compile_return_error__ok(mocker):
     )
     execute_mock = mocker.patch('app.service.main.PascalService._execute')
     check_mock = mocker.patch('app.service.main.PascalService._check')
+    get_checker_mock = mocker.patch(
+        'app.service.main.PascalService._get_checker'
+    )
     test_1 = TestData(
         data_in='some test input 1',
         data_out='some test out 1'
@@ -685,9 +908,10 @@ def test_testing__compile_return_error__ok(mocker):
     testing_result = PascalService.testing(data)
 
     # assert
-    compile_mock.assert_called_once_with(file_mock)
+    compile_mock.assert_called_once_with(file_mock, get_limits('compile'))
     execute_mock.assert_not_called()
     check_mock.assert_not_called()
+    get_checker_mock.assert_not_called()
     file_mock.remove.assert_called_once()
     tests_result = testing_result.tests
     assert len(tests_result) == 2
@@ -697,3 +921,1003 @@ def test_testing__compile_return_error__ok(mocker):
     assert tests_result[1].result is None
     assert tests_result[1].error == compile_error
     assert tests_result[1].ok is False
+
+
+def test_compile__cache_hit__skip_compilation(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.config.COMPILE_CACHE_ENABLED', True)
+    get_key_mock = mocker.patch(
+        'app.service.main.compile_cache.get_key',
+        return_value='key'
+    )
+    restore_mock = mocker.patch(
+        'app.service.main.compile_cache.restore',
+        return_value=True
+    )
+    popen_mock = mocker.patch('subprocess.Popen')
+
+    # act
+    error = PascalService._compile(file_mock)
+
+    # assert
+    assert error is None
+    get_key_mock.assert_called_once_with(file_mock.code)
+    restore_mock.assert_called_once_with('key', file_mock.filepath_exe)
+    popen_mock.assert_not_called()
+
+
+def test_compile__cache_miss__store_exe(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.config.COMPILE_CACHE_ENABLED', True)
+    mocker.patch(
+        'app.service.main.compile_cache.get_key',
+        return_value='key'
+    )
+    mocker.patch(
+        'app.service.main.compile_cache.restore',
+        return_value=False
+    )
+    store_mock = mocker.patch('app.service.main.compile_cache.store')
+    mocker.patch.object(subprocess.Popen, '__init__', return_value=None)
+    mocker.patch(
+        'subprocess.Popen.communicate',
+        return_value=('OK\n', None)
+    )
+    mocker.patch('subprocess.Popen.kill')
+
+    # act
+    error = PascalService._compile(file_mock)
+
+    # assert
+    assert error is None
+    store_mock.assert_called_once_with('key', file_mock.filepath_exe)
+
+
+def test_compile__cache_miss_compile_error__not_store(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.config.COMPILE_CACHE_ENABLED', True)
+    mocker.patch(
+        'app.service.main.compile_cache.get_key',
+        return_value='key'
+    )
+    mocker.patch(
+        'app.service.main.compile_cache.restore',
+        return_value=False
+    )
+    store_mock = mocker.patch('app.service.main.compile_cache.store')
+    mocker.patch.object(subprocess.Popen, '__init__', return_value=None)
+    mocker.patch(
+        'subprocess.Popen.communicate',
+        return_value=('some error', None)
+    )
+    mocker.patch('subprocess.Popen.kill')
+
+    # act
+    error = PascalService._compile(file_mock)
+
+    # assert
+    assert error == 'some error'
+    store_mock.assert_not_called()
+
+
+def test_compile__host__ok(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.config.COMPILER_HOST_ENABLED', True)
+    host_mock = mocker.patch(
+        'app.service.main.compiler_pool.compile',
+        return_value='OK\n'
+    )
+    run_compiler_mock = mocker.patch(
+        'app.service.main.PascalService._run_compiler'
+    )
+
+    # act
+    error = PascalService._compile(file_mock)
+
+    # assert
+    assert error is None
+    host_mock.assert_called_once_with(
+        file_mock.filepath_pas,
+        timeout=config.TIMEOUT
+    )
+    run_compiler_mock.assert_not_called()
+
+
+def test_compile__host_timeout__error(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.config.COMPILER_HOST_ENABLED', True)
+    mocker.patch(
+        'app.service.main.compiler_pool.compile',
+        side_effect=subprocess.TimeoutExpired(cmd='', timeout=config.TIMEOUT)
+    )
+    run_compiler_mock = mocker.patch(
+        'app.service.main.PascalService._run_compiler'
+    )
+
+    # act
+    error = PascalService._compile(file_mock)
+
+    # assert
+    assert error == messages.MSG_1
+    run_compiler_mock.assert_not_called()
+
+
+def test_compile__host_unavailable__fallback_to_process(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.config.COMPILER_HOST_ENABLED', True)
+    mocker.patch(
+        'app.service.main.compiler_pool.compile',
+        side_effect=HostException()
+    )
+    run_compiler_mock = mocker.patch(
+        'app.service.main.PascalService._run_compiler',
+        return_value=('some error', None)
+    )
+
+    # act
+    error = PascalService._compile(file_mock)
+
+    # assert
+    assert error == 'some error'
+    run_compiler_mock.assert_called_once_with(
+        file_mock, get_limits('compile')
+    )
+
+
+def test_compile__host_garbage_response__fallback_to_process(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(filepath_pas='/tmp/program.pas')
+    mocker.patch('app.config.COMPILER_HOST_ENABLED', True)
+    pool = CompilerHostPool(
+        args=[
+            sys.executable, '-c',
+            'import sys\n'
+            'for _ in sys.stdin:\n'
+            '    print("garbage", flush=True)\n'
+        ],
+        size=1,
+        max_jobs=10
+    )
+    mocker.patch('app.service.main.compiler_pool', pool)
+    run_compiler_mock = mocker.patch(
+        'app.service.main.PascalService._run_compiler',
+        return_value=('some error', None)
+    )
+
+    # act
+    try:
+        error = PascalService._compile(file_mock)
+    finally:
+        pool.stop()
+
+    # assert
+    assert error == 'some error'
+    run_compiler_mock.assert_called_once()
+
+
+def test_testing__parallel__results_in_order(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch('app.service.main.PascalService._get_checker')
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch('app.service.pool._executor', None)
+    mocker.patch('app.config.TESTING_WORKERS', 4)
+    mocker.patch('app.config.TESTING_MAX_WORKERS_PER_REQUEST', 4)
+    submit_mock = mocker.spy(service_main, 'submit_bounded')
+
+    def execute(file, data_in, group, limits, comparator):
+        time.sleep(0.05 * (5 - int(data_in)))
+        return ExecuteResult(result=data_in, error=None)
+
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        side_effect=execute
+    )
+    mocker.patch(
+        'app.service.main.PascalService._check',
+        side_effect=lambda checker_func, right_value, value: (
+            right_value == value
+        )
+    )
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        tests=[
+            TestData(data_in=str(i), data_out=str(i) if i != 2 else '0')
+            for i in range(5)
+        ]
+    )
+
+    # act
+    testing_result = PascalService.testing(data)
+
+    # assert
+    submit_mock.assert_called_once()
+    assert submit_mock.call_args.kwargs['limit'] == 4
+    assert [test.result for test in testing_result.tests] == [
+        '0', '1', '2', '3', '4'
+    ]
+    assert [test.ok for test in testing_result.tests] == [
+        True, True, False, True, True
+    ]
+
+
+def test_testing__aot_enabled__precompile(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch('app.service.main.PascalService._get_checker')
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+    mocker.patch('app.service.main.PascalService._check', return_value=True)
+    mocker.patch('app.config.AOT_ENABLED', True)
+    mocker.patch('app.config.AOT_MIN_TESTS', 2)
+    aot_compile_mock = mocker.patch('app.service.main.aot_compile')
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        tests=[TestData(data_in='1', data_out='1') for _ in range(2)]
+    )
+
+    # act
+    PascalService.testing(data)
+
+    # assert
+    aot_compile_mock.assert_called_once_with(
+        file_mock.filepath_exe,
+        timeout=config.TIMEOUT
+    )
+
+
+def test_testing__few_tests__not_precompile(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch('app.service.main.PascalService._get_checker')
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+    mocker.patch('app.service.main.PascalService._check', return_value=True)
+    mocker.patch('app.config.AOT_ENABLED', True)
+    mocker.patch('app.config.AOT_MIN_TESTS', 2)
+    aot_compile_mock = mocker.patch('app.service.main.aot_compile')
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        tests=[TestData(data_in='1', data_out='1')]
+    )
+
+    # act
+    PascalService.testing(data)
+
+    # assert
+    aot_compile_mock.assert_not_called()
+
+
+def test_get_checker__cached__validate_and_compile_once(mocker):
+
+    # arrange
+    checker_cache.clear()
+    checker_func = (
+        'def checker(right_value: str, value: str) -> bool:'
+        '  return right_value == value'
+    )
+    validate_mock = mocker.spy(PascalService, '_validate_checker_func')
+
+    # act
+    checker_1 = PascalService._get_checker(checker_func)
+    checker_2 = PascalService._get_checker(checker_func)
+
+    # assert
+    assert checker_1 is checker_2
+    assert checker_1('value', 'value') is True
+    validate_mock.assert_called_once_with(checker_func)
+
+
+def test_check__compiled_checker__ok(mocker):
+
+    # arrange
+    get_checker_mock = mocker.patch(
+        'app.service.main.PascalService._get_checker'
+    )
+
+    # act
+    result = PascalService._check(
+        checker_func=lambda right_value, value: right_value == value,
+        right_value='value',
+        value='value'
+    )
+
+    # assert
+    assert result is True
+    get_checker_mock.assert_not_called()
+
+
+def test_check__checker_raise_exception__raise_exception():
+
+    # arrange
+    checker_func = (
+        'def checker(right_value: str, value: str) -> bool:'
+        '  return int(value) > 0'
+    )
+
+    # act
+    with pytest.raises(CheckerException) as ex:
+        PascalService._check(
+            checker_func=checker_func,
+            right_value='value',
+            value='value'
+        )
+
+    # assert
+    assert ex.value.message == messages.MSG_5
+    assert ex.value.details == (
+        "invalid literal for int() with base 10: 'value'"
+    )
+
+
+def test_get_checker__preset__ok():
+
+    # act
+    checker = PascalService._get_checker(CheckerPreset(preset='tokens'))
+
+    # assert
+    assert PascalService._check(
+        checker_func=checker,
+        right_value='1 2',
+        value='1\n2'
+    ) is True
+
+
+def test_testing__fail_fast__skip_tests(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch('app.service.main.PascalService._get_checker')
+    execute_mock = mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+    mocker.patch(
+        'app.service.main.PascalService._check',
+        side_effect=[True, False]
+    )
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        fail_fast=True,
+        tests=[TestData(data_in='1', data_out='1') for _ in range(4)]
+    )
+
+    # act
+    testing_result = PascalService.testing(data)
+
+    # assert
+    assert execute_mock.call_count == 2
+    assert [test.ok for test in testing_result.tests] == [
+        True, False, False, False
+    ]
+    assert [test.error for test in testing_result.tests] == [
+        None, None, messages.MSG_9, messages.MSG_9
+    ]
+
+
+def test_testing__parallel_fail_fast__cancel_tests(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch('app.service.pool._executor', None)
+    mocker.patch('app.config.TESTING_WORKERS', 2)
+    mocker.patch('app.config.TESTING_MAX_WORKERS_PER_REQUEST', 2)
+    groups = {}
+
+    def execute(file, data_in, group, limits, comparator):
+        groups[data_in] = group
+        if data_in == 'fail':
+            return ExecuteResult(result=None, error='some error')
+        for _ in range(100):
+            if group.cancelled:
+                return ExecuteResult(result=None, error='killed')
+            time.sleep(0.01)
+        return ExecuteResult(result='ok', error=None)
+
+    execute_mock = mocker.patch(
+        'app.service.main.PascalService._execute',
+        side_effect=execute
+    )
+    mocker.patch(
+        'app.service.main.PascalService._get_checker',
+        return_value=lambda right_value, value: value == 'ok'
+    )
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        fail_fast=True,
+        tests=[
+            TestData(data_in='fail', data_out='ok'),
+            TestData(data_in='slow', data_out='ok'),
+            TestData(data_in='slow 2', data_out='ok'),
+            TestData(data_in='slow 3', data_out='ok'),
+        ]
+    )
+
+    # act
+    start = time.monotonic()
+    testing_result = PascalService.testing(data)
+
+    # assert
+    assert time.monotonic() - start < 1
+    assert [test.ok for test in testing_result.tests] == [
+        False, False, False, False
+    ]
+    assert [test.error for test in testing_result.tests] == [
+        'some error', messages.MSG_9, messages.MSG_9, messages.MSG_9
+    ]
+    assert groups['slow'].cancelled is True
+    assert 'slow 3' not in groups
+    assert execute_mock.call_count <= 3
+
+
+def test_run_tests__parallel_fail_fast_out_of_order__emit_once(mocker):
+
+    # arrange
+    mocker.patch('app.service.pool._executor', None)
+    mocker.patch('app.config.TESTING_WORKERS', 4)
+    mocker.patch('app.config.TESTING_MAX_WORKERS_PER_REQUEST', 4)
+    # Тест 2 не проходит первым, затем проходит тест 1
+    # и не проходит тест 0
+    delays = {'0': 0.2, '1': 0.1, '2': 0, '3': 0.5}
+
+    def execute(file, data_in, group, limits, comparator):
+        time.sleep(delays[data_in])
+        if group.cancelled:
+            return ExecuteResult(result=None, error='killed')
+        result = 'ok' if data_in in ('1', '3') else 'wrong'
+        return ExecuteResult(result=result, error=None)
+
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        side_effect=execute
+    )
+    tests = [TestData(data_in=str(index), data_out='ok') for index in range(4)]
+
+    # act
+    indexes = list(PascalService._run_tests(
+        file=mocker.Mock(),
+        tests=tests,
+        checker=lambda right_value, value: right_value == value,
+        fail_fast=True
+    ))
+
+    # assert
+    assert indexes == [2, 1, 0, 3]
+    assert [test.ok for test in tests] == [False, True, False, False]
+    assert [test.error for test in tests] == [
+        None, None, None, messages.MSG_9
+    ]
+
+
+def test_testing_events__ok(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch('app.service.main.PascalService._get_checker')
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+    mocker.patch('app.service.main.PascalService._check', return_value=True)
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        tests=[TestData(data_in='1', data_out='1') for _ in range(2)]
+    )
+
+    # act
+    events = list(PascalService.testing_events(data))
+
+    # assert
+    assert events == [('compile', None), ('test', 0), ('test', 1)]
+    file_mock.remove.assert_called_once()
+
+
+def test_testing_events__compile_error__ok(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value='some error'
+    )
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        tests=[TestData(data_in='1', data_out='1') for _ in range(2)]
+    )
+
+    # act
+    events = list(PascalService.testing_events(data))
+
+    # assert
+    assert events == [('compile', None), ('test', 0), ('test', 1)]
+    assert data.error == 'some error'
+    assert data.tests[1].error == 'some error'
+
+
+def test_testing_events__closed__remove_file(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    data = TestsData(code='some code', checker='some checker', tests=[])
+    events = PascalService.testing_events(data)
+    next(events)
+
+    # act
+    events.close()
+
+    # assert
+    file_mock.remove.assert_called_once()
+
+
+def test_batch_testing__ok(mocker):
+
+    # arrange
+    get_checker_mock = mocker.patch(
+        'app.service.main.PascalService._get_checker'
+    )
+
+    def testing(data):
+        if data.code == 'invalid':
+            raise CheckerException(details='some details')
+        for test in data.tests:
+            test.result = data.code
+            test.ok = True
+        return data
+
+    mocker.patch(
+        'app.service.main.PascalService.testing',
+        side_effect=testing
+    )
+    data = BatchTestsData(
+        checker='some checker',
+        tests=[TestData(data_in='1', data_out='2')],
+        submissions=[
+            SubmissionData(code='code 1'),
+            SubmissionData(code='invalid'),
+            SubmissionData(code='code 3'),
+        ]
+    )
+
+    # act
+    result = PascalService.batch_testing(data)
+
+    # assert
+    get_checker_mock.assert_called_once_with('some checker')
+    assert len(result.results) == 3
+    assert result.results[0].tests[0].result == 'code 1'
+    assert result.results[0].tests[0].data_out == '2'
+    assert isinstance(result.results[1], CheckerException)
+    assert result.results[1].details == 'some details'
+    assert result.results[2].tests[0].result == 'code 3'
+    assert result.results[0].tests[0] is not result.results[2].tests[0]
+    assert data.tests[0].result is None
+
+
+def test_batch_testing__invalid_checker__raise_exception(mocker):
+
+    # arrange
+    testing_mock = mocker.patch('app.service.main.PascalService.testing')
+    data = BatchTestsData(
+        checker='def my_checker(): pass',
+        tests=[TestData(data_in='1', data_out='2')],
+        submissions=[SubmissionData(code='code 1')]
+    )
+
+    # act
+    with pytest.raises(CheckerException) as ex:
+        PascalService.batch_testing(data)
+
+    # assert
+    assert ex.value.message == messages.MSG_2
+    testing_mock.assert_not_called()
+
+
+def test_execute__result_cache__ok(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(code='begin end.')
+    mocker.patch('app.config.RESULT_CACHE_ENABLED', True)
+    mocker.patch('app.service.main.result_cache', ResultCache(1024))
+    run_mock = mocker.patch(
+        'app.service.main.PascalService._run_program',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+
+    # act
+    result_1 = PascalService._execute(file=file_mock, data_in='1')
+    result_2 = PascalService._execute(file=file_mock, data_in='1')
+    result_3 = PascalService._execute(file=file_mock, data_in='2')
+
+    # assert
+    assert result_1 == ExecuteResult(result='1', error=None, cached=False)
+    assert result_2 == ExecuteResult(result='1', error=None, cached=True)
+    assert result_3.cached is False
+    assert run_mock.call_count == 2
+
+
+def test_execute__result_cache_recompiled_program__hit(mocker, tmp_path):
+
+    # arrange
+    # Каждая компиляция дает сборку с другим содержимым (MVID)
+    mocker.patch('app.config.RESULT_CACHE_ENABLED', True)
+    mocker.patch('app.service.main.result_cache', ResultCache(1024))
+    files = []
+    for index in range(2):
+        filepath_exe = tmp_path / f'{index}.exe'
+        filepath_exe.write_bytes(str(index).encode())
+        files.append(mocker.Mock(
+            code='begin end.', filepath_exe=str(filepath_exe)
+        ))
+    run_mock = mocker.patch(
+        'app.service.main.PascalService._run_program',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+
+    # act
+    PascalService._execute(file=files[0], data_in='1')
+    result = PascalService._execute(file=files[1], data_in='1')
+
+    # assert
+    assert result.cached is True
+    assert run_mock.call_count == 1
+
+
+def test_execute__result_cache_timeout__not_cached(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(code='begin end.')
+    mocker.patch('app.config.RESULT_CACHE_ENABLED', True)
+    mocker.patch('app.service.main.result_cache', ResultCache(1024))
+    run_mock = mocker.patch(
+        'app.service.main.PascalService._run_program',
+        return_value=ExecuteResult(result=None, error=messages.MSG_1)
+    )
+
+    # act
+    PascalService._execute(file=file_mock, data_in='1')
+    result = PascalService._execute(file=file_mock, data_in='1')
+
+    # assert
+    assert result.cached is False
+    assert run_mock.call_count == 2
+
+
+def test_execute__result_cache_nondeterministic__not_cached(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(code='begin writeln(random(10)) end.')
+    mocker.patch('app.config.RESULT_CACHE_ENABLED', True)
+    mocker.patch('app.service.main.result_cache', ResultCache(1024))
+    run_mock = mocker.patch(
+        'app.service.main.PascalService._run_program',
+        return_value=ExecuteResult(result='5', error=None)
+    )
+
+    # act
+    PascalService._execute(file=file_mock)
+    result = PascalService._execute(file=file_mock)
+
+    # assert
+    assert result.cached is False
+    assert run_mock.call_count == 2
+
+
+def test_debug__resources__return_usage(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(compile_usage=ResourceUsage(wall_time=1.5))
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    usage = ResourceUsage(wall_time=0.2, cpu_time=0.1, max_rss=2048)
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(result='1', error=None, usage=usage)
+    )
+    data = DebugData(code='some code', resources=True)
+
+    # act
+    debug_result = PascalService.debug(data)
+
+    # assert
+    assert debug_result.usage == usage
+    assert debug_result.compile_usage == ResourceUsage(wall_time=1.5)
+
+
+def test_testing__resources_disabled__not_return_usage(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(compile_usage=ResourceUsage(wall_time=1.5))
+    mocker.patch('app.service.main.PascalFile', return_value=file_mock)
+    mocker.patch(
+        'app.service.main.PascalService._compile',
+        return_value=None
+    )
+    mocker.patch(
+        'app.service.main.PascalService._get_checker',
+        return_value=lambda right_value, value: True
+    )
+    mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(
+            result='1',
+            error=None,
+            usage=ResourceUsage(wall_time=0.2)
+        )
+    )
+    data = TestsData(
+        code='some code',
+        checker='some checker',
+        tests=[TestData(data_in='1', data_out='1')]
+    )
+
+    # act
+    testing_result = PascalService.testing(data)
+
+    # assert
+    assert testing_result.compile_usage is None
+    assert testing_result.tests[0].usage is None
+
+
+def test_execute__timeout__count_metric(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(filepath_exe='program.exe')
+    mocker.patch('app.service.main.RusagePopen')
+    mocker.patch(
+        'app.service.main.communicate',
+        side_effect=subprocess.TimeoutExpired(cmd='', timeout=1)
+    )
+    mocker.patch('app.service.main.get_usage', return_value=None)
+    timeouts_mock = mocker.patch('app.metrics.TIMEOUTS.labels')
+    execute_time_mock = mocker.patch('app.metrics.EXECUTE_TIME.observe')
+
+    # act
+    result = PascalService._run_program(file=file_mock)
+
+    # assert
+    assert result.error == messages.MSG_1
+    timeouts_mock.assert_called_once_with(phase='execute', limit='wall')
+    timeouts_mock.return_value.inc.assert_called_once_with()
+    execute_time_mock.assert_called_once()
+
+
+def test_execute__requested_wall_limit__report_limit(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(filepath_exe='program.exe')
+    mocker.patch('app.service.main.RusagePopen')
+    mocker.patch(
+        'app.service.main.communicate',
+        side_effect=subprocess.TimeoutExpired(cmd='', timeout=1)
+    )
+    mocker.patch('app.service.main.get_usage', return_value=None)
+    timeouts_mock = mocker.patch('app.metrics.TIMEOUTS.labels')
+
+    # act
+    result = PascalService._run_program(
+        file=file_mock,
+        limits=ResourceLimits(wall_time=0.5)
+    )
+
+    # assert
+    assert result.error == (
+        'Program execution time limit exceeded. Limit 0.5 seconds!'
+    )
+    timeouts_mock.assert_called_once_with(phase='execute', limit='wall')
+
+def test_compile__error__count_metric(mocker):
+
+    # arrange
+    file_mock = mocker.Mock()
+    mocker.patch(
+        'app.service.main.PascalService._run_compiler',
+        return_value=('some error', None)
+    )
+    compile_errors_mock = mocker.patch('app.metrics.COMPILE_ERRORS.inc')
+
+    # act
+    error = PascalService._compile(file_mock)
+
+    # assert
+    assert error == 'some error'
+    compile_errors_mock.assert_called_once_with()
+
+
+def test_check__checker_raise_exception__count_metric(mocker):
+
+    # arrange
+    checker_errors_mock = mocker.patch('app.metrics.CHECKER_ERRORS.inc')
+
+    # act
+    with pytest.raises(CheckerException):
+        PascalService._check(
+            checker_func=lambda right_value, value: 1 / 0,
+            right_value='1',
+            value='1'
+        )
+
+    # assert
+    checker_errors_mock.assert_called_once_with()
+
+
+def test_execute__cpu_limit_exceeded__return_error(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(filepath_exe='program.exe')
+    mocker.patch('app.service.main.RusagePopen')
+    mocker.patch(
+        'app.service.main.communicate',
+        return_value=('partial output', '', False)
+    )
+    mocker.patch('app.service.main.get_usage', return_value=None)
+    mocker.patch('app.service.main.cpu_limit_exceeded', return_value=True)
+    timeouts_mock = mocker.patch('app.metrics.TIMEOUTS.labels')
+
+    # act
+    result = PascalService._run_program(file=file_mock)
+
+    # assert
+    assert result.error == messages.MSG_13
+    assert result.result is None
+    timeouts_mock.assert_called_once_with(phase='execute', limit='cpu')
+    timeouts_mock.return_value.inc.assert_called_once_with()
+
+
+def test_execute__output_limit_exceeded__return_head(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(filepath_exe='program.exe')
+    mocker.patch('app.service.main.RusagePopen')
+    mocker.patch(
+        'app.service.main.communicate',
+        return_value=('head\n...\ntail', '', True)
+    )
+    mocker.patch('app.service.main.get_usage', return_value=None)
+    overflows_mock = mocker.patch('app.metrics.OUTPUT_OVERFLOWS.inc')
+
+    # act
+    result = PascalService._run_program(file=file_mock)
+
+    # assert
+    assert result.error == messages.MSG_14
+    assert result.result == 'head\n...\ntail'
+    overflows_mock.assert_called_once_with()
+
+
+def test_testing__stream_check__skip_checker(mocker):
+
+    # arrange
+    mocker.patch('app.config.STREAM_CHECK_ENABLED', True)
+    file_mock = mocker.Mock()
+    execute_mock = mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(result='1\n3', error=None, mismatch=2)
+    )
+    check_mock = mocker.patch('app.service.main.PascalService._check')
+    preset = CheckerPreset(preset='lines')
+    tests = [TestData(data_in='1', data_out='1\n2')]
+
+    # act
+    list(PascalService._run_tests(
+        file=file_mock,
+        tests=tests,
+        checker=mocker.Mock(),
+        checker_func=preset
+    ))
+
+    # assert
+    comparator = execute_mock.call_args.kwargs['comparator']
+    assert isinstance(comparator, LinesComparator)
+    check_mock.assert_not_called()
+    assert tests[0].ok is False
+    assert tests[0].mismatch == 2
+    assert tests[0].result == '1\n3'
+
+
+def test_testing__stream_check_disabled__no_comparator(mocker):
+
+    # arrange
+    mocker.patch('app.config.STREAM_CHECK_ENABLED', False)
+    execute_mock = mocker.patch(
+        'app.service.main.PascalService._execute',
+        return_value=ExecuteResult(result='1', error=None)
+    )
+    mocker.patch('app.service.main.PascalService._check', return_value=True)
+    tests = [TestData(data_in='1', data_out='1')]
+
+    # act
+    list(PascalService._run_tests(
+        file=mocker.Mock(),
+        tests=tests,
+        checker=mocker.Mock(),
+        checker_func=CheckerPreset(preset='lines')
+    ))
+
+    # assert
+    assert execute_mock.call_args.kwargs['comparator'] is None
+    assert tests[0].mismatch is None
+
+
+def test_execute__result_cache_mismatch__not_cached(mocker):
+
+    # arrange
+    file_mock = mocker.Mock(code='begin end.')
+    mocker.patch('app.config.RESULT_CACHE_ENABLED', True)
+    mocker.patch('app.service.main.result_cache', ResultCache(1024))
+    run_mock = mocker.patch(
+        'app.service.main.PascalService._run_program',
+        return_value=ExecuteResult(result='2', error=None, mismatch=1)
+    )
+
+    # act
+    PascalService._execute(file=file_mock, data_in='1')
+    result = PascalService._execute(file=file_mock, data_in='1')
+
+    # assert
+    assert result.cached is False
+    assert run_mock.call_count == 2
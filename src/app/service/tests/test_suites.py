@@ -0,0 +1,146 @@
+import os
+import stat
+import pytest
+from app.entities import CheckerPreset, TestData
+from app.service.suites import SuiteRegistry
+
+CHECKER = 'def checker(right_value: str, value: str) -> bool:\n    return True'
+
+
+@pytest.fixture()
+def create_registry(tmp_path):
+
+    def create() -> SuiteRegistry:
+        return SuiteRegistry(
+            directory=str(tmp_path / 'suites'),
+            max_bytes=1024
+        )
+
+    return create
+
+
+@pytest.fixture()
+def registry(create_registry) -> SuiteRegistry:
+    return create_registry()
+
+
+def create_tests(*values) -> list:
+    return [
+        TestData(data_in=data_in, data_out=data_out)
+        for data_in, data_out in values
+    ]
+
+
+def test_put__same_suite__same_id(registry, tmp_path):
+
+    # arrange
+    tests = create_tests(('1 2', '3'), (None, 'ответ'))
+
+    # act
+    suite_id_1 = registry.put(tests, CHECKER)
+    suite_id_2 = registry.put(
+        create_tests(('1 2', '3'), (None, 'ответ')),
+        CHECKER
+    )
+    suite_id_3 = registry.put(tests, CheckerPreset(preset='tokens'))
+
+    # assert
+    assert suite_id_1 == suite_id_2
+    assert suite_id_1 != suite_id_3
+    assert len(suite_id_1) == 64
+    assert sorted(os.listdir(tmp_path / 'suites')) == sorted([
+        f'{suite_id_1}.suite', f'{suite_id_3}.suite'
+    ])
+
+
+def test_put__private_permissions(registry, tmp_path):
+
+    # arrange
+    os.makedirs(tmp_path / 'suites', mode=0o755)
+    tests = create_tests(('1 2', '3'))
+
+    # act
+    suite_id = registry.put(tests, CHECKER)
+
+    # assert
+    directory = tmp_path / 'suites'
+    path = directory / f'{suite_id}.suite'
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert os.stat(path).st_uid == os.getuid()
+
+def test_get__ok(registry, create_registry):
+
+    # arrange
+    preset = CheckerPreset(preset='float', eps=0.01)
+    suite_id = registry.put(
+        create_tests(('ввод', '3'), (None, 'x\ud800'), ('', '')),
+        preset
+    )
+
+    # act
+    suite = create_registry().get(suite_id)
+
+    # assert
+    assert suite.checker == preset
+    assert suite.values == [('ввод', '3'), (None, 'x\ud800'), ('', '')]
+    assert suite.create_tests() == create_tests(
+        ('ввод', '3'), (None, 'x\ud800'), ('', '')
+    )
+
+
+def test_get__cached__not_read(registry, mocker):
+
+    # arrange
+    suite_id = registry.put(create_tests(('1', '2')), CHECKER)
+    suite = registry.get(suite_id)
+    read_mock = mocker.patch.object(registry, '_read')
+
+    # act
+    result = registry.get(suite_id)
+
+    # assert
+    assert result is suite
+    read_mock.assert_not_called()
+    assert registry.stats() == {
+        'hits': 1,
+        'misses': 1,
+        'entries': 1,
+        'bytes': suite.size,
+    }
+
+
+def test_get__max_bytes__evict_oldest(registry):
+
+    # arrange
+    registry.max_bytes = 600
+    suite_ids = [
+        registry.put(create_tests((str(index), 'x' * 100)), CHECKER)
+        for index in range(3)
+    ]
+
+    # act
+    for suite_id in suite_ids:
+        registry.get(suite_id)
+
+    # assert
+    assert list(registry._items) == suite_ids[1:]
+    assert registry.stats()['bytes'] <= 600
+
+
+def test_get__unknown_or_invalid_id__none(registry, tmp_path):
+
+    # arrange
+    corrupted_id = 'a' * 64
+    os.makedirs(tmp_path / 'suites')
+    (tmp_path / 'suites' / f'{corrupted_id}.suite').write_bytes(b'garbage')
+
+    # act
+    results = [
+        registry.get('b' * 64),
+        registry.get('../../etc/passwd'),
+        registry.get(corrupted_id),
+    ]
+
+    # assert
+    assert results == [None, None, None]
@@ -0,0 +1,271 @@
+import time
+import pytest
+from app import messages
+from app.entities import TestData
+from app.service.main import PascalService
+from app.service.toolchains import MonoToolchain, create_toolchain
+
+
+def test_create_toolchain__mono__ok(mocker):
+
+    # arrange
+    mocker.patch('app.config.TOOLCHAIN', 'mono')
+    mocker.patch('app.config.PASCAL_COMPILER_PATH', '/pascal/pabc.exe')
+
+    # act
+    toolchain = create_toolchain()
+
+    # assert
+    assert isinstance(toolchain, MonoToolchain)
+    assert toolchain.get_compile_args('/job/a.pas', '/job/a.exe') == [
+        'mono', '/pascal/pabc.exe', '/job/a.pas'
+    ]
+    assert toolchain.get_execute_args('/job/a.exe') == ['mono', '/job/a.exe']
+    assert toolchain.get_artifact_path('/job/a.pas') == '/job/a.exe'
+
+
+def test_create_toolchain__unknown__raise_exception(mocker):
+
+    # arrange
+    mocker.patch('app.config.TOOLCHAIN', 'unknown')
+
+    # act
+    with pytest.raises(ValueError):
+        create_toolchain()
+
+
+def test_fake_toolchain__compile_and_execute__echo_input(
+    fake_toolchain,
+    program
+):
+
+    # arrange
+    fake_toolchain()
+    file = program('begin end.')
+
+    # act
+    error = PascalService._compile(file)
+    result = PascalService._execute(file=file, data_in='1 2')
+
+    # assert
+    assert error is None
+    assert result.error is None
+    assert result.result == '1 2'
+
+
+def test_fake_toolchain__output_size__pad_output(fake_toolchain, program):
+
+    # arrange
+    fake_toolchain(output_size=1000)
+    file = program('begin end.')
+    PascalService._compile(file)
+
+    # act
+    result = PascalService._execute(file=file, data_in='1 2')
+
+    # assert
+    assert result.result.startswith('1 2\n')
+    assert len(result.result) >= 990
+
+
+def test_fake_toolchain__compile_error__ok(fake_toolchain, program):
+
+    # arrange
+    fake_toolchain()
+    file = program('{ fake:compile_error } begin end.')
+
+    # act
+    error = PascalService._compile(file)
+
+    # assert
+    assert 'Fake compilation error' in error
+
+
+def test_fake_toolchain__runtime_error_rate__ok(fake_toolchain, program):
+
+    # arrange
+    fake_toolchain(runtime_error_rate=1)
+    file = program('begin end.')
+    PascalService._compile(file)
+
+    # act
+    result = PascalService._execute(file=file, data_in='1')
+
+    # assert
+    assert 'Fake runtime error' in result.error
+
+
+def test_fake_toolchain__timeout__error(fake_toolchain, program, mocker):
+
+    # arrange
+    fake_toolchain()
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 1)
+    file = program('{ fake:timeout } begin end.')
+    PascalService._compile(file)
+
+    # act
+    result = PascalService._execute(file=file, data_in='1')
+
+    # assert
+    assert result.error == messages.MSG_1
+
+
+def run_tests(file, tests):
+    return list(PascalService._run_tests(
+        file=file,
+        tests=tests,
+        checker=lambda right_value, value: right_value == value,
+        resources=True
+    ))
+
+
+def test_fake_toolchain__execution_host__ok(
+    fake_toolchain,
+    program,
+    mocker
+):
+
+    # arrange
+    fake_toolchain()
+    mocker.patch('app.config.EXECUTION_HOST_ENABLED', True)
+    session_mock = mocker.spy(PascalService, '_run_in_host')
+    run_program_mock = mocker.spy(PascalService, '_run_program')
+    file = program('begin end.')
+    PascalService._compile(file)
+    tests = [
+        TestData(data_in='1', data_out='1'),
+        TestData(data_in='2', data_out='3'),
+    ]
+
+    # act
+    run_tests(file, tests)
+
+    # assert
+    assert session_mock.call_count == 2
+    assert session_mock.call_args_list[0].args[0] \
+        is session_mock.call_args_list[1].args[0]
+    run_program_mock.assert_not_called()
+    assert tests[0].result == '1'
+    assert tests[0].ok is True
+    assert tests[1].ok is False
+    assert tests[0].usage.cpu_time is not None
+
+
+def test_fake_toolchain__execution_host__runtime_error(
+    fake_toolchain,
+    program,
+    mocker
+):
+
+    # arrange
+    fake_toolchain()
+    mocker.patch('app.config.EXECUTION_HOST_ENABLED', True)
+    file = program('{ fake:runtime_error } begin end.')
+    PascalService._compile(file)
+    tests = [TestData(data_in='1', data_out='1'), TestData(data_in='2')]
+
+    # act
+    run_tests(file, tests)
+
+    # assert
+    assert 'Fake runtime error' in tests[0].error
+    assert 'Fake runtime error' in tests[1].error
+
+
+def test_fake_toolchain__execution_host__timeout(
+    fake_toolchain,
+    program,
+    mocker
+):
+
+    # arrange
+    # Ввод '1' зависает, остальные выполняются
+    fake_toolchain(timeout_rate=0.6)
+    mocker.patch('app.config.EXECUTION_HOST_ENABLED', True)
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 1)
+    file = program('begin end.')
+    PascalService._compile(file)
+    tests = [TestData(data_in=str(index)) for index in range(3)]
+
+    # act
+    run_tests(file, tests)
+
+    # assert
+    assert [test.error for test in tests] == [None, messages.MSG_1, None]
+    assert [test.result for test in tests] == ['0', None, '2']
+
+
+def test_fake_toolchain__execution_host__output_overflow(
+    fake_toolchain,
+    program,
+    mocker
+):
+
+    # arrange
+    fake_toolchain()
+    mocker.patch('app.config.EXECUTION_HOST_ENABLED', True)
+    mocker.patch('app.config.OUTPUT_LIMIT', 4)
+    mocker.patch('app.config.OUTPUT_HEAD_SIZE', 2)
+    run_program_mock = mocker.spy(PascalService, '_run_program')
+    file = program('begin end.')
+    PascalService._compile(file)
+    tests = [TestData(data_in='123456'), TestData(data_in='1')]
+
+    # act
+    run_tests(file, tests)
+
+    # assert
+    run_program_mock.assert_not_called()
+    assert [test.error for test in tests] == [messages.MSG_14, None]
+    assert [test.result for test in tests] == ['12', '1']
+
+
+def test_fake_toolchain__execution_host__cpu_limit(
+    fake_toolchain,
+    program,
+    mocker
+):
+
+    # arrange
+    fake_toolchain()
+    mocker.patch('app.config.EXECUTION_HOST_ENABLED', True)
+    mocker.patch('app.config.EXECUTE_CPU_LIMIT', 0.2)
+    mocker.patch('app.config.EXECUTE_WALL_LIMIT', 5)
+    run_program_mock = mocker.spy(PascalService, '_run_program')
+    file = program('{ fake:busy } begin end.')
+    PascalService._compile(file)
+    tests = [TestData(data_in='1'), TestData(data_in='2')]
+    started = time.monotonic()
+
+    # act
+    run_tests(file, tests)
+
+    # assert
+    run_program_mock.assert_not_called()
+    assert time.monotonic() - started < 5
+    assert [test.error for test in tests] == [messages.MSG_13] * 2
+
+
+def test_fake_toolchain__execution_host_failed__fallback(
+    fake_toolchain,
+    program,
+    mocker
+):
+
+    # arrange
+    toolchain = fake_toolchain()
+    mocker.patch('app.config.EXECUTION_HOST_ENABLED', True)
+    mocker.patch.object(
+        toolchain,
+        'get_execution_host_args',
+        return_value=['/not/exists/mono']
+    )
+    file = program('begin end.')
+    PascalService._compile(file)
+    tests = [TestData(data_in='1'), TestData(data_in='2')]
+
+    # act
+    run_tests(file, tests)
+
+    # assert
+    assert [test.result for test in tests] == ['1', '2']
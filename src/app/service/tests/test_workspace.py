@@ -0,0 +1,230 @@
+import os
+import time
+import pytest
+from app.service.workspace import Workspace
+from app.service.entities import PascalFile
+from app.service.exceptions import WorkspaceException
+
+
+@pytest.fixture()
+def workspace(tmp_path) -> Workspace:
+    return Workspace(
+        root=str(tmp_path),
+        max_bytes=1024,
+        max_inodes=100,
+        stale_after=60
+    )
+
+
+def test_create_job_dir__ok(workspace, tmp_path):
+
+    # arrange
+    # act
+    path = workspace.create_job_dir()
+
+    # assert
+    assert os.path.isdir(path)
+    assert os.path.dirname(path) == str(tmp_path)
+    assert os.path.basename(path).startswith('job-')
+
+
+def test_usage__ok(workspace, tmp_path):
+
+    # arrange
+    path = workspace.create_job_dir()
+    with open(os.path.join(path, 'main.pas'), 'w') as file:
+        file.write('x' * 10)
+    with open(os.path.join(path, 'main.exe'), 'w') as file:
+        file.write('x' * 5)
+    (tmp_path / 'cache').mkdir()
+    (tmp_path / 'cache' / 'other.exe').write_bytes(b'x' * 100)
+
+    # act
+    usage = workspace.usage()
+
+    # assert
+    assert usage['jobs'] == 1
+    assert usage['bytes'] == 15
+    assert usage['inodes'] == 3
+
+
+def test_create_job_dir__bytes_quota__raise_exception(workspace):
+
+    # arrange
+    workspace.max_bytes = 10
+    path = workspace.create_job_dir()
+    with open(os.path.join(path, 'main.exe'), 'w') as file:
+        file.write('x' * 10)
+    workspace.refresh()
+
+    # act
+    with pytest.raises(WorkspaceException):
+        workspace.create_job_dir()
+
+    # assert
+    assert workspace.usage()['rejected'] == 1
+
+
+def test_create_job_dir__bytes_written__quota_before_sweep(workspace):
+
+    # arrange
+    workspace.max_bytes = 10
+    path = workspace.create_job_dir()
+    with open(os.path.join(path, 'main.exe'), 'w') as file:
+        file.write('x' * 10)
+
+    # act
+    workspace.update_job_dir(path)
+
+    # assert
+    with pytest.raises(WorkspaceException):
+        workspace.create_job_dir()
+    assert workspace.rejected == 1
+
+
+def test_update_job_dir__removed_dir__not_count(workspace):
+
+    # arrange
+    path = workspace.create_job_dir()
+    workspace.remove_job_dir(path)
+
+    # act
+    workspace.update_job_dir(path)
+
+    # assert
+    assert workspace._bytes == 0
+    assert workspace._inodes == 0
+
+
+def test_pascal_file__source_written__quota_before_sweep(
+    workspace,
+    mocker
+):
+
+    # arrange
+    mocker.patch('app.service.entities.workspace', workspace)
+    workspace.max_bytes = 10
+    PascalFile('x' * 10)
+
+    # act
+    with pytest.raises(WorkspaceException):
+        PascalFile('begin end.')
+
+    # assert
+    assert workspace.rejected == 1
+
+def test_create_job_dir__inodes_quota__raise_exception(workspace):
+
+    # arrange
+    workspace.max_inodes = 2
+    workspace.create_job_dir()
+    workspace.create_job_dir()
+
+    # act
+    with pytest.raises(WorkspaceException):
+        workspace.create_job_dir()
+
+
+def test_remove_job_dir__ok(workspace):
+
+    # arrange
+    path = workspace.create_job_dir()
+    with open(os.path.join(path, 'main.exe'), 'w') as file:
+        file.write('x')
+
+    # act
+    workspace.remove_job_dir(path)
+    workspace.remove_job_dir(path)
+
+    # assert
+    assert not os.path.exists(path)
+    assert workspace.usage()['removed'] == 1
+
+
+def test_sweep__remove_stale_dirs(workspace, tmp_path):
+
+    # arrange
+    # Каталоги заданий завершившегося воркера
+    stale_path = tmp_path / 'job-stale'
+    stale_path.mkdir()
+    actual_path = tmp_path / 'job-actual'
+    actual_path.mkdir()
+    other_path = tmp_path / 'cache'
+    other_path.mkdir()
+    old = time.time() - 120
+    os.utime(stale_path, (old, old))
+    os.utime(other_path, (old, old))
+
+    # act
+    workspace.sweep()
+
+    # assert
+    assert not os.path.exists(stale_path)
+    assert os.path.exists(actual_path)
+    assert os.path.exists(other_path)
+    assert workspace.usage()['swept'] == 1
+
+
+def test_create_job_dir__not_walk_files(workspace, mocker):
+
+    # arrange
+    workspace.create_job_dir()
+    measure_mock = mocker.spy(workspace, '_measure')
+
+    # act
+    workspace.create_job_dir()
+    workspace.create_job_dir()
+
+    # assert
+    measure_mock.assert_not_called()
+
+
+def test_remove_job_dir__release_quota(workspace):
+
+    # arrange
+    workspace.max_inodes = 1
+    path = workspace.create_job_dir()
+    workspace.remove_job_dir(path)
+
+    # act
+    workspace.create_job_dir()
+
+    # assert
+    assert workspace.rejected == 0
+
+
+def test_sweep__active_dir__keep_and_touch(workspace):
+
+    # arrange
+    path = workspace.create_job_dir()
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    # act
+    workspace.sweep()
+
+    # assert
+    assert os.path.exists(path)
+    assert os.stat(path).st_mtime > old + 60
+    assert workspace.usage()['swept'] == 0
+
+
+def test_sweep__other_worker_active_dir__keep(workspace, tmp_path):
+
+    # arrange
+    other = Workspace(
+        root=str(tmp_path),
+        max_bytes=1024,
+        max_inodes=100,
+        stale_after=60
+    )
+    path = other.create_job_dir()
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    other.sweep()
+
+    # act
+    workspace.sweep()
+
+    # assert
+    assert os.path.exists(path)
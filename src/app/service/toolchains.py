@@ -0,0 +1,181 @@
+import os
+import sys
+from typing import List
+from app import config
+from app.service import fake_toolchain
+
+
+class Toolchain:
+
+    """ Компилятор и среда выполнения программ.
+        Описывает команды компиляции и запуска и расположение
+        скомпилированной программы. Команды запускает PascalService
+        (с ограничением времени, учетом ресурсов и от имени sandbox) """
+
+    name = None
+    artifact_suffix = '.exe'
+
+    # Файл компилятора, от него зависит ключ кэша компиляции
+    compiler_path = None
+
+    def get_artifact_path(self, filepath_pas: str) -> str:
+        return os.path.splitext(filepath_pas)[0] + self.artifact_suffix
+
+    def get_compile_args(
+        self,
+        filepath_pas: str,
+        filepath_exe: str
+    ) -> List[str]:
+        raise NotImplementedError
+
+    def get_execute_args(self, filepath_exe: str) -> List[str]:
+        raise NotImplementedError
+
+    def get_execution_host_args(
+        self,
+        filepath_exe: str,
+        output_limit: int
+    ) -> List[str]:
+        raise NotImplementedError
+
+    @property
+    def execution_host_enabled(self) -> bool:
+
+        """ Запуск тестов программы в процессе-хосте (ExecutionHost.cs) """
+
+        return False
+
+    @property
+    def hosts_enabled(self) -> bool:
+
+        """ Компиляция в пуле прогретых процессов (hosts.py) """
+
+        return False
+
+    @property
+    def aot_enabled(self) -> bool:
+
+        """ AOT-компиляция программ и компилятора (aot.py) """
+
+        return False
+
+
+class MonoToolchain(Toolchain):
+
+    """ Компилятор PascalABC.NET, программы запускаются в Mono """
+
+    name = 'mono'
+
+    def __init__(self, compiler_path: str):
+        self.compiler_path = compiler_path
+
+    def get_compile_args(
+        self,
+        filepath_pas: str,
+        filepath_exe: str
+    ) -> List[str]:
+        return ['mono', self.compiler_path, filepath_pas]
+
+    def get_execute_args(self, filepath_exe: str) -> List[str]:
+        return ['mono', filepath_exe]
+
+    def get_execution_host_args(
+        self,
+        filepath_exe: str,
+        output_limit: int
+    ) -> List[str]:
+        return [
+            'mono', config.EXECUTION_HOST_PATH,
+            filepath_exe, str(output_limit)
+        ]
+
+    @property
+    def execution_host_enabled(self) -> bool:
+        return config.EXECUTION_HOST_ENABLED
+
+    @property
+    def hosts_enabled(self) -> bool:
+        return config.COMPILER_HOST_ENABLED
+
+    @property
+    def aot_enabled(self) -> bool:
+        return config.AOT_ENABLED
+
+
+class FakeToolchain(Toolchain):
+
+    """ Детерминированная замена Mono для нагрузочного тестирования
+        Python-части сервиса на любой Linux-машине (fake_toolchain.py) """
+
+    name = 'fake'
+
+    def __init__(
+        self,
+        compile_latency: float = 0,
+        execute_latency: float = 0,
+        output_size: int = 0,
+        compile_error_rate: float = 0,
+        runtime_error_rate: float = 0,
+        timeout_rate: float = 0
+    ):
+        self.compiler_path = os.path.abspath(fake_toolchain.__file__)
+        self.options = [
+            f'--compile-latency={compile_latency}',
+            f'--execute-latency={execute_latency}',
+            f'--output-size={output_size}',
+            f'--compile-error-rate={compile_error_rate}',
+            f'--runtime-error-rate={runtime_error_rate}',
+            f'--timeout-rate={timeout_rate}',
+        ]
+
+    def get_compile_args(
+        self,
+        filepath_pas: str,
+        filepath_exe: str
+    ) -> List[str]:
+        return [
+            sys.executable, self.compiler_path,
+            'compile', filepath_pas, filepath_exe,
+            *self.options
+        ]
+
+    def get_execute_args(self, filepath_exe: str) -> List[str]:
+        return [
+            sys.executable, self.compiler_path,
+            'run', filepath_exe,
+            *self.options
+        ]
+
+    def get_execution_host_args(
+        self,
+        filepath_exe: str,
+        output_limit: int
+    ) -> List[str]:
+        return [
+            sys.executable, self.compiler_path,
+            'host', filepath_exe,
+            f'--output-limit={output_limit}',
+            *self.options
+        ]
+
+    @property
+    def execution_host_enabled(self) -> bool:
+        return config.EXECUTION_HOST_ENABLED
+
+
+def create_toolchain() -> Toolchain:
+    if config.TOOLCHAIN == 'mono':
+        return MonoToolchain(compiler_path=config.PASCAL_COMPILER_PATH)
+    if config.TOOLCHAIN == 'fake':
+        return FakeToolchain(
+            compile_latency=config.FAKE_COMPILE_LATENCY,
+            execute_latency=config.FAKE_EXECUTE_LATENCY,
+            output_size=config.FAKE_OUTPUT_SIZE,
+            compile_error_rate=config.FAKE_COMPILE_ERROR_RATE,
+            runtime_error_rate=config.FAKE_RUNTIME_ERROR_RATE,
+            timeout_rate=config.FAKE_TIMEOUT_RATE
+        )
+    raise ValueError(f'Unknown toolchain: {config.TOOLCHAIN}')
+
+
+toolchain = create_toolchain()
@@ -0,0 +1,225 @@
+import os
+import time
+import uuid
+import shutil
+import threading
+from typing import Dict, Optional, Set, Tuple
+from app import config
+from app.logger import get_logger
+from app.service import exceptions
+
+logger = get_logger()
+
+
+class Workspace:
+
+    """ Рабочие каталоги заданий.
+        Каждое задание получает отдельный каталог job-<uuid>
+        внутри root (например, на tmpfs). Общий объем и количество
+        файлов ограничены, забытые каталоги удаляет фоновый поток.
+        Использование для квоты учитывается при создании и удалении
+        каталогов, после записи файлов задания (update_job_dir)
+        и пересчитывается обходом файлов при каждой очистке
+        (refresh), поэтому каталоги других воркеров учитываются
+        с задержкой """
+
+    prefix = 'job-'
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int,
+        max_inodes: int,
+        stale_after: int
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_inodes = max_inodes
+        self.stale_after = stale_after
+        self.removed = 0
+        self.swept = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        # Каталог задания -> (объем, количество файлов)
+        self._usage: Dict[str, Tuple[int, int]] = {}
+        self._bytes = 0
+        self._inodes = 0
+        self._measured = False
+        # Каталоги заданий этого воркера, которые еще выполняются
+        self._active: Set[str] = set()
+
+    def _iter_job_dirs(self):
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.startswith(self.prefix) and entry.is_dir():
+                yield entry
+
+    def _measure(self, path: str) -> Tuple[int, int]:
+        size, inodes = 0, 1
+        for dirpath, dirnames, filenames in os.walk(path):
+            inodes += len(dirnames) + len(filenames)
+            for filename in filenames:
+                try:
+                    size += os.lstat(os.path.join(dirpath, filename)).st_size
+                except OSError:
+                    pass
+        return size, inodes
+
+    def refresh(self):
+
+        """ Пересчитывает использование обходом файлов
+            каталогов заданий всех воркеров """
+
+        usage = {
+            job_dir.path: self._measure(job_dir.path)
+            for job_dir in self._iter_job_dirs()
+        }
+        with self._lock:
+            # Каталоги, удаленные во время обхода, не учитываются,
+            # созданные во время обхода - учитываются
+            self._usage = {
+                path: value for path, value in usage.items()
+                if os.path.isdir(path)
+            }
+            for path in self._active:
+                self._usage.setdefault(path, (0, 1))
+            self._bytes = sum(size for size, _ in self._usage.values())
+            self._inodes = sum(inodes for _, inodes in self._usage.values())
+            self._measured = True
+
+    def _forget(self, path: str):
+        with self._lock:
+            self._active.discard(path)
+            size, inodes = self._usage.pop(path, (0, 0))
+            self._bytes -= size
+            self._inodes -= inodes
+
+    def usage(self) -> dict:
+
+        """ Текущее использование рабочих каталогов """
+
+        self.refresh()
+        with self._lock:
+            return {
+                'root': self.root,
+                'jobs': len(self._usage),
+                'bytes': self._bytes,
+                'inodes': self._inodes,
+                'max_bytes': self.max_bytes,
+                'max_inodes': self.max_inodes,
+                'removed': self.removed,
+                'swept': self.swept,
+                'rejected': self.rejected,
+            }
+
+    def create_job_dir(self) -> str:
+
+        """ Создает каталог задания.
+            Если квота исчерпана - WorkspaceException """
+
+        if not self._measured:
+            self.refresh()
+        with self._lock:
+            if self._bytes >= self.max_bytes \
+                    or self._inodes >= self.max_inodes:
+                self.rejected += 1
+                raise exceptions.WorkspaceException()
+        path = os.path.join(self.root, f'{self.prefix}{uuid.uuid4()}')
+        os.makedirs(path, mode=0o755)
+        with self._lock:
+            self._active.add(path)
+            if path not in self._usage:
+                self._usage[path] = (0, 1)
+                self._inodes += 1
+        return path
+
+    def update_job_dir(self, path: str):
+
+        """ Пересчитывает использование каталога задания этого
+            воркера после записи в него файлов: квота учитывает
+            их сразу, а не после очередной очистки """
+
+        size, inodes = self._measure(path)
+        with self._lock:
+            if path not in self._active:
+                return
+            old_size, old_inodes = self._usage.get(path, (0, 0))
+            self._usage[path] = (size, inodes)
+            self._bytes += size - old_size
+            self._inodes += inodes - old_inodes
+
+    def remove_job_dir(self, path: str):
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            self._forget(path)
+            return
+        except OSError as ex:
+            logger.error(f'Can not remove job dir {path}: {ex}')
+            with self._lock:
+                self._active.discard(path)
+            return
+        self._forget(path)
+        with self._lock:
+            self.removed += 1
+
+    def sweep(self):
+
+        """ Удаляет каталоги заданий старше stale_after секунд.
+            Каталоги выполняющихся заданий воркера не удаляются
+            и обновляют время изменения, чтобы их не удалили
+            другие воркеры. Затем пересчитывает использование """
+
+        with self._lock:
+            active = set(self._active)
+        for path in active:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        deadline = time.time() - self.stale_after
+        for job_dir in self._iter_job_dirs():
+            if job_dir.path in active:
+                continue
+            try:
+                modified = job_dir.stat().st_mtime
+            except OSError:
+                continue
+            if modified < deadline:
+                logger.info(f'Remove stale job dir {job_dir.path}')
+                shutil.rmtree(job_dir.path, ignore_errors=True)
+                self._forget(job_dir.path)
+                with self._lock:
+                    self.swept += 1
+        self.refresh()
+
+    def _sweep_forever(self, interval: int):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except Exception as ex:
+                logger.error(f'Workspace sweep failed: {ex}')
+
+    def start_sweeper(self, interval: int):
+        if self._sweeper is not None:
+            return
+        self._sweeper = threading.Thread(
+            target=self._sweep_forever,
+            args=(interval,),
+            name='workspace-sweeper',
+            daemon=True
+        )
+        self._sweeper.start()
+
+
+workspace = Workspace(
+    root=config.WORKSPACE_DIR,
+    max_bytes=config.WORKSPACE_MAX_BYTES,
+    max_inodes=config.WORKSPACE_MAX_INODES,
+    stale_after=config.WORKSPACE_STALE_AFTER
+)
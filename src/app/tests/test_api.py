@@ -1,9 +1,16 @@
+import json
 from app.entities import (
     DebugData,
     TestsData,
-    TestData
+    TestData,
+    CheckerPreset,
+    SubmissionData
 )
-from app.service.exceptions import ServiceException
+from app.service.exceptions import ServiceException, AdmissionException
+from app.service.suites import suite_registry
+from app.jobs.entities import Job
+from app.jobs.main import JobQueueFull
+from app import messages
 
 
 def test_debug__ok(client, mocker):
@@ -99,6 +106,26 @@ def test_debug__not_result__ok(client, mocker):
     debug_mock.assert_called_once_with(serialized_data)
 
 
+def test_debug__cached__ok(client, mocker):
+
+    # arrange
+    request_data = {'code': 'some code'}
+    mocker.patch(
+        'app.service.main.PascalService.debug',
+        return_value=DebugData(result='some result', cached=True)
+    )
+
+    # act
+    response = client.post('/debug/', json=request_data)
+
+    # assert
+    assert response.json == {
+        'result': 'some result',
+        'error': None,
+        'cached': True
+    }
+
+
 def test_debug__service_exception__internal_error(client, mocker):
 
     # arrange
@@ -388,3 +415,598 @@ def test_testing__validation_error__bad_request(client, mocker):
     }
     service_mock.assert_not_called()
 
+
+def test_testing__checker_preset__ok(client, mocker):
+
+    # arrange
+    request_data = {
+        'code': 'some code',
+        'checker': {'preset': 'float', 'eps': 0.001},
+        'tests': [
+            {
+                'data_in': 'some test input',
+                'data_out': 'some test out'
+            }
+        ]
+    }
+    testing_mock = mocker.patch(
+        'app.service.main.PascalService.testing',
+        return_value=TestsData(tests=[])
+    )
+
+    # act
+    response = client.post('/testing/', json=request_data)
+
+    # assert
+    assert response.status_code == 200
+    testing_mock.assert_called_once_with(
+        TestsData(
+            code='some code',
+            checker=CheckerPreset(preset='float', eps=0.001),
+            tests=[
+                TestData(
+                    data_in='some test input',
+                    data_out='some test out'
+                )
+            ]
+        )
+    )
+
+
+def test_testing__unknown_checker_preset__bad_request(client, mocker):
+
+    # arrange
+    request_data = {
+        'code': 'some code',
+        'checker': {'preset': 'unknown'},
+        'tests': [
+            {
+                'data_in': 'some test input',
+                'data_out': 'some test out'
+            }
+        ]
+    }
+    service_mock = mocker.patch('app.service.main.PascalService.testing')
+
+    # act
+    response = client.post('/testing/', json=request_data)
+
+    # assert
+    assert response.status_code == 400
+    assert list(response.json['details']) == ['checker']
+    service_mock.assert_not_called()
+
+
+def test_testing__fail_fast__ok(client, mocker):
+
+    # arrange
+    request_data = {
+        'code': 'some code',
+        'checker': 'some func',
+        'fail_fast': True,
+        'tests': [
+            {
+                'data_in': 'some test input',
+                'data_out': 'some test out'
+            }
+        ]
+    }
+    testing_mock = mocker.patch(
+        'app.service.main.PascalService.testing',
+        return_value=TestsData(tests=[])
+    )
+
+    # act
+    response = client.post('/testing/', json=request_data)
+
+    # assert
+    assert response.status_code == 200
+    assert testing_mock.call_args.args[0].fail_fast is True
+
+
+def test_testing_stream__ok(client, mocker):
+
+    # arrange
+    request_data = {
+        'code': 'some code',
+        'checker': 'some func',
+        'tests': [
+            {
+                'data_in': 'some test 1 input',
+                'data_out': 'some test 1 out'
+            },
+            {
+                'data_in': 'some test 2 input',
+                'data_out': 'some test 2 out'
+            }
+        ]
+    }
+
+    def testing_events(data):
+        yield 'compile', None
+        data.tests[1].result = 'some result 2'
+        data.tests[1].ok = True
+        yield 'test', 1
+        data.tests[0].error = 'some error 1'
+        data.tests[0].ok = False
+        yield 'test', 0
+
+    mocker.patch(
+        'app.service.main.PascalService.testing_events',
+        side_effect=testing_events
+    )
+
+    # act
+    response = client.post('/testing/stream/', json=request_data)
+
+    # assert
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert lines == [
+        {'type': 'compile', 'error': None},
+        {
+            'type': 'test',
+            'index': 1,
+            'result': 'some result 2',
+            'error': None,
+            'ok': True
+        },
+        {
+            'type': 'test',
+            'index': 0,
+            'result': None,
+            'error': 'some error 1',
+            'ok': False
+        },
+        {'type': 'summary', 'num': 2, 'num_ok': 1, 'ok': False},
+    ]
+
+
+def test_testing_stream__service_exception__error_line(client, mocker):
+
+    # arrange
+    request_data = {
+        'code': 'some code',
+        'checker': 'some func',
+        'tests': [
+            {
+                'data_in': 'some test input',
+                'data_out': 'some test out'
+            }
+        ]
+    }
+
+    def testing_events(data):
+        yield 'compile', None
+        raise ServiceException(message='some message', details='details')
+
+    mocker.patch(
+        'app.service.main.PascalService.testing_events',
+        side_effect=testing_events
+    )
+
+    # act
+    response = client.post('/testing/stream/', json=request_data)
+
+    # assert
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert lines[-1] == {
+        'type': 'error',
+        'error': 'some message',
+        'details': 'details'
+    }
+
+
+def test_testing_stream__validation_error__bad_request(client, mocker):
+
+    # arrange
+    service_mock = mocker.patch(
+        'app.service.main.PascalService.testing_events'
+    )
+
+    # act
+    response = client.post('/testing/stream/', json={'code': 'some code'})
+
+    # assert
+    assert response.status_code == 400
+    service_mock.assert_not_called()
+
+
+def test_batch_testing__ok(client, mocker):
+
+    # arrange
+    request_data = {
+        'checker': 'some func',
+        'tests': [
+            {
+                'data_in': 'some test input',
+                'data_out': 'some test out'
+            }
+        ],
+        'submissions': [
+            {'code': 'some code 1'},
+            {'code': 'some code 2'}
+        ]
+    }
+
+    def batch_testing(data):
+        data.results = [
+            TestsData(tests=[TestData(result='some result', ok=True)]),
+            ServiceException(message='some message', details='details')
+        ]
+        return data
+
+    batch_mock = mocker.patch(
+        'app.service.main.PascalService.batch_testing',
+        side_effect=batch_testing
+    )
+
+    # act
+    response = client.post('/batch/testing/', json=request_data)
+
+    # assert
+    assert response.status_code == 200
+    assert response.json == {
+        'results': [
+            {
+                'num': 1,
+                'num_ok': 1,
+                'ok': True,
+                'tests': [
+                    {'result': 'some result', 'error': None, 'ok': True}
+                ]
+            },
+            {'error': 'some message', 'details': 'details'}
+        ]
+    }
+    data = batch_mock.call_args.args[0]
+    assert data.checker == 'some func'
+    assert data.submissions == [
+        SubmissionData(code='some code 1'),
+        SubmissionData(code='some code 2')
+    ]
+
+
+def test_batch_testing__validation_error__bad_request(client, mocker):
+
+    # arrange
+    request_data = {
+        'checker': 'some func',
+        'tests': []
+    }
+    batch_mock = mocker.patch('app.service.main.PascalService.batch_testing')
+
+    # act
+    response = client.post('/batch/testing/', json=request_data)
+
+    # assert
+    assert response.status_code == 400
+    assert response.json['details'] == {
+        'submissions': ['Missing data for required field.']
+    }
+    batch_mock.assert_not_called()
+
+
+def test_register_suite__ok(client, mocker, tmp_path):
+
+    # arrange
+    mocker.patch.object(suite_registry, 'directory', str(tmp_path))
+    request_data = {
+        'checker': {'preset': 'tokens'},
+        'tests': [
+            {'data_in': '1 2', 'data_out': '3'},
+            {'data_out': '0'}
+        ]
+    }
+
+    # act
+    response = client.post('/suites/', json=request_data)
+    get_response = client.get(f'/suites/{response.json["id"]}/')
+
+    # assert
+    assert response.status_code == 201
+    assert response.json['num'] == 2
+    assert len(response.json['id']) == 64
+    assert get_response.json == {'id': response.json['id'], 'num': 2}
+
+
+def test_register_suite__invalid_checker__internal_error(
+    client,
+    mocker,
+    tmp_path
+):
+
+    # arrange
+    mocker.patch.object(suite_registry, 'directory', str(tmp_path))
+    request_data = {
+        'checker': 'def my_checker(): pass',
+        'tests': [{'data_out': '0'}]
+    }
+
+    # act
+    response = client.post('/suites/', json=request_data)
+
+    # assert
+    assert response.status_code == 500
+    assert response.json['error'] == messages.MSG_2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_suite__not_found(client):
+
+    # act
+    response = client.get(f'/suites/{"0" * 64}/')
+
+    # assert
+    assert response.status_code == 404
+    assert response.json['error'] == messages.MSG_18
+
+
+def test_testing__suite__ok(client, mocker, tmp_path):
+
+    # arrange
+    mocker.patch.object(suite_registry, 'directory', str(tmp_path))
+    suite_id = suite_registry.put(
+        [TestData(data_in='1 2', data_out='3')],
+        CheckerPreset(preset='tokens')
+    )
+    testing_mock = mocker.patch(
+        'app.service.main.PascalService.testing',
+        return_value=TestsData(tests=[])
+    )
+
+    # act
+    response = client.post(
+        '/testing/',
+        json={'code': 'some code', 'suite': suite_id}
+    )
+
+    # assert
+    assert response.status_code == 200
+    testing_mock.assert_called_once_with(TestsData(
+        code='some code',
+        checker=CheckerPreset(preset='tokens'),
+        tests=[TestData(data_in='1 2', data_out='3')]
+    ))
+
+
+def test_testing__unknown_suite__bad_request(client, mocker):
+
+    # arrange
+    testing_mock = mocker.patch('app.service.main.PascalService.testing')
+
+    # act
+    response = client.post(
+        '/testing/',
+        json={'code': 'some code', 'suite': 'unknown'}
+    )
+
+    # assert
+    assert response.status_code == 400
+    assert response.json['details'] == {'suite': ['Unknown test suite.']}
+    testing_mock.assert_not_called()
+
+
+def test_testing__suite_with_tests__bad_request(client, mocker):
+
+    # arrange
+    testing_mock = mocker.patch('app.service.main.PascalService.testing')
+
+    # act
+    response = client.post('/testing/', json={
+        'code': 'some code',
+        'suite': 'some suite',
+        'tests': []
+    })
+
+    # assert
+    assert response.status_code == 400
+    assert response.json['details'] == {'tests': ['Not allowed with suite.']}
+    testing_mock.assert_not_called()
+
+
+def test_submit_job__ok(client, mocker):
+
+    # arrange
+    request_data = {
+        'type': 'debug',
+        'data': {
+            'code': 'some code',
+            'data_in': 'some input'
+        }
+    }
+    job = Job(id='some id', type='debug')
+    submit_mock = mocker.patch(
+        'app.main.job_queue.submit',
+        return_value=job
+    )
+
+    # act
+    response = client.post('/jobs/', json=request_data)
+
+    # assert
+    assert response.status_code == 202
+    assert response.json == {
+        'id': 'some id',
+        'type': 'debug',
+        'status': 'queued',
+        'result': None
+    }
+    submit_mock.assert_called_once_with(
+        'debug',
+        DebugData(code='some code', data_in='some input')
+    )
+
+
+def test_submit_job__invalid_data__bad_request(client, mocker):
+
+    # arrange
+    request_data = {
+        'type': 'testing',
+        'data': {'code': 'some code'}
+    }
+    submit_mock = mocker.patch('app.main.job_queue.submit')
+
+    # act
+    response = client.post('/jobs/', json=request_data)
+
+    # assert
+    assert response.status_code == 400
+    assert set(response.json['details']['data']) == {'tests', 'checker'}
+    submit_mock.assert_not_called()
+
+
+def test_submit_job__queue_full__service_unavailable(client, mocker):
+
+    # arrange
+    request_data = {
+        'type': 'debug',
+        'data': {'code': 'some code'}
+    }
+    mocker.patch('app.main.job_queue.submit', side_effect=JobQueueFull())
+
+    # act
+    response = client.post('/jobs/', json=request_data)
+
+    # assert
+    assert response.status_code == 503
+    assert response.json['error'] == messages.MSG_10
+
+
+def test_get_job__ok(client, mocker):
+
+    # arrange
+    job = Job(
+        id='some id',
+        type='debug',
+        status='done',
+        result={'result': 'some result', 'error': None}
+    )
+    get_mock = mocker.patch('app.main.job_queue.get', return_value=job)
+
+    # act
+    response = client.get('/jobs/some id/')
+
+    # assert
+    assert response.status_code == 200
+    assert response.json['status'] == 'done'
+    assert response.json['result'] == job.result
+    get_mock.assert_called_once_with('some id')
+
+
+def test_get_job__not_found__ok(client, mocker):
+
+    # arrange
+    mocker.patch('app.main.job_queue.get', return_value=None)
+
+    # act
+    response = client.get('/jobs/some id/')
+
+    # assert
+    assert response.status_code == 404
+    assert response.json['error'] == messages.MSG_11
+
+
+def test_stats__ok(client, mocker):
+
+    # arrange
+    cache_stats = {'hits': 1, 'misses': 2, 'entries': 1, 'bytes': 10}
+    mocker.patch(
+        'app.main.compile_cache.stats',
+        return_value=cache_stats
+    )
+
+    # act
+    response = client.get('/stats/')
+
+    # assert
+    assert response.status_code == 200
+    assert response.json['compile_cache'] == cache_stats
+
+
+def test_metrics__ok(client, mocker):
+
+    # arrange
+    mocker.patch(
+        'app.metrics.generate',
+        return_value=b'# TYPE pascal_timeouts_total counter\n'
+    )
+
+    # act
+    response = client.get('/metrics')
+
+    # assert
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert response.data == b'# TYPE pascal_timeouts_total counter\n'
+
+
+def test_debug__limits_above_max__bad_request(client, mocker):
+
+    # arrange
+    debug_mock = mocker.patch('app.service.main.PascalService.debug')
+    request_data = {
+        'code': 'some code',
+        'limits': {'execute': {'cpu_time': 10 ** 6}}
+    }
+
+    # act
+    response = client.post('/debug/', json=request_data)
+
+    # assert
+    assert response.status_code == 400
+    assert 'cpu_time' in response.json['details']['limits']['execute']
+    debug_mock.assert_not_called()
+
+
+def test_debug__admission_rejected__too_many_requests(client, mocker):
+
+    # arrange
+    mocker.patch(
+        'app.main.admission.acquire',
+        side_effect=AdmissionException(retry_after=7)
+    )
+    debug_mock = mocker.patch('app.service.main.PascalService.debug')
+
+    # act
+    response = client.post('/debug/', json={'code': 'some code'})
+
+    # assert
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '7'
+    assert response.json['error'] == messages.MSG_15
+    debug_mock.assert_not_called()
+
+
+def test_testing_stream__admission__release_after_stream(client, mocker):
+
+    # arrange
+    request_data = {
+        'code': 'some code',
+        'checker': 'some func',
+        'tests': [{'data_in': '1', 'data_out': '1'}]
+    }
+    acquire_mock = mocker.patch(
+        'app.main.admission.acquire',
+        return_value='some slot'
+    )
+    release_mock = mocker.patch('app.main.admission.release')
+
+    def testing_events(data):
+        release_mock.assert_not_called()
+        yield 'compile', None
+
+    mocker.patch(
+        'app.service.main.PascalService.testing_events',
+        side_effect=testing_events
+    )
+
+    # act
+    response = client.post('/testing/stream/', json=request_data)
+    response.close()
+
+    # assert
+    assert response.status_code == 200
+    acquire_mock.assert_called_once_with()
+    release_mock.assert_called_once_with('some slot')
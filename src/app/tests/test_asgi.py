@@ -0,0 +1,148 @@
+import json
+import asyncio
+from app import messages
+from app.asgi import app
+from app.entities import DebugData
+from app.service.suites import suite_registry
+from app.service.exceptions import AdmissionException, ServiceException
+
+
+def request(method: str, path: str, data=None):
+    body = json.dumps(data).encode() if data is not None else b''
+    messages_in = [
+        {'type': 'http.request', 'body': body[:10], 'more_body': True},
+        {'type': 'http.request', 'body': body[10:], 'more_body': False},
+    ]
+    messages_out = []
+
+    async def receive():
+        return messages_in.pop(0)
+
+    async def send(message):
+        messages_out.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path}
+    asyncio.run(app(scope, receive, send))
+    start, response = messages_out
+    return start['status'], dict(start['headers']), response['body']
+
+
+def test_debug__ok(mocker):
+
+    # arrange
+    debug_mock = mocker.patch(
+        'app.asgi.AsyncPascalService.debug',
+        return_value=DebugData(result='some result', error=None)
+    )
+
+    # act
+    status, headers, body = request(
+        'POST', '/debug/', {'code': 'some code', 'data_in': 'some input'}
+    )
+
+    # assert
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
+    assert json.loads(body) == {'result': 'some result', 'error': None}
+    assert debug_mock.call_args.args[0] == DebugData(
+        code='some code',
+        data_in='some input'
+    )
+
+
+def test_testing__validation_error__bad_request(mocker):
+
+    # arrange
+    testing_mock = mocker.patch('app.asgi.AsyncPascalService.testing')
+
+    # act
+    status, headers, body = request('POST', '/testing/', {'code': '1'})
+
+    # assert
+    assert status == 400
+    assert json.loads(body)['error'] == 'Validation error'
+    assert set(json.loads(body)['details']) == {'tests', 'checker'}
+    testing_mock.assert_not_called()
+
+
+def test_register_suite__ok(mocker, tmp_path):
+
+    # arrange
+    mocker.patch.object(suite_registry, 'directory', str(tmp_path))
+    data = {'checker': {'preset': 'exact'}, 'tests': [{'data_out': '1'}]}
+
+    # act
+    status, headers, body = request('POST', '/suites/', data)
+
+    # assert
+    assert status == 201
+    assert json.loads(body)['num'] == 1
+    assert suite_registry.get(json.loads(body)['id']) is not None
+
+
+def test_debug__invalid_json__bad_request():
+
+    # act
+    status, headers, body = request('POST', '/debug/')
+
+    # assert
+    assert status == 400
+
+
+def test_debug__service_exception__internal_error(mocker):
+
+    # arrange
+    mocker.patch(
+        'app.asgi.AsyncPascalService.debug',
+        side_effect=ServiceException('some error', 'some details')
+    )
+
+    # act
+    status, headers, body = request('POST', '/debug/', {'code': '1'})
+
+    # assert
+    assert status == 500
+    assert json.loads(body) == {
+        'error': 'some error',
+        'details': 'some details'
+    }
+
+
+def test_debug__admission_rejected__too_many_requests(mocker):
+
+    # arrange
+    mocker.patch(
+        'app.asgi.admission.acquire_async',
+        side_effect=AdmissionException(retry_after=7)
+    )
+    debug_mock = mocker.patch('app.asgi.AsyncPascalService.debug')
+
+    # act
+    status, headers, body = request('POST', '/debug/', {'code': '1'})
+
+    # assert
+    assert status == 429
+    assert headers[b'retry-after'] == b'7'
+    assert json.loads(body)['error'] == messages.MSG_15
+    debug_mock.assert_not_called()
+
+
+def test_unknown_route__not_found():
+
+    # act
+    status, headers, body = request('GET', '/unknown/')
+    method_status, _, _ = request('GET', '/debug/')
+
+    # assert
+    assert status == 404
+    assert method_status == 405
+
+
+def test_metrics__ok():
+
+    # act
+    status, headers, body = request('GET', '/metrics')
+
+    # assert
+    assert status == 200
+    assert headers[b'content-type'].startswith(b'text/plain')
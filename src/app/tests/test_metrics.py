@@ -0,0 +1,151 @@
+import os
+import sys
+import subprocess
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+import app
+from app import metrics
+
+SRC_DIR = os.path.dirname(os.path.dirname(app.__file__))
+
+# Воркер: пишет метрики count раз и ждет строку в stdin
+WORKER_SCRIPT = '''
+import sys
+from app import metrics
+for _ in range(int(sys.argv[1])):
+    metrics.TIMEOUTS.labels(phase='execute', limit='wall').inc()
+    metrics.EXECUTE_TIME.observe(0.2)
+metrics.IN_FLIGHT.labels(source='job').inc()
+print('ready', flush=True)
+sys.stdin.readline()
+'''
+
+
+def get_value(text: bytes, name: str, **labels):
+    for family in text_string_to_metric_families(text.decode()):
+        for sample in family.samples:
+            if sample.name == name and sample.labels == labels:
+                return sample.value
+    return None
+
+
+@pytest.fixture()
+def start_worker(tmp_path):
+
+    """ Процессы, пишущие метрики в tmp_path """
+
+    workers = []
+    env = dict(
+        os.environ,
+        METRICS_ENABLED='true',
+        METRICS_DIR=str(tmp_path)
+    )
+
+    def start(count: int) -> subprocess.Popen:
+        worker = subprocess.Popen(
+            [sys.executable, '-c', WORKER_SCRIPT, str(count)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=SRC_DIR,
+            env=env
+        )
+        workers.append(worker)
+        return worker
+
+    yield start
+    for worker in workers:
+        worker.kill()
+        worker.wait()
+
+
+def wait_ready(worker: subprocess.Popen):
+    assert worker.stdout.readline() == b'ready\n'
+
+
+def stop(worker: subprocess.Popen):
+    worker.communicate(b'\n', timeout=10)
+
+
+def test_collect__concurrent_workers__sum_values(tmp_path, start_worker):
+
+    # arrange
+    workers = [start_worker(count=500) for _ in range(4)]
+    for worker in workers:
+        wait_ready(worker)
+
+    # act
+    text = metrics.collect(str(tmp_path))
+
+    # assert
+    assert get_value(
+        text, 'pascal_timeouts_total', phase='execute', limit='wall'
+    ) == 2000
+    assert get_value(text, 'pascal_execute_duration_seconds_count') == 2000
+    assert get_value(
+        text, 'pascal_execute_duration_seconds_bucket', le='0.1'
+    ) == 0
+    assert get_value(
+        text, 'pascal_execute_duration_seconds_bucket', le='0.25'
+    ) == 2000
+    assert get_value(text, 'pascal_in_flight', source='job') == 4
+
+
+def test_collect__dead_worker__skip_gauges(tmp_path, start_worker):
+
+    # arrange
+    alive = start_worker(count=1)
+    dead = start_worker(count=2)
+    wait_ready(alive)
+    wait_ready(dead)
+    stop(dead)
+
+    # act
+    text = metrics.collect(str(tmp_path))
+
+    # assert
+    assert get_value(text, 'pascal_in_flight', source='job') == 1
+    assert get_value(
+        text, 'pascal_timeouts_total', phase='execute', limit='wall'
+    ) == 3
+    assert not os.path.exists(tmp_path / f'gauge_livesum_{dead.pid}.db')
+    assert os.path.exists(tmp_path / f'counter_{dead.pid}.db')
+
+
+def test_collect__all_workers_dead__keep_counters(tmp_path, start_worker):
+
+    # arrange
+    worker = start_worker(count=1)
+    wait_ready(worker)
+    stop(worker)
+
+    # act
+    text = metrics.collect(str(tmp_path))
+
+    # assert
+    assert get_value(text, 'pascal_in_flight', source='job') is None
+    assert get_value(
+        text, 'pascal_timeouts_total', phase='execute', limit='wall'
+    ) == 1
+
+
+def test_collect__empty_dir__ok(tmp_path):
+
+    # act
+    text = metrics.collect(str(tmp_path))
+
+    # assert
+    assert text == b''
+
+
+def test_generate__disabled__current_process(mocker):
+
+    # arrange
+    mocker.patch('app.config.METRICS_ENABLED', False)
+    collect_mock = mocker.patch('app.metrics.collect')
+
+    # act
+    text = metrics.generate()
+
+    # assert
+    assert b'# TYPE pascal_timeouts_total counter' in text
+    collect_mock.assert_not_called()
@@ -0,0 +1,258 @@
+""" Одни и те же запросы к WSGI- (app.main) и ASGI-приложению
+    (app.asgi) с fake-компилятором: API приложений совпадает """
+
+import json
+import time
+import asyncio
+import pytest
+from app import messages
+from app.asgi import app as asgi_app
+from app.service.suites import suite_registry
+
+CHECKER = 'def checker(right_value: str, value: str) -> bool:\n' \
+          '    return right_value == value'
+
+
+def call_asgi(method: str, path: str, data=None):
+    body = json.dumps(data).encode() if data is not None else b''
+    messages_in = [{'type': 'http.request', 'body': body}]
+    messages_out = []
+
+    async def receive():
+        return messages_in.pop(0)
+
+    async def send(message):
+        messages_out.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path}
+    asyncio.run(asgi_app(scope, receive, send))
+    start, *chunks = messages_out
+    headers = {
+        name.decode(): value.decode() for name, value in start['headers']
+    }
+    return (
+        start['status'],
+        headers['content-type'],
+        b''.join(chunk['body'] for chunk in chunks)
+    )
+
+
+@pytest.fixture(params=['wsgi', 'asgi'])
+def call(request, client, fake_toolchain, mocker, tmp_path):
+
+    """ Запрос к одному из приложений: статус, тип содержимого, тело """
+
+    fake_toolchain()
+    mocker.patch.object(suite_registry, 'directory', str(tmp_path))
+
+    def call_wsgi(method: str, path: str, data=None):
+        response = client.open(path, method=method, json=data)
+        return response.status_code, response.content_type, response.data
+
+    if request.param == 'asgi':
+        return call_asgi
+    return call_wsgi
+
+
+def test_index__ok(call):
+
+    # act
+    status, content_type, body = call('GET', '/')
+
+    # assert
+    assert status == 200
+    assert content_type == 'text/html; charset=utf-8'
+    assert b'<title>Pascal ABC.NET</title>' in body
+
+
+def test_static__ok(call):
+
+    # act
+    status, content_type, body = call('GET', '/static/fonts/thintel.ttf')
+
+    # assert
+    assert status == 200
+    assert len(body) > 0
+
+
+def test_debug__ok(call):
+
+    # act
+    status, content_type, body = call(
+        'POST', '/debug/', {'code': 'begin end.', 'data_in': 'some input'}
+    )
+
+    # assert
+    assert status == 200
+    assert content_type == 'application/json'
+    assert json.loads(body) == {'result': 'some input', 'error': None}
+
+
+def test_debug__validation_error__bad_request(call):
+
+    # act
+    status, content_type, body = call('POST', '/debug/', {'data_in': '1'})
+
+    # assert
+    assert status == 400
+    assert json.loads(body) == {
+        'error': 'Validation error',
+        'details': {'code': ['Missing data for required field.']}
+    }
+
+
+def test_testing__ok(call):
+
+    # act
+    status, content_type, body = call('POST', '/testing/', {
+        'code': 'begin end.',
+        'checker': CHECKER,
+        'tests': [
+            {'data_in': '1', 'data_out': '1'},
+            {'data_in': '2', 'data_out': '3'}
+        ]
+    })
+
+    # assert
+    assert status == 200
+    data = json.loads(body)
+    assert (data['num'], data['num_ok'], data['ok']) == (2, 1, False)
+    assert [test['ok'] for test in data['tests']] == [True, False]
+
+
+def test_testing_stream__ok(call):
+
+    # act
+    status, content_type, body = call('POST', '/testing/stream/', {
+        'code': 'begin end.',
+        'checker': CHECKER,
+        'tests': [
+            {'data_in': '1', 'data_out': '1'},
+            {'data_in': '2', 'data_out': '2'}
+        ]
+    })
+
+    # assert
+    assert status == 200
+    assert content_type == 'application/x-ndjson'
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert lines[0] == {'type': 'compile', 'error': None}
+    assert sorted(line['index'] for line in lines[1:-1]) == [0, 1]
+    assert all(line['ok'] for line in lines[1:-1])
+    assert lines[-1] == {'type': 'summary', 'num': 2, 'num_ok': 2, 'ok': True}
+
+
+def test_testing_stream__compile_error__ok(call):
+
+    # act
+    status, content_type, body = call('POST', '/testing/stream/', {
+        'code': '// fake:compile_error',
+        'checker': CHECKER,
+        'tests': [{'data_in': '1', 'data_out': '1'}]
+    })
+
+    # assert
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert [line['type'] for line in lines] == ['compile', 'test', 'summary']
+    assert lines[0]['error'] is not None
+    assert lines[-1]['ok'] is False
+
+
+def test_batch_testing__ok(call):
+
+    # act
+    status, content_type, body = call('POST', '/batch/testing/', {
+        'checker': CHECKER,
+        'tests': [{'data_in': '1', 'data_out': '1'}],
+        'submissions': [
+            {'code': 'begin end.'},
+            {'code': '// fake:compile_error'}
+        ]
+    })
+
+    # assert
+    assert status == 200
+    results = json.loads(body)['results']
+    assert [result['ok'] for result in results] == [True, False]
+
+
+def test_suites__register__get(call):
+
+    # act
+    status, _, body = call('POST', '/suites/', {
+        'checker': {'preset': 'tokens'},
+        'tests': [{'data_in': '1', 'data_out': '1'}, {'data_out': '0'}]
+    })
+    suite_id = json.loads(body)['id']
+    get_status, _, get_body = call('GET', f'/suites/{suite_id}/')
+
+    # assert
+    assert status == 201
+    assert get_status == 200
+    assert json.loads(get_body) == {'id': suite_id, 'num': 2}
+
+
+def test_suites__not_found(call):
+
+    # act
+    status, _, body = call('GET', f'/suites/{"0" * 64}/')
+
+    # assert
+    assert status == 404
+    assert json.loads(body) == {'error': messages.MSG_18, 'details': None}
+
+
+def test_jobs__submit__get_result(call):
+
+    # act
+    status, _, body = call('POST', '/jobs/', {
+        'type': 'debug',
+        'data': {'code': 'begin end.', 'data_in': 'some input'}
+    })
+    job_id = json.loads(body)['id']
+    deadline = time.monotonic() + 10
+    while True:
+        get_status, _, get_body = call('GET', f'/jobs/{job_id}/')
+        job = json.loads(get_body)
+        if job['status'] == 'done' or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+
+    # assert
+    assert status == 202
+    assert get_status == 200
+    assert job['result'] == {'result': 'some input', 'error': None}
+
+
+def test_jobs__not_found(call):
+
+    # act
+    status, _, body = call('GET', '/jobs/some-id/')
+
+    # assert
+    assert status == 404
+    assert json.loads(body) == {'error': messages.MSG_11, 'details': None}
+
+
+def test_stats__ok(call):
+
+    # act
+    status, _, body = call('GET', '/stats/')
+
+    # assert
+    assert status == 200
+    assert set(json.loads(body)) == {
+        'compile_cache', 'result_cache', 'jobs',
+        'workspace', 'admission', 'suites'
+    }
+
+
+def test_metrics__ok(call):
+
+    # act
+    status, content_type, body = call('GET', '/metrics')
+
+    # assert
+    assert status == 200
+    assert content_type.startswith('text/plain; version=0.0.4')
+    assert b'pascal_in_flight' in body
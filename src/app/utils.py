@@ -1,3 +1,4 @@
+import os
 import re
 from typing import Optional
 from app import messages
@@ -34,3 +35,12 @@ def clean_error(value: Optional[str]) -> Optional[str]:
             if result:
                 value = result[0]
     return value
+
+
+def make_private_dir(path: str):
+
+    """ Создает каталог, доступный только пользователю сервиса.
+        Права уже существующего каталога тоже ограничиваются """
+
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    os.chmod(path, 0o700)
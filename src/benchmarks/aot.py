@@ -0,0 +1,79 @@
+""" Сравнение задержки компиляции и запуска программы
+    в режимах JIT и AOT. Запускать только в контейнере:
+
+        python -m benchmarks.aot --runs 20
+
+    Для сравнения задержки компилятора запустите бенчмарк
+    в образах, собранных с PASCAL_AOT=false и PASCAL_AOT=true """
+
+import json
+import time
+import argparse
+import statistics
+from typing import Callable, List
+from app.service.aot import aot_compile
+from app.service.entities import PascalFile
+from app.service.main import PascalService
+
+CODE = (
+    'var a, b: integer;\n'
+    'begin\n'
+    'readln(a, b);\n'
+    'writeln(a + b);\n'
+    'end.'
+)
+DATA_IN = '2 3'
+
+
+def measure(func: Callable, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summary(timings: List[float]) -> dict:
+    return {
+        'runs': len(timings),
+        'mean_ms': round(statistics.mean(timings) * 1000, 2),
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'min_ms': round(min(timings) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    file = PascalFile(CODE)
+
+    def compile_program():
+        PascalService._compile(file)
+
+    def execute():
+        PascalService._execute(file=file, data_in=DATA_IN)
+
+    try:
+        compile_timings = measure(compile_program, args.runs)
+        jit_timings = measure(execute, args.runs)
+        start = time.perf_counter()
+        aot_ok = aot_compile(file.filepath_exe)
+        aot_compile_time = time.perf_counter() - start
+        aot_timings = measure(execute, args.runs) if aot_ok else []
+    finally:
+        file.remove()
+
+    report = {
+        'compile': summary(compile_timings),
+        'execute_jit': summary(jit_timings),
+        'aot_compile_ms': round(aot_compile_time * 1000, 2),
+        'execute_aot': summary(aot_timings) if aot_ok else None,
+    }
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == '__main__':
+    main()
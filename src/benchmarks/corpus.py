@@ -0,0 +1,80 @@
+""" Корпус программ для нагрузочного бенчмарка (benchmarks/corpus) """
+
+import os
+from dataclasses import dataclass
+from typing import List
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'corpus')
+CHECKER = {'preset': 'tokens'}
+
+
+@dataclass
+class Case:
+
+    name: str
+    endpoint: str
+    payload: dict
+
+
+def read_program(name: str) -> str:
+    with open(os.path.join(CORPUS_DIR, f'{name}.pas')) as file:
+        return file.read()
+
+
+def io_data(count: int) -> str:
+    return '\n'.join([str(count)] + [str(x) for x in range(count)])
+
+
+def io_answer(count: int) -> str:
+    lines = [str(x * 2) for x in range(count)]
+    lines.append(str(sum(range(count))))
+    return '\n'.join(lines)
+
+
+def debug_case(name: str, data_in: str) -> Case:
+    return Case(
+        name=f'debug_{name}',
+        endpoint='/debug/',
+        payload={
+            'code': read_program(name),
+            'data_in': data_in,
+            'resources': True,
+        }
+    )
+
+
+def testing_case(name: str, tests: List[dict]) -> Case:
+    return Case(
+        name=f'testing_{name}',
+        endpoint='/testing/',
+        payload={
+            'code': read_program(name),
+            'checker': CHECKER,
+            'tests': tests,
+            'resources': True,
+        }
+    )
+
+
+def get_cases() -> List[Case]:
+    return [
+        debug_case('trivial', '2 3'),
+        debug_case('cpu_heavy', '5000000'),
+        debug_case('io_heavy', io_data(20000)),
+        debug_case('huge_output', '200000'),
+        debug_case('compile_error', '1'),
+        debug_case('timeout', None),
+        testing_case('trivial', [
+            {'data_in': f'{a} {b}', 'data_out': str(a + b)}
+            for a, b in ((1, 2), (-5, 5), (100, 200), (0, 0), (7, 8))
+        ]),
+        testing_case('cpu_heavy', [
+            {'data_in': '100000', 'data_out': '9592'},
+            {'data_in': '1000000', 'data_out': '78498'},
+            {'data_in': '2000000', 'data_out': '148933'},
+        ]),
+        testing_case('io_heavy', [
+            {'data_in': io_data(count), 'data_out': io_answer(count)}
+            for count in (100, 1000, 10000)
+        ]),
+    ]
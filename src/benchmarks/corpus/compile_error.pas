@@ -0,0 +1,6 @@
+{ fake:compile_error - для TOOLCHAIN=fake }
+var a: integer;
+begin
+  readln(a)
+  writeln(a +);
+end.
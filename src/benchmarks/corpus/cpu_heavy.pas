@@ -0,0 +1,19 @@
+var n, i, j, count: integer;
+    composite: array of boolean;
+begin
+  readln(n);
+  SetLength(composite, n + 1);
+  count := 0;
+  for i := 2 to n do
+    if not composite[i] then
+    begin
+      count := count + 1;
+      j := i * i;
+      while (j <= n) and (j > 0) do
+      begin
+        composite[j] := true;
+        j := j + i;
+      end;
+    end;
+  writeln(count);
+end.
@@ -0,0 +1,6 @@
+var n, i: integer;
+begin
+  readln(n);
+  for i := 1 to n do
+    writeln('line ', i, ' of the huge output');
+end.
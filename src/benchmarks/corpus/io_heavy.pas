@@ -0,0 +1,13 @@
+var n, i, x: integer;
+    sum: int64;
+begin
+  readln(n);
+  sum := 0;
+  for i := 1 to n do
+  begin
+    readln(x);
+    sum := sum + x;
+    writeln(x * 2);
+  end;
+  writeln(sum);
+end.
@@ -0,0 +1,7 @@
+{ fake:timeout - для TOOLCHAIN=fake }
+var i: integer;
+begin
+  i := 0;
+  while true do
+    i := (i + 1) mod 1000;
+end.
@@ -0,0 +1,274 @@
+""" Нагрузочный бенчмарк /debug/ и /testing/.
+    Прогоняет корпус программ (benchmarks/corpus) через запущенный
+    сервис с заданным количеством одновременных запросов:
+
+        python -m benchmarks.load run --url http://localhost:9005 \
+            --concurrency 8 --requests 40 --output before.json
+        python -m benchmarks.load compare before.json after.json
+
+    Для каждого случая выводит requests/s и p50/p95/p99 фаз:
+    request - время запроса на клиенте, compile и execute - время
+    компиляции и запуска программы на сервере (resources=true) """
+
+import sys
+import json
+import math
+import time
+import argparse
+import urllib.error
+import urllib.request
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from benchmarks.corpus import Case, get_cases
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], percent: float) -> float:
+
+    """ Процентиль с линейной интерполяцией между соседними значениями """
+
+    values = sorted(values)
+    position = (len(values) - 1) * percent / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    return values[lower] + (values[upper] - values[lower]) * (
+        position - lower
+    )
+
+
+def summary(timings: List[float]) -> dict:
+    result = {'count': len(timings)}
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = round(
+            percentile(timings, percent) * 1000, 2
+        )
+    result['max_ms'] = round(max(timings) * 1000, 2)
+    return result
+
+
+def send(
+    url: str,
+    payload: dict,
+    timeout: float
+) -> Tuple[float, Optional[dict], Optional[str]]:
+
+    """ Отправляет запрос, возвращает время запроса,
+        тело ответа и ошибку запроса """
+
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+    started = time.perf_counter()
+    body, error = None, None
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = json.loads(response.read())
+    except urllib.error.HTTPError as ex:
+        error = f'HTTP {ex.code}'
+    except (OSError, ValueError) as ex:
+        error = str(ex)
+    return time.perf_counter() - started, body, error
+
+
+def server_timings(body: dict) -> Dict[str, List[float]]:
+
+    """ Время компиляции и запуска программы из полей
+        compile_usage и usage ответа """
+
+    timings = {'compile': [], 'execute': []}
+    compile_usage = body.get('compile_usage')
+    if compile_usage:
+        timings['compile'].append(compile_usage['wall_time'])
+    usages = [body.get('usage')]
+    usages += [test.get('usage') for test in body.get('tests', [])]
+    for usage in usages:
+        if usage:
+            timings['execute'].append(usage['wall_time'])
+    return timings
+
+
+def run_case(
+    base_url: str,
+    case: Case,
+    concurrency: int,
+    requests: int,
+    timeout: float
+) -> dict:
+    url = base_url.rstrip('/') + case.endpoint
+    timings = {'request': [], 'compile': [], 'execute': []}
+    errors = {}
+
+    def call(_):
+        return send(url, case.payload, timeout)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for elapsed, body, error in executor.map(call, range(requests)):
+            timings['request'].append(elapsed)
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+                continue
+            for phase, values in server_timings(body).items():
+                timings[phase].extend(values)
+    duration = time.perf_counter() - started
+    return {
+        'endpoint': case.endpoint,
+        'requests': requests,
+        'errors': errors,
+        'rps': round(requests / duration, 2),
+        'phases': {
+            phase: summary(values)
+            for phase, values in timings.items() if values
+        },
+    }
+
+
+def run(args) -> dict:
+    cases = [
+        case for case in get_cases()
+        if not args.cases or case.name in args.cases
+    ]
+    report = {
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'url': args.url,
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'cases': {},
+    }
+    for case in cases:
+        url = args.url.rstrip('/') + case.endpoint
+        for _ in range(args.warmup):
+            send(url, case.payload, args.timeout)
+        result = run_case(
+            args.url,
+            case,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            timeout=args.timeout
+        )
+        report['cases'][case.name] = result
+        print(format_case(case.name, result), file=sys.stderr)
+    return report
+
+
+def format_case(name: str, result: dict) -> str:
+    phases = ', '.join(
+        f'{phase} p50/p95/p99 {values["p50_ms"]}/{values["p95_ms"]}/'
+        f'{values["p99_ms"]} ms'
+        for phase, values in result['phases'].items()
+    )
+    errors = sum(result['errors'].values())
+    return f'{name}: {result["rps"]} rps, errors {errors}, {phases}'
+
+
+def compare(base: dict, new: dict, threshold: float) -> List[dict]:
+
+    """ Сравнивает два отчета. Регрессия - рост процентиля
+        или падение requests/s больше чем на threshold """
+
+    rows = []
+    for name, new_case in new['cases'].items():
+        base_case = base['cases'].get(name)
+        if base_case is None:
+            continue
+        metrics = [('rps', base_case['rps'], new_case['rps'], False)]
+        for phase, new_values in new_case['phases'].items():
+            base_values = base_case['phases'].get(phase)
+            if base_values is None:
+                continue
+            for percent in PERCENTILES:
+                key = f'p{percent}_ms'
+                metrics.append((
+                    f'{phase}.{key}',
+                    base_values[key],
+                    new_values[key],
+                    True
+                ))
+        for metric, base_value, new_value, lower_is_better in metrics:
+            change = (new_value - base_value) / base_value \
+                if base_value else 0.0
+            regression = change > threshold if lower_is_better \
+                else change < -threshold
+            rows.append({
+                'case': name,
+                'metric': metric,
+                'base': base_value,
+                'new': new_value,
+                'change': round(change * 100, 1),
+                'regression': regression,
+            })
+    return rows
+
+
+def load_report(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='запустить бенчмарк')
+    run_parser.add_argument('--url', default='http://localhost:9005')
+    run_parser.add_argument('--concurrency', type=int, default=4)
+    run_parser.add_argument(
+        '--requests', type=int, default=20,
+        help='количество запросов каждого случая'
+    )
+    run_parser.add_argument(
+        '--warmup', type=int, default=1,
+        help='количество прогревочных запросов каждого случая'
+    )
+    run_parser.add_argument('--timeout', type=float, default=120)
+    run_parser.add_argument(
+        '--cases', nargs='*',
+        help='имена случаев (по умолчанию все)'
+    )
+    run_parser.add_argument('--output', help='файл для отчета в JSON')
+
+    compare_parser = commands.add_parser(
+        'compare', help='сравнить два отчета'
+    )
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='допустимое ухудшение (0.1 - 10%%)'
+    )
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = run(args)
+        text = json.dumps(report, indent=4)
+        if args.output:
+            with open(args.output, 'w') as file:
+                file.write(text)
+        else:
+            print(text)
+        return
+
+    rows = compare(
+        load_report(args.base),
+        load_report(args.new),
+        args.threshold
+    )
+    for row in rows:
+        mark = ' REGRESSION' if row['regression'] else ''
+        print(
+            f'{row["case"]:<24} {row["metric"]:<18} '
+            f'{row["base"]:>10} -> {row["new"]:>10} '
+            f'({row["change"]:+}%){mark}'
+        )
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
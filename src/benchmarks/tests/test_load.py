@@ -0,0 +1,68 @@
+from benchmarks.load import percentile, summary, server_timings, compare
+
+
+def test_percentile__interpolate__ok():
+
+    # arrange
+    values = [4.0, 1.0, 3.0, 2.0]
+
+    # act
+    result = [percentile(values, percent) for percent in (0, 50, 100)]
+
+    # assert
+    assert result == [1.0, 2.5, 4.0]
+
+
+def test_summary__one_value__ok():
+
+    # act
+    result = summary([0.25])
+
+    # assert
+    assert result == {
+        'count': 1,
+        'p50_ms': 250.0,
+        'p95_ms': 250.0,
+        'p99_ms': 250.0,
+        'max_ms': 250.0,
+    }
+
+
+def test_server_timings__testing_response__ok():
+
+    # arrange
+    body = {
+        'compile_usage': {'wall_time': 1.5},
+        'tests': [
+            {'usage': {'wall_time': 0.1}},
+            {'usage': {'wall_time': 0.2}},
+            {'error': 'Test skipped because a previous test failed'},
+        ]
+    }
+
+    # act
+    result = server_timings(body)
+
+    # assert
+    assert result == {'compile': [1.5], 'execute': [0.1, 0.2]}
+
+
+def test_compare__slower__regression():
+
+    # arrange
+    base = {'cases': {'debug_trivial': {
+        'rps': 100.0,
+        'phases': {'request': {'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 30}},
+    }}}
+    new = {'cases': {'debug_trivial': {
+        'rps': 95.0,
+        'phases': {'request': {'p50_ms': 10, 'p95_ms': 25, 'p99_ms': 30}},
+    }}}
+
+    # act
+    rows = compare(base, new, threshold=0.1)
+
+    # assert
+    regressions = [row['metric'] for row in rows if row['regression']]
+    assert regressions == ['request.p95_ms']
+    assert len(rows) == 4
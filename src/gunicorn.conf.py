@@ -0,0 +1,12 @@
+""" Настройки gunicorn. start.sh запускает gunicorn из этого
+    каталога, и файл читается автоматически, docker-compose
+    передает его в -c. app импортируется внутри хуков:
+    --pythonpath добавляется в sys.path после чтения настроек """
+
+
+def on_starting(server):
+    # Файлы метрик прошлого запуска: значения gauge с тем же pid
+    # и файлы старого формата не должны попасть в /metrics
+    import shutil
+    from app import config
+    shutil.rmtree(config.METRICS_DIR, ignore_errors=True)
@@ -1,2 +1,6 @@
 #!/bin/bash
-gunicorn --bind 0:9005 app.main:app --reload -w ${GUNICORN_WORKERS:=1}
\ No newline at end of file
+if [ "${SERVER:=wsgi}" = "asgi" ]; then
+    gunicorn --bind 0:9005 app.asgi:app --reload -w ${GUNICORN_WORKERS:=1} -k uvicorn.workers.UvicornWorker
+else
+    gunicorn --bind 0:9005 app.main:app --reload -w ${GUNICORN_WORKERS:=1} --threads ${GUNICORN_THREADS:=1}
+fi
\ No newline at end of file